@@ -1,15 +1,23 @@
 """
 Authentication utilities for JWT token generation and password hashing
 """
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from .database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import get_async_db
 from .models import User
+from . import schemas
 
 # Security configuration
 SECRET_KEY = "your-secret-key-change-in-production-09876543210"  # Change this in production!
@@ -19,6 +27,54 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL_SECONDS = 60
+
+class UserCache:
+    """
+    Bounded TTL cache of active users keyed by username
+    Holds schemas.User snapshots, so an authenticated request that hits the
+    cache needs no database query. Invalidation is per process; the TTL bounds
+    how long another worker can act on a stale role or active flag.
+    """
+    def __init__(self, maxsize: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, username: str) -> Optional[schemas.User]:
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self._entries[username]
+                return None
+            self._entries.move_to_end(username)
+            return user
+
+    def put(self, user: schemas.User):
+        if not user.is_active:
+            self.invalidate(user.username)
+            return
+        with self._lock:
+            self._entries[user.username] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user.username)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username: str):
+        with self._lock:
+            self._entries.pop(username, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+user_cache = UserCache()
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -27,6 +83,92 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+# bcrypt is deliberately slow (tens of ms per call). Async handlers hash on a
+# small dedicated pool instead of the event loop or Starlette's shared
+# threadpool, and shed load with 503 once too many hashes are waiting.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32"))
+
+class PasswordHasher:
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, queue_limit: int = PASSWORD_HASH_QUEUE_LIMIT,
+                 window: int = 500):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._wait_times = deque(maxlen=window)
+        self._hash_times = deque(maxlen=window)
+        self.completed = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._in_flight - self.workers)
+
+    def _timed(self, submitted: float, func, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self._wait_times.append(started - submitted)
+                self._hash_times.append(finished - started)
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self._in_flight >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many login attempts in progress, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self._in_flight += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._timed, time.perf_counter(), func, *args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._wait_times)
+            hashes = sorted(self._hash_times)
+            in_flight = self._in_flight
+
+        def percentile(samples, fraction):
+            if not samples:
+                return 0.0
+            return round(samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000, 2)
+
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "in_flight": in_flight,
+            "queue_depth": max(0, in_flight - self.workers),
+            "max_queue_depth": self.max_queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "hash_p50_ms": percentile(hashes, 0.5),
+            "hash_p99_ms": percentile(hashes, 0.99),
+            "wait_p50_ms": percentile(waits, 0.5),
+            "wait_p99_ms": percentile(waits, 0.99),
+        }
+
+password_hasher = PasswordHasher()
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -46,8 +188,21 @@ def decode_access_token(token: str):
     except JWTError:
         return None
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """Get current user from JWT token"""
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalar_one_or_none()
+
+def cache_user(user: User) -> schemas.User:
+    """Snapshot a freshly loaded or updated user into the cache"""
+    snapshot = schemas.User.model_validate(user)
+    user_cache.put(snapshot)
+    return snapshot
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> schemas.User:
+    """
+    Get current user from JWT token
+    Served from user_cache when possible; the session only connects on a miss
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -62,21 +217,25 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     if username is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.username == username).first()
+    cached = user_cache.get(username)
+    if cached is not None:
+        return cached
+    
+    user = await get_user_by_username(db, username)
     if user is None:
         raise credentials_exception
     
-    return user
+    return cache_user(user)
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)):
+async def get_current_active_user(current_user: schemas.User = Depends(get_current_user)):
     """Get current active user"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 def require_role(*roles):
-    """Decorator to require specific roles"""
-    async def role_checker(current_user: User = Depends(get_current_active_user)):
+    """Decorator to require specific roles (checked against the cached user, no query on a hit)"""
+    async def role_checker(current_user: schemas.User = Depends(get_current_active_user)):
         if current_user.role not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,242 @@
+"""
+In-memory typeahead over dish, menu-item and ingredient names
+
+Built once at startup and kept current by session hooks, so suggestions never
+touch the database:
+- a sorted list of distinct name words, searched with bisect for prefixes
+- word -> entries postings, intersected across the words typed
+- a one-deletion index over word prefixes (SymSpell-style), so a word that
+  matches nothing ("chiken", "panner") falls back to edit distance 1
+
+ORM inserts, updates and deletes of GlobalDish, MenuItem and Ingredient are
+applied after their transaction commits. Bulk Core writes must call
+autocomplete.rebuild().
+"""
+import bisect
+import heapq
+import re
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from . import models
+
+KINDS = {
+    models.GlobalDish: "dish",
+    models.MenuItem: "menu_item",
+    models.Ingredient: "ingredient",
+}
+# Equal scores list menu items (what the restaurant sells) before catalog dishes
+KIND_ORDER = {"menu_item": 0, "dish": 1, "ingredient": 2}
+MIN_FUZZY_LENGTH = 3
+MAX_FUZZY_PREFIX = 12
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+EntryKey = Tuple[str, int]
+
+class Entry(NamedTuple):
+    kind: str
+    id: int
+    name: str
+    words: Tuple[str, ...]
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+def _deletions(word: str) -> Set[str]:
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Damerau-Levenshtein distance <= 1 (one insert, delete, substitution or swap)"""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diffs) == 1:
+            return True
+        return len(diffs) == 2 and diffs[1] == diffs[0] + 1 and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]]
+    shorter, longer = (a, b) if len(a) < len(b) else (b, a)
+    return any(longer[:i] + longer[i + 1:] == shorter for i in range(len(longer)))
+
+class Autocomplete:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[EntryKey, Entry] = {}
+        self._postings: Dict[str, Set[EntryKey]] = {}
+        self._sorted_words: List[str] = []
+        # deletion variant of a word prefix -> words with that prefix
+        self._fuzzy: Dict[str, Set[str]] = {}
+
+    # ===== BUILDING =====
+
+    def rebuild(self, db: Session):
+        """Reload every name from the database (startup and after bulk imports)"""
+        rows = []
+        for model, kind in KINDS.items():
+            rows.extend((kind, row_id, name) for row_id, name in db.query(model.id, model.name))
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+            self._sorted_words = []
+            self._fuzzy.clear()
+            for kind, row_id, name in rows:
+                self._add(kind, row_id, name, keep_sorted=False)
+            self._sorted_words = sorted(self._postings)
+
+    def apply(self, upserts: Iterable[Tuple[str, int, str]], deletes: Iterable[EntryKey]):
+        with self._lock:
+            for key in deletes:
+                self._remove(key)
+            for kind, row_id, name in upserts:
+                self._remove((kind, row_id))
+                self._add(kind, row_id, name)
+
+    def _add(self, kind: str, row_id: int, name: Optional[str], keep_sorted: bool = True):
+        if not name:
+            return
+        key = (kind, row_id)
+        words = tuple(dict.fromkeys(_words(name)))
+        self._entries[key] = Entry(kind, row_id, name, words)
+        for word in words:
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = set()
+                if keep_sorted:
+                    bisect.insort(self._sorted_words, word)
+                self._index_fuzzy(word)
+            postings.add(key)
+
+    def _remove(self, key: EntryKey):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for word in entry.words:
+            postings = self._postings.get(word)
+            if postings is None:
+                continue
+            postings.discard(key)
+            if not postings:
+                del self._postings[word]
+                index = bisect.bisect_left(self._sorted_words, word)
+                if index < len(self._sorted_words) and self._sorted_words[index] == word:
+                    del self._sorted_words[index]
+                self._unindex_fuzzy(word)
+
+    def _fuzzy_keys(self, word: str):
+        for length in range(MIN_FUZZY_LENGTH, min(len(word), MAX_FUZZY_PREFIX) + 1):
+            prefix = word[:length]
+            yield prefix
+            yield from _deletions(prefix)
+
+    def _index_fuzzy(self, word: str):
+        for variant in self._fuzzy_keys(word):
+            self._fuzzy.setdefault(variant, set()).add(word)
+
+    def _unindex_fuzzy(self, word: str):
+        for variant in self._fuzzy_keys(word):
+            words = self._fuzzy.get(variant)
+            if words is not None:
+                words.discard(word)
+                if not words:
+                    del self._fuzzy[variant]
+
+    # ===== LOOKUP =====
+
+    def _prefix_words(self, token: str) -> List[str]:
+        start = bisect.bisect_left(self._sorted_words, token)
+        end = bisect.bisect_left(self._sorted_words, token + "\uffff")
+        return self._sorted_words[start:end]
+
+    def _fuzzy_words(self, token: str) -> Set[str]:
+        if len(token) < MIN_FUZZY_LENGTH:
+            return set()
+        token = token[:MAX_FUZZY_PREFIX]
+        candidates = set()
+        for variant in {token} | _deletions(token):
+            candidates |= self._fuzzy.get(variant, set())
+        return {
+            word for word in candidates
+            if any(_within_one_edit(token, word[:length]) for length in (len(token) - 1, len(token), len(token) + 1))
+        }
+
+    def suggest(self, query: str, limit: int = 10, kinds: Optional[Set[str]] = None) -> List[dict]:
+        tokens = _words(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            matched: Optional[Set[EntryKey]] = None
+            fuzzy_keys: Set[EntryKey] = set()
+            for token in tokens:
+                exact = set()
+                for word in self._prefix_words(token):
+                    exact |= self._postings[word]
+                keys = exact
+                if not exact:
+                    # Only fall back to typo matches for a word nothing starts with
+                    for word in self._fuzzy_words(token):
+                        keys |= self._postings[word]
+                    fuzzy_keys |= keys
+                matched = keys if matched is None else matched & keys
+                if not matched:
+                    return []
+            entries = [self._entries[key] for key in matched]
+
+        if kinds:
+            entries = [entry for entry in entries if entry.kind in kinds]
+
+        first = tokens[0]
+        phrase = " ".join(tokens)
+
+        def rank(entry: Entry):
+            fuzzy = (entry.kind, entry.id) in fuzzy_keys
+            name = entry.name.lower()
+            return (
+                fuzzy,
+                not name.startswith(phrase),
+                not entry.words[0].startswith(first),
+                len(entry.name),
+                KIND_ORDER[entry.kind],
+                name,
+            )
+
+        return [
+            {"kind": entry.kind, "id": entry.id, "name": entry.name, "fuzzy": (entry.kind, entry.id) in fuzzy_keys}
+            for entry in heapq.nsmallest(limit, entries, key=rank)
+        ]
+
+autocomplete = Autocomplete()
+
+# ===== SYNC WITH ORM WRITES =====
+
+_PENDING = "autocomplete_pending"
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    pending = session.info.setdefault(_PENDING, {"upserts": {}, "deletes": set()})
+    for obj in list(session.new) + list(session.dirty):
+        kind = KINDS.get(type(obj))
+        if kind and obj.id is not None:
+            pending["upserts"][(kind, obj.id)] = obj.name
+            pending["deletes"].discard((kind, obj.id))
+    for obj in session.deleted:
+        kind = KINDS.get(type(obj))
+        if kind and obj.id is not None:
+            pending["upserts"].pop((kind, obj.id), None)
+            pending["deletes"].add((kind, obj.id))
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session):
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        autocomplete.apply(
+            [(kind, row_id, name) for (kind, row_id), name in pending["upserts"].items()],
+            pending["deletes"]
+        )
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,150 @@
+"""
+Response compression negotiated from Accept-Encoding
+
+Brotli when the client accepts it and the brotli module is installed,
+otherwise gzip. Only compressible media types above MINIMUM_SIZE are
+touched. Responses that already carry a Content-Encoding (the precompressed
+menu snapshot and static files) pass through as they are. Server-sent events
+are never compressed, because compressors hold back small writes and would
+delay events.
+Streamed bodies are compressed chunk by chunk and flushed after each one.
+Strong ETags on compressed responses are weakened, as the bytes differ.
+"""
+import gzip
+import zlib
+from typing import List, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without it only gzip is offered
+    brotli = None
+
+MINIMUM_SIZE = 1024
+# Dynamic responses are compressed per request, so favour speed over ratio
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = ("application/json", "application/javascript", "application/xml", "image/svg+xml", "text/")
+NEVER_COMPRESS = ("text/event-stream",)
+
+def acceptable(accept_encoding: str) -> List[str]:
+    """Supported encodings the client accepts (q > 0), preferred first"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name] = quality
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+    return [encoding for encoding in supported if accepted.get(encoding, accepted.get("*", 0.0)) > 0]
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Best supported encoding the client accepts (q > 0), or None"""
+    encodings = acceptable(accept_encoding)
+    return encodings[0] if encodings else None
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits 31: gzip container
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+def _should_compress(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").lower()
+    if content_type.startswith(NEVER_COMPRESS):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        compressor: Optional[_StreamCompressor] = None
+        # None until the first body message decides whether to compress
+        active: Optional[bool] = None
+
+        async def send_compressed(message: Message):
+            nonlocal start_message, compressor, active
+            if message["type"] == "http.response.start":
+                start_message = message
+                if not _should_compress(Headers(raw=message["headers"])):
+                    active = False
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or active is False:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if active is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if not more_body and len(body) < self.minimum_size:
+                    active = False
+                    await send(start_message)
+                    await send(message)
+                    return
+                active = True
+                headers["Content-Encoding"] = encoding
+                if "accept-encoding" not in headers.get("vary", "").lower():
+                    headers.add_vary_header("Accept-Encoding")
+                # The compressed bytes differ from what a strong ETag promised
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                if not more_body:
+                    body = compress(body, encoding)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                del headers["Content-Length"]
+                compressor = _StreamCompressor(encoding)
+                await send(start_message)
+
+            data = compressor.chunk(body) if body else b""
+            if not more_body:
+                data += compressor.finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
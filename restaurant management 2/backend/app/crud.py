@@ -1,19 +1,26 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from . import models, schemas
+from typing import List, Optional
+from . import models, schemas, rollups, stock
+from .pagination import paginate, paginate_async, DEFAULT_PAGE_SIZE
+from .loaders import eager
 from datetime import datetime
 
+# Helpers flush so later queries in the request see their writes; the request's
+# session dependency commits once (see database.get_db)
+
 # Menu Items
 def get_menu_items(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.MenuItem).offset(skip).limit(limit).all()
+    return eager(db.query(models.MenuItem), schemas.MenuItem).offset(skip).limit(limit).all()
 
 def get_menu_item(db: Session, item_id: int):
-    return db.query(models.MenuItem).filter(models.MenuItem.id == item_id).first()
+    return eager(db.query(models.MenuItem), schemas.MenuItem).filter(models.MenuItem.id == item_id).first()
 
 def create_menu_item(db: Session, item: schemas.MenuItemCreate):
     db_item = models.MenuItem(**item.model_dump())
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    db.flush()
     return db_item
 
 def update_menu_item(db: Session, item_id: int, item: schemas.MenuItemUpdate):
@@ -22,15 +29,18 @@ def update_menu_item(db: Session, item_id: int, item: schemas.MenuItemUpdate):
         update_data = item.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_item, field, value)
-        db.commit()
-        db.refresh(db_item)
+        db.flush()
     return db_item
 
 def delete_menu_item(db: Session, item_id: int):
     db_item = db.query(models.MenuItem).filter(models.MenuItem.id == item_id).first()
     if db_item:
+        # The rollup's cascade only exists on databases created with it (and SQLite does not enforce it)
+        db.query(models.DailyItemSales).filter(
+            models.DailyItemSales.menu_item_id == item_id
+        ).delete(synchronize_session=False)
         db.delete(db_item)
-        db.commit()
+        db.flush()
     return db_item
 
 # Tables
@@ -43,8 +53,7 @@ def get_table(db: Session, table_id: int):
 def create_table(db: Session, table: schemas.TableCreate):
     db_table = models.RestaurantTable(**table.model_dump())
     db.add(db_table)
-    db.commit()
-    db.refresh(db_table)
+    db.flush()
     return db_table
 
 def update_table(db: Session, table_id: int, table: schemas.TableUpdate):
@@ -53,8 +62,7 @@ def update_table(db: Session, table_id: int, table: schemas.TableUpdate):
         update_data = table.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_table, field, value)
-        db.commit()
-        db.refresh(db_table)
+        db.flush()
     return db_table
 
 def update_table_status(db: Session, table_id: int, status: str):
@@ -62,51 +70,64 @@ def update_table_status(db: Session, table_id: int, status: str):
     db_table = db.query(models.RestaurantTable).filter(models.RestaurantTable.id == table_id).first()
     if db_table:
         db_table.status = status
-        db.commit()
-        db.refresh(db_table)
+        db.flush()
     return db_table
 
 def delete_table(db: Session, table_id: int):
     db_table = db.query(models.RestaurantTable).filter(models.RestaurantTable.id == table_id).first()
     if db_table:
         db.delete(db_table)
-        db.commit()
+        db.flush()
     return db_table
 
 # Orders
-def get_orders(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Order).offset(skip).limit(limit).all()
-
 def get_order(db: Session, order_id: int):
-    return db.query(models.Order).filter(models.Order.id == order_id).first()
+    return eager(db.query(models.Order), schemas.Order).filter(models.Order.id == order_id).first()
 
 def create_order(db: Session, order: schemas.OrderCreate):
-    # Calculate total amount
-    total_amount = 0
+    # Collapse repeated lines so each menu item becomes one order_items row
+    quantities = {}
+    for item in order.items:
+        if item.quantity > 0:
+            quantities[item.menu_item_id] = quantities.get(item.menu_item_id, 0) + item.quantity
+    
+    # Resolve every menu item on the order with a single IN query
     menu_items = []
+    if quantities:
+        menu_items = db.query(models.MenuItem).filter(models.MenuItem.id.in_(quantities)).all()
     
-    for item in order.items:
-        menu_item = db.query(models.MenuItem).filter(models.MenuItem.id == item.menu_item_id).first()
-        if menu_item:
-            total_amount += menu_item.price * item.quantity
-            for _ in range(item.quantity):
-                menu_items.append(menu_item)
+    # Calculate total amount
+    total_amount = sum(menu_item.price * quantities[menu_item.id] for menu_item in menu_items)
     
     db_order = models.Order(
         table_id=order.table_id,
         total_amount=total_amount,
-        status="Pending"
+        status="Pending",
+        special_notes=order.special_notes
     )
-    db_order.items = menu_items
-    
     db.add(db_order)
-    db.commit()
-    db.refresh(db_order)
+    db.flush()
+    
+    if menu_items:
+        db.execute(models.order_items.insert(), [
+            {"order_id": db_order.id, "menu_item_id": menu_item.id, "quantity": quantities[menu_item.id]}
+            for menu_item in menu_items
+        ])
+    
+    rollups.record_order_created(db, db_order, [(menu_item, quantities[menu_item.id]) for menu_item in menu_items])
+    
+    # Occupy the table in the same transaction as the order
+    db_table = db.get(models.RestaurantTable, order.table_id)
+    if db_table:
+        db_table.status = "Occupied"
+    
+    db.flush()
     return db_order
 
 def update_order(db: Session, order_id: int, order: schemas.OrderUpdate):
     db_order = db.query(models.Order).filter(models.Order.id == order_id).first()
     if db_order:
+        old_status = db_order.status
         update_data = order.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_order, field, value)
@@ -114,20 +135,40 @@ def update_order(db: Session, order_id: int, order: schemas.OrderUpdate):
         if order.status == "Completed":
             db_order.completed_at = datetime.utcnow()
         
-        db.commit()
-        db.refresh(db_order)
+        rollups.record_order_status(db, db_order, old_status)
+        stock.record_order_status(db, db_order, old_status)
+        db.flush()
     return db_order
 
 def delete_order(db: Session, order_id: int):
     db_order = db.query(models.Order).filter(models.Order.id == order_id).first()
     if db_order:
+        rollups.record_order_deleted(db, db_order)
         db.delete(db_order)
-        db.commit()
+        db.flush()
     return db_order
 
 # Bills
-def get_bills(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Bill).offset(skip).limit(limit).all()
+def get_bills(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    paid: Optional[bool] = None,
+    order_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+):
+    """Newest-first page of bills; returns (bills, next_cursor)"""
+    query = db.query(models.Bill)
+    if paid is not None:
+        query = query.filter(models.Bill.paid == paid)
+    if order_id is not None:
+        query = query.filter(models.Bill.order_id == order_id)
+    if created_from:
+        query = query.filter(models.Bill.created_at >= created_from)
+    if created_to:
+        query = query.filter(models.Bill.created_at < created_to)
+    return paginate(query, models.Bill.created_at, models.Bill.id, cursor, limit)
 
 def get_bill(db: Session, bill_id: int):
     return db.query(models.Bill).filter(models.Bill.id == bill_id).first()
@@ -142,21 +183,55 @@ def create_bill(db: Session, bill: schemas.BillCreate):
         total_amount=order.total_amount
     )
     db.add(db_bill)
-    db.commit()
-    db.refresh(db_bill)
+    db.flush()
     return db_bill
 
 def update_bill_payment(db: Session, bill_id: int, paid: bool):
     db_bill = db.query(models.Bill).filter(models.Bill.id == bill_id).first()
     if db_bill:
+        was_paid = db_bill.paid
         db_bill.paid = paid
-        db.commit()
-        db.refresh(db_bill)
+        rollups.record_bill_payment(db, db_bill, was_paid)
+        db.flush()
     return db_bill
 
 def delete_bill(db: Session, bill_id: int):
     db_bill = db.query(models.Bill).filter(models.Bill.id == bill_id).first()
     if db_bill:
+        rollups.record_bill_deleted(db, db_bill)
         db.delete(db_bill)
-        db.commit()
+        db.flush()
     return db_bill
+
+# Async reads
+# The async list routes (orders, chef's active orders) run these on the request's
+# AsyncSession; everything above takes a sync Session
+async def get_orders(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    statuses: Optional[List[str]] = None,
+    table_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+):
+    """Newest-first page of orders; returns (orders, next_cursor)"""
+    query = eager(select(models.Order), schemas.Order)
+    if statuses:
+        query = query.filter(models.Order.status.in_(statuses))
+    if table_id is not None:
+        query = query.filter(models.Order.table_id == table_id)
+    if created_from:
+        query = query.filter(models.Order.created_at >= created_from)
+    if created_to:
+        query = query.filter(models.Order.created_at < created_to)
+    return await paginate_async(db, query, models.Order.created_at, models.Order.id, cursor, limit)
+
+async def get_active_orders(db: AsyncSession):
+    """Pending and In Progress orders, oldest first (the kitchen queue)"""
+    result = await db.execute(
+        eager(select(models.Order), schemas.Order)
+        .filter(models.Order.status.in_(["Pending", "In Progress"]))
+        .order_by(models.Order.created_at.asc())
+    )
+    return result.scalars().all()
@@ -1,6 +1,8 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Callable, Union
 import os
 from dotenv import load_dotenv
 
@@ -30,11 +32,85 @@ else:
     )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine on the same database for handlers that run on the event loop
+# (aiosqlite for SQLite, asyncpg for PostgreSQL)
+def _async_url(url: str) -> str:
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql+psycopg2:"):
+        return url.replace("postgresql+psycopg2:", "postgresql+asyncpg:", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    return url
+
+ASYNC_DATABASE_URL = _async_url(DATABASE_URL)
+
+if ASYNC_DATABASE_URL.startswith("sqlite"):
+    async_engine = create_async_engine(ASYNC_DATABASE_URL)
+else:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True
+    )
+
+# Opt-in WAL, pragmas and a FIFO writer lane (see sqlite_profile.py) for SQLite under concurrent writes
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default").lower()
+if DATABASE_URL.startswith("sqlite") and SQLITE_PROFILE == "production":
+    from .sqlite_profile import enable as enable_sqlite_profile
+    enable_sqlite_profile(engine, async_engine)
+
+# expire_on_commit=False so returned objects can be serialized after commit
+# without a lazy refresh, which async sessions cannot do implicitly
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
+def create_missing_indexes():
+    """create_all() skips indexes on tables that already exist, so add them here"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+# ===== UNIT OF WORK =====
+# A request is one transaction: CRUD helpers and handlers only flush, and the
+# session dependency commits once after the response body has been built, or
+# rolls back if anything raised. Side effects that must only happen for
+# committed data (events, cache refreshes) go through after_commit().
+
+_AFTER_COMMIT = "after_commit_callbacks"
+
+def after_commit(db: Union[Session, AsyncSession], callback: Callable[[], None]):
+    """Run `callback` once the current transaction commits; dropped if it rolls back"""
+    session = db.sync_session if isinstance(db, AsyncSession) else db
+    session.info.setdefault(_AFTER_COMMIT, []).append(callback)
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session):
+    for callback in session.info.pop(_AFTER_COMMIT, []):
+        callback()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit(session):
+    session.info.pop(_AFTER_COMMIT, None)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
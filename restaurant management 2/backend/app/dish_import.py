@@ -0,0 +1,247 @@
+"""
+Streaming, idempotent bulk import of the global dish catalog
+
+Reads CSV or JSONL one row at a time and writes in batches through the
+SQLAlchemy engine, so file size does not matter and any backend works. Dish
+name is the natural key, enforced by a unique index: each batch looks up
+the names it contains, then writes new and changed dishes with one
+INSERT ... ON CONFLICT (name) DO UPDATE and skips the rest, so re-running an
+import that already landed writes nothing and two imports racing on the
+same name update one row instead of adding a duplicate. Each batch commits
+on its own; an interrupted import can simply be re-run.
+"""
+import csv
+import io
+import json
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from sqlalchemy import bindparam, insert, or_, select, update
+from sqlalchemy.engine import Engine
+from . import models
+
+COLUMNS = ("name", "ingredients", "diet", "prep_time", "cook_time", "flavor_profile", "course", "state", "region", "description")
+DEFAULT_BATCH_SIZE = 2000
+# Stays under SQLite's bound-parameter limit for the name lookups
+LOOKUP_CHUNK = 500
+MAX_REPORTED_ERRORS = 20
+
+_table = models.GlobalDish.__table__
+
+class ImportReport:
+    def __init__(self):
+        self.processed = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.errors: List[dict] = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def reject(self, line: int, error: str):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": error})
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "seconds": round(self.elapsed, 2),
+            "rows_per_second": round(self.rows_per_second),
+        }
+
+# ===== PARSING =====
+
+def clean_text(value) -> Optional[str]:
+    """Strip text fields, treating blanks as missing"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+def parse_time(value) -> Optional[int]:
+    """Minutes from '20', '20 min' or 20; unknown (blank, -1) becomes None"""
+    value = clean_text(value)
+    if value is None:
+        return None
+    value = value.lower().replace("min", "").strip()
+    try:
+        minutes = int(float(value))
+    except ValueError:
+        raise ValueError(f"invalid time {value!r}")
+    return minutes if minutes >= 0 else None
+
+def prepare_row(raw: dict) -> dict:
+    """Map one source record onto global_dishes columns, raising ValueError if unusable"""
+    # Handle a UTF-8 BOM glued to the first CSV header
+    name = clean_text(raw.get("name") or raw.get("\ufeffname"))
+    if not name:
+        raise ValueError("missing name")
+
+    row = {
+        "name": name,
+        "ingredients": clean_text(raw.get("ingredients")),
+        "diet": clean_text(raw.get("diet")),
+        "prep_time": parse_time(raw.get("prep_time")),
+        "cook_time": parse_time(raw.get("cook_time")),
+        "flavor_profile": clean_text(raw.get("flavor_profile")),
+        "course": clean_text(raw.get("course")),
+        "state": clean_text(raw.get("state")),
+        "region": clean_text(raw.get("region")),
+        "description": clean_text(raw.get("description")),
+    }
+    for column in ("flavor_profile", "state", "region"):
+        # The source dataset uses -1 for unknown
+        if row[column] == "-1":
+            row[column] = None
+
+    if row["description"] is None:
+        parts = []
+        if row["flavor_profile"]:
+            parts.append(f"Flavor: {row['flavor_profile']}")
+        if row["region"]:
+            parts.append(f"Region: {row['region']}")
+        row["description"] = ". ".join(parts) if parts else None
+    return row
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[Tuple[int, object]]:
+    """Yield (line number, record) without loading the file; bad JSON lines yield the error"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, ValueError(f"invalid JSON: {e.msg}")
+    else:
+        raise ValueError(f"Unsupported format {fmt!r}; use csv or jsonl")
+
+def detect_format(filename: str) -> str:
+    return "jsonl" if filename.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+def open_text(binary) -> TextIO:
+    """Wrap a binary stream (an upload) for reading text; utf-8-sig drops a BOM"""
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+# ===== WRITING =====
+
+def _chunks(items: List, size: int) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+_update_statement = (
+    update(_table)
+    .where(_table.c.id == bindparam("dish_id"))
+    .values({column: bindparam(f"new_{column}") for column in COLUMNS})
+)
+
+def _upsert_statement(dialect: str):
+    """INSERT ... ON CONFLICT (name) DO UPDATE, touching only rows whose fields differ"""
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    stmt = dialect_insert(_table)
+    values = [column for column in COLUMNS if column != "name"]
+    return stmt.on_conflict_do_update(
+        index_elements=["name"],
+        set_={column: stmt.excluded[column] for column in values},
+        where=or_(*(_table.c[column].is_distinct_from(stmt.excluded[column]) for column in values))
+    )
+
+def _write_batch(engine: Engine, rows: Dict[str, dict], report: ImportReport):
+    names = list(rows)
+    with engine.begin() as conn:
+        existing = {}
+        for chunk in _chunks(names, LOOKUP_CHUNK):
+            result = conn.execute(
+                select(_table.c.id, *(_table.c[column] for column in COLUMNS)).where(_table.c.name.in_(chunk))
+            )
+            for record in result.mappings():
+                existing[record["name"]] = record
+
+        inserts, updates, updated_names = [], [], []
+        for name, row in rows.items():
+            current = existing.get(name)
+            if current is None:
+                inserts.append(row)
+            elif any(current[column] != row[column] for column in COLUMNS):
+                updates.append({"dish_id": current["id"], **{f"new_{column}": row[column] for column in COLUMNS}})
+                updated_names.append(name)
+            else:
+                report.unchanged += 1
+
+        dialect = conn.dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            # A concurrent import may have added a name since the lookup; the conflict clause absorbs it
+            changed = inserts + [rows[name] for name in updated_names]
+            if changed:
+                conn.execute(_upsert_statement(dialect), changed)
+        else:
+            if inserts:
+                conn.execute(insert(_table), inserts)
+            if updates:
+                conn.execute(_update_statement, updates)
+    report.inserted += len(inserts)
+    report.updated += len(updates)
+
+def import_dishes(
+    engine: Engine,
+    stream: TextIO,
+    fmt: str = "csv",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    on_batch: Optional[Callable[[ImportReport], None]] = None
+) -> ImportReport:
+    """
+    Upsert every record from `stream` into global_dishes, keyed on name
+    Later duplicates of a name within the file win
+    """
+    report = ImportReport()
+    batch: Dict[str, dict] = {}
+
+    def flush():
+        _write_batch(engine, batch, report)
+        batch.clear()
+        report.elapsed = time.perf_counter() - report.started
+        if on_batch:
+            on_batch(report)
+
+    for line_number, record in read_records(stream, fmt):
+        report.processed += 1
+        if isinstance(record, Exception):
+            report.reject(line_number, str(record))
+            continue
+        if not isinstance(record, dict):
+            report.reject(line_number, "record is not an object")
+            continue
+        try:
+            row = prepare_row(record)
+        except ValueError as e:
+            report.reject(line_number, str(e))
+            continue
+        if batch.pop(row["name"], None) is not None:
+            report.duplicates += 1
+        batch[row["name"]] = row
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+    report.elapsed = time.perf_counter() - report.started
+    return report
@@ -0,0 +1,167 @@
+"""
+Relevance-ranked search index over global_dishes
+
+SQLite: an external-content FTS5 table (global_dishes_fts) kept in sync by
+triggers, with prefix indexes so "butt chic" matches "Butter Chicken".
+PostgreSQL: a generated, weighted tsvector column with a GIN index for
+prefix matching, plus a pg_trgm index on name for typo-tolerant matches.
+Both cover name, ingredients, course, state and region, with name weighted
+highest. Other databases fall back to an unranked ILIKE scan.
+"""
+import re
+from typing import List
+from sqlalchemy import inspect, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from . import models
+
+FTS_TABLE = "global_dishes_fts"
+SEARCH_COLUMNS = ("name", "ingredients", "course", "state", "region")
+# bm25 column weights, in SEARCH_COLUMNS order
+SQLITE_WEIGHTS = (10.0, 3.0, 1.0, 1.0, 1.0)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+_SQLITE_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {", ".join(SEARCH_COLUMNS)},
+        content='global_dishes', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON global_dishes BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {", ".join(SEARCH_COLUMNS)})
+        VALUES (new.id, {", ".join(f"new.{c}" for c in SEARCH_COLUMNS)});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON global_dishes BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {", ".join(SEARCH_COLUMNS)})
+        VALUES ('delete', old.id, {", ".join(f"old.{c}" for c in SEARCH_COLUMNS)});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON global_dishes BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {", ".join(SEARCH_COLUMNS)})
+        VALUES ('delete', old.id, {", ".join(f"old.{c}" for c in SEARCH_COLUMNS)});
+        INSERT INTO {FTS_TABLE}(rowid, {", ".join(SEARCH_COLUMNS)})
+        VALUES (new.id, {", ".join(f"new.{c}" for c in SEARCH_COLUMNS)});
+    END
+    """,
+]
+
+_POSTGRES_SCHEMA = [
+    """
+    ALTER TABLE global_dishes ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(ingredients, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(course, '') || ' ' || coalesce(state, '') || ' ' || coalesce(region, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_global_dishes_search_vector ON global_dishes USING gin (search_vector)",
+]
+
+_POSTGRES_TRIGRAM = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_global_dishes_name_trgm ON global_dishes USING gin (name gin_trgm_ops)",
+]
+
+# Set by ensure_dish_search_index(); searches fall back to ILIKE until then
+_available = {"fts": False, "trigram": False}
+
+def ensure_dish_search_index(bind: Engine, rebuild: bool = False):
+    """
+    Create the search index for this database if it is missing
+    Pass rebuild=True after bulk loads that bypassed the sync triggers
+    """
+    dialect = bind.dialect.name
+    if dialect == "sqlite":
+        _ensure_sqlite(bind, rebuild)
+    elif dialect == "postgresql":
+        _ensure_postgres(bind)
+
+def _ensure_sqlite(bind: Engine, rebuild: bool):
+    try:
+        with bind.begin() as conn:
+            created = not inspect(conn).has_table(FTS_TABLE)
+            for statement in _SQLITE_SCHEMA:
+                conn.exec_driver_sql(statement)
+            if created or rebuild:
+                conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        _available["fts"] = True
+    except DBAPIError:
+        # SQLite built without FTS5
+        _available["fts"] = False
+
+def _ensure_postgres(bind: Engine):
+    with bind.begin() as conn:
+        for statement in _POSTGRES_SCHEMA:
+            conn.exec_driver_sql(statement)
+    _available["fts"] = True
+    try:
+        with bind.begin() as conn:
+            for statement in _POSTGRES_TRIGRAM:
+                conn.exec_driver_sql(statement)
+        _available["trigram"] = True
+    except DBAPIError:
+        # pg_trgm needs to be installed by a superuser; search still works without typo tolerance
+        _available["trigram"] = False
+
+def _tokens(query: str) -> List[str]:
+    return _TOKEN.findall(query.lower())
+
+def _starts_with(tokens: List[str]) -> str:
+    # Names that begin with what was typed rank first, as in autocomplete
+    return " ".join(tokens) + "%"
+
+def search_dishes(db: Session, query: str, limit: int = 20) -> List[models.GlobalDish]:
+    """Dishes matching every word of `query` as a prefix, best matches first"""
+    tokens = _tokens(query)
+    if not tokens:
+        return []
+
+    dialect = db.get_bind().dialect.name
+    if _available["fts"] and dialect == "sqlite":
+        return _search_sqlite(db, tokens, limit)
+    if _available["fts"] and dialect == "postgresql":
+        return _search_postgres(db, query, tokens, limit)
+
+    pattern = f"%{query.strip()}%"
+    return db.query(models.GlobalDish).filter(or_(
+        models.GlobalDish.name.ilike(pattern),
+        models.GlobalDish.ingredients.ilike(pattern)
+    )).limit(limit).all()
+
+def _search_sqlite(db: Session, tokens: List[str], limit: int):
+    # Tokens are \w+ only, so quoting them is enough to keep FTS syntax out
+    match = " ".join(f'"{token}"*' for token in tokens)
+    weights = ", ".join(str(weight) for weight in SQLITE_WEIGHTS)
+    statement = text(f"""
+        SELECT global_dishes.* FROM {FTS_TABLE}
+        JOIN global_dishes ON global_dishes.id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH :match
+        ORDER BY lower(global_dishes.name) LIKE :starts_with DESC, bm25({FTS_TABLE}, {weights}), global_dishes.name
+        LIMIT :limit
+    """).bindparams(match=match, starts_with=_starts_with(tokens), limit=limit)
+    return db.query(models.GlobalDish).from_statement(statement).all()
+
+def _search_postgres(db: Session, query: str, tokens: List[str], limit: int):
+    ts_query = " & ".join(f"{token}:*" for token in tokens)
+    if _available["trigram"]:
+        where = "search_vector @@ to_tsquery('simple', :ts_query) OR name % :raw"
+        rank = "ts_rank_cd(search_vector, to_tsquery('simple', :ts_query)) + similarity(name, :raw)"
+    else:
+        where = "search_vector @@ to_tsquery('simple', :ts_query)"
+        rank = "ts_rank_cd(search_vector, to_tsquery('simple', :ts_query))"
+    statement = text(f"""
+        SELECT {", ".join(column.name for column in models.GlobalDish.__table__.columns)}
+        FROM global_dishes
+        WHERE {where}
+        ORDER BY lower(name) LIKE :starts_with DESC, {rank} DESC, name
+        LIMIT :limit
+    """).bindparams(ts_query=ts_query, raw=query.strip(), starts_with=_starts_with(tokens), limit=limit)
+    return db.query(models.GlobalDish).from_statement(statement).all()
@@ -0,0 +1,91 @@
+"""
+In-process event broadcaster that pushes order, kitchen message and table
+updates to every open screen over Server-Sent Events
+"""
+import asyncio
+import json
+from itertools import count
+from typing import Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from .database import after_commit
+
+# Events buffered per client before it is considered too slow to keep up
+CLIENT_QUEUE_SIZE = 100
+
+class Broadcaster:
+    """Fan events out to subscribers, each with its own bounded queue"""
+
+    def __init__(self, queue_size: int = CLIENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event_ids = count(1)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a new client; must be called from the event loop"""
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def publish(self, event_type: str, data):
+        """
+        Queue an event for every subscriber
+        Safe to call from sync route handlers running in the threadpool
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self._subscribers:
+            return
+
+        event = {"id": next(self._event_ids), "type": event_type, "data": jsonable_encoder(data)}
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is loop:
+            self._deliver(event)
+        else:
+            loop.call_soon_threadsafe(self._deliver, event)
+
+    def _deliver(self, event: dict):
+        for queue in list(self._subscribers):
+            if queue.full():
+                # Slow client: drop its backlog and tell it to refetch instead
+                # of letting one tablet hold events for everyone else
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"id": event["id"], "type": "resync", "data": None})
+            else:
+                queue.put_nowait(event)
+
+broadcaster = Broadcaster()
+
+def publish(event_type: str, data, db: Optional[Session] = None):
+    """
+    Publish an event on the application broadcaster
+    With `db`, the event is held until that session's transaction commits
+    """
+    if db is None:
+        broadcaster.publish(event_type, data)
+    else:
+        after_commit(db, lambda: broadcaster.publish(event_type, data))
+
+def publish_model(event_type: str, schema, obj, db: Optional[Session] = None):
+    """Publish an ORM object serialized through its response schema (now, while it is loaded)"""
+    if broadcaster.has_subscribers:
+        publish(event_type, schema.model_validate(obj), db)
+
+def format_sse(event: dict) -> str:
+    """Encode an event in the text/event-stream wire format"""
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
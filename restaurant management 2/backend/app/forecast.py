@@ -0,0 +1,233 @@
+"""
+Ingredient consumption forecasting for the grocery list
+
+Usage history comes from the daily_ingredient_usage rollup (see
+rollups.py) as an ingredients x days array covering the HISTORY_WEEKS
+before today. Each ingredient gets a consumption rate per day of the week:
+a recency-weighted mean over the weeks since it was first used (a week's
+weight halves every HALF_LIFE_WEEKS), so Saturday's rice is forecast from
+past Saturdays.
+
+From the rates and current stock, in one vectorized pass:
+- days_of_cover: whole days until stock runs out at the forecast rates
+- reorder when stock after the supplier lead time would be at or below
+  minimum_stock, ordering enough to cover the lead time plus cover_days
+  and end at minimum_stock
+Ingredients without history fall back to the old rule (order up to twice
+minimum_stock once at or below it).
+
+Past days do not change, so the history and rates are cached per UTC day.
+The first load reads the whole window; after that only the days since the
+last load are read and the array is shifted; main.py warms the first load
+at startup. Stock is read fresh on every request. Usage removed from an
+earlier day (a cancelled order from yesterday) is picked up when the
+process restarts.
+"""
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+import numpy as np
+from sqlalchemy import String, select, type_coerce
+from sqlalchemy.orm import Session
+from . import models
+from .database import SessionLocal
+
+HISTORY_WEEKS = 52
+HISTORY_DAYS = HISTORY_WEEKS * 7
+HALF_LIFE_WEEKS = 4
+# Horizon for days_of_cover; beyond it stock counts as covered
+MAX_COVER_DAYS = 90
+DEFAULT_LEAD_TIME_DAYS = 2
+DEFAULT_COVER_DAYS = 7
+
+class History(NamedTuple):
+    # Days held: [start, end), end being the day it was loaded
+    start: date
+    end: date
+    # Sorted ingredient ids with usage in the window
+    ingredient_ids: np.ndarray
+    # usage[i, d]: quantity used on day start + d
+    usage: np.ndarray
+    # Day offset of each ingredient's first use; 0 if before the window
+    first_use: np.ndarray
+
+class Rates(NamedTuple):
+    day: date
+    ingredient_ids: np.ndarray
+    # rates[i, weekday]: forecast usage per day, Monday = 0
+    rates: np.ndarray
+
+def _load_days(db: Session, start: date, end: date):
+    """(ingredient ids, day offsets from start, quantities) for [start, end)"""
+    # Core rather than Query: ORM row handling triples the cost of a year of rows
+    rows = db.execute(
+        select(
+            models.DailyIngredientUsage.ingredient_id,
+            # Skip per-row date parsing; SQLite returns ISO strings, PostgreSQL dates, numpy parses both
+            type_coerce(models.DailyIngredientUsage.day, String),
+            models.DailyIngredientUsage.quantity
+        ).where(
+            models.DailyIngredientUsage.day >= start,
+            models.DailyIngredientUsage.day < end
+        )
+    ).all()
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    ids, days, quantities = zip(*rows)
+    offsets = (np.array(days, dtype="datetime64[D]") - np.datetime64(start, "D")).astype(np.int64)
+    return np.array(ids, dtype=np.int64), offsets, np.array(quantities, dtype=float)
+
+def advance(db: Session, history: Optional[History], today: date) -> History:
+    """History for the HISTORY_DAYS before `today`, reusing what `history` already holds"""
+    start = today - timedelta(days=HISTORY_DAYS)
+    reusable = history is not None and start <= history.end <= today and history.start <= start
+    load_from = history.end if reusable else start
+    ids, offsets, quantities = _load_days(db, load_from, today)
+    offsets += (load_from - start).days
+
+    old_ids = history.ingredient_ids if reusable else np.empty(0, dtype=np.int64)
+    ingredient_ids = np.union1d(old_ids, ids)
+    usage = np.zeros((len(ingredient_ids), HISTORY_DAYS))
+    first_use = np.full(len(ingredient_ids), HISTORY_DAYS)
+    if reusable and len(old_ids):
+        shift = (start - history.start).days
+        rows = np.searchsorted(ingredient_ids, old_ids)
+        usage[rows, :HISTORY_DAYS - shift] = history.usage[:, shift:]
+        first_use[rows] = np.maximum(history.first_use - shift, 0)
+    if len(ids):
+        rows = np.searchsorted(ingredient_ids, ids)
+        np.add.at(usage, (rows, offsets), quantities)
+        np.minimum.at(first_use, rows, offsets)
+    return History(start, today, ingredient_ids, usage, first_use)
+
+def compute_rates(history: History) -> Rates:
+    count = len(history.ingredient_ids)
+    # Column k of a week is weekday (start + k)
+    usage = history.usage.reshape(count, HISTORY_WEEKS, 7)
+
+    # Weeks before an ingredient's first use say nothing about its rate. A
+    # partly observed first week counts in full, erring slightly low.
+    week_index = np.arange(HISTORY_WEEKS)
+    observed = week_index[None, :] >= (history.first_use // 7)[:, None]
+    age_weeks = HISTORY_WEEKS - 1 - week_index
+    weights = np.where(observed, 0.5 ** (age_weeks / HALF_LIFE_WEEKS)[None, :], 0.0)
+    total_weight = weights.sum(axis=1)[:, None]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        by_position = np.where(total_weight > 0, np.einsum("iwd,iw->id", usage, weights) / total_weight, 0.0)
+    # Reorder columns from "days since start" to Monday..Sunday
+    return Rates(history.end, history.ingredient_ids, np.roll(by_position, history.start.weekday(), axis=1))
+
+class ReorderLine(NamedTuple):
+    ingredient_id: int
+    name: str
+    unit: str
+    supplier: Optional[str]
+    current_stock: float
+    daily_usage: float
+    days_of_cover: Optional[int]
+    needed_quantity: float
+    estimated_cost: Optional[float]
+    forecast_based: bool
+
+class ConsumptionForecast:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._history: Optional[History] = None
+        self._rates: Optional[Rates] = None
+
+    def invalidate(self):
+        with self._lock:
+            self._history = None
+            self._rates = None
+
+    def rates(self, db: Session) -> Rates:
+        today = datetime.utcnow().date()
+        rates = self._rates
+        if rates is None or rates.day != today:
+            with self._lock:
+                if self._rates is None or self._rates.day != today:
+                    self._history = advance(db, self._history, today)
+                    self._rates = compute_rates(self._history)
+                rates = self._rates
+        return rates
+
+    def warm(self):
+        """Load today's rates in the background, e.g. at startup"""
+        with SessionLocal() as db:
+            self.rates(db)
+
+    def reorder(
+        self,
+        db: Session,
+        lead_time_days: int = DEFAULT_LEAD_TIME_DAYS,
+        cover_days: int = DEFAULT_COVER_DAYS
+    ) -> List[ReorderLine]:
+        """Ingredients to order now, with quantities, for the given lead time and cover"""
+        rates = self.rates(db)
+        ingredients = db.query(
+            models.Ingredient.id, models.Ingredient.name, models.Ingredient.unit, models.Ingredient.supplier,
+            models.Ingredient.current_stock, models.Ingredient.minimum_stock, models.Ingredient.cost_per_unit
+        ).order_by(models.Ingredient.id).all()
+        if not ingredients:
+            return []
+
+        ids = np.array([row.id for row in ingredients], dtype=np.int64)
+        stock = np.array([row.current_stock or 0.0 for row in ingredients])
+        minimum = np.array([row.minimum_stock or 0.0 for row in ingredients])
+
+        # Day-of-week rate for each of the next MAX_COVER_DAYS days, per ingredient
+        daily = np.zeros((len(ids), 7))
+        if len(rates.ingredient_ids):
+            positions = np.minimum(np.searchsorted(rates.ingredient_ids, ids), len(rates.ingredient_ids) - 1)
+            has_history = rates.ingredient_ids[positions] == ids
+            daily[has_history] = rates.rates[positions[has_history]]
+        else:
+            has_history = np.zeros(len(ids), dtype=bool)
+        weekdays = (rates.day.weekday() + np.arange(MAX_COVER_DAYS)) % 7
+        demand = daily[:, weekdays]
+        cumulative = demand.cumsum(axis=1)
+
+        # Whole days fully covered by current stock; None when it outlasts the horizon
+        days_of_cover = (cumulative <= np.maximum(stock, 0.0)[:, None]).sum(axis=1)
+        lead_demand = cumulative[:, lead_time_days - 1] if lead_time_days > 0 else np.zeros(len(ids))
+        order_up_to = cumulative[:, min(lead_time_days + cover_days, MAX_COVER_DAYS) - 1] + minimum
+
+        forecast = has_history & (demand.sum(axis=1) > 0)
+        reorder = np.where(forecast, stock - lead_demand <= minimum, stock <= minimum)
+        needed = np.where(forecast, order_up_to - stock, minimum * 2 - stock)
+        needed = np.maximum(needed, 0.0)
+
+        lines = []
+        for i in np.flatnonzero(reorder & (needed > 0)).tolist():
+            row = ingredients[i]
+            lines.append(ReorderLine(
+                ingredient_id=row.id,
+                name=row.name,
+                unit=row.unit,
+                supplier=row.supplier,
+                current_stock=row.current_stock,
+                daily_usage=round(float(demand[i, :7].mean()), 3),
+                days_of_cover=int(days_of_cover[i]) if forecast[i] and days_of_cover[i] < MAX_COVER_DAYS else None,
+                needed_quantity=round(float(needed[i]), 3),
+                estimated_cost=round(row.cost_per_unit * float(needed[i]), 2) if row.cost_per_unit else None,
+                forecast_based=bool(forecast[i]),
+            ))
+        lines.sort(key=lambda line: (line.days_of_cover is None, line.days_of_cover or 0, line.name))
+        return lines
+
+def group_by_supplier(lines: List[ReorderLine]) -> List[Dict]:
+    suppliers: Dict[str, List[ReorderLine]] = {}
+    for line in lines:
+        suppliers.setdefault(line.supplier or "Unassigned", []).append(line)
+    return [
+        {
+            "supplier": supplier,
+            "items": [line._asdict() for line in supplier_lines],
+            "total_items": len(supplier_lines),
+            "estimated_cost": round(sum(line.estimated_cost for line in supplier_lines if line.estimated_cost), 2),
+        }
+        for supplier, supplier_lines in sorted(suppliers.items())
+    ]
+
+consumption_forecast = ConsumptionForecast()
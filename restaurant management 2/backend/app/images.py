@@ -0,0 +1,131 @@
+"""
+Menu image uploads
+
+Uploads are streamed to disk in chunks while being hashed and stored under
+their content hash, so a photo uploaded twice is kept once. Resized,
+recompressed variants are generated from the original by a background task
+after the response has been sent:
+- thumb: 160x160 crop, for cart rows
+- card: 640x480 crop, for menu grids
+- full: at most 1600px on the longest side
+Until the variants exist, an item points at the original for every size.
+"""
+import hashlib
+import os
+import tempfile
+from typing import Dict, NamedTuple
+from fastapi import HTTPException, UploadFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+from . import models
+from .database import SessionLocal
+from .menu_snapshot import menu_snapshot
+
+UPLOAD_DIR = "static/uploads"
+UPLOAD_URL = "/static/uploads"
+CHUNK_SIZE = 1024 * 1024
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+EXTENSIONS = {".jpg": ".jpg", ".jpeg": ".jpg", ".png": ".png", ".webp": ".webp", ".gif": ".gif"}
+# variant -> (width, height, crop to exactly that size)
+VARIANTS = {
+    "thumb": (160, 160, True),
+    "card": (640, 480, True),
+    "full": (1600, 1600, False),
+}
+# MenuItem column holding each variant's URL
+VARIANT_COLUMNS = {"thumb": "thumbnail_url", "card": "card_url", "full": "image_url"}
+JPEG_QUALITY = 82
+
+class StoredImage(NamedTuple):
+    digest: str
+    path: str
+    url: str
+
+def _variant_path(digest: str, variant: str) -> str:
+    return os.path.join(UPLOAD_DIR, f"{digest}_{variant}.jpg")
+
+def variants_ready(digest: str) -> bool:
+    return all(os.path.exists(_variant_path(digest, variant)) for variant in VARIANTS)
+
+def image_urls(stored: StoredImage) -> Dict[str, str]:
+    """MenuItem image columns for an upload: its variants if generated, else the original"""
+    if variants_ready(stored.digest):
+        return {column: f"{UPLOAD_URL}/{stored.digest}_{variant}.jpg" for variant, column in VARIANT_COLUMNS.items()}
+    return {column: stored.url for column in VARIANT_COLUMNS.values()}
+
+def save_upload(upload: UploadFile) -> StoredImage:
+    """
+    Stream an upload to disk under its content hash
+    Blocking; call from a plain def endpoint so it runs in the threadpool
+    """
+    extension = EXTENSIONS.get(os.path.splitext(upload.filename or "")[1].lower())
+    if extension is None:
+        raise HTTPException(status_code=400, detail=f"Image must be one of: {', '.join(sorted(EXTENSIONS))}")
+
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+    try:
+        hasher = hashlib.sha256()
+        size = 0
+        with os.fdopen(fd, "wb") as out:
+            while chunk := upload.file.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Image larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+                hasher.update(chunk)
+                out.write(chunk)
+
+        try:
+            with Image.open(temp_path) as image:
+                image.verify()
+        except (UnidentifiedImageError, OSError, SyntaxError):
+            raise HTTPException(status_code=400, detail="File is not a valid image")
+
+        digest = hasher.hexdigest()[:32]
+        filename = f"{digest}{extension}"
+        path = os.path.join(UPLOAD_DIR, filename)
+        if os.path.exists(path):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return StoredImage(digest, path, f"{UPLOAD_URL}/{filename}")
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """RGB copy with transparency composited onto white, as JPEG has no alpha"""
+    if image.mode in ("RGBA", "LA", "P"):
+        rgba = image.convert("RGBA")
+        background = Image.new("RGB", rgba.size, "white")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+def generate_variants(stored: StoredImage):
+    """Background task: write the variants, then repoint the items still showing the original"""
+    if not variants_ready(stored.digest):
+        with Image.open(stored.path) as original:
+            # Phone photos are stored sideways with an EXIF rotation flag
+            source = _flatten(ImageOps.exif_transpose(original))
+        for variant, (width, height, crop) in VARIANTS.items():
+            if crop:
+                resized = ImageOps.fit(source, (width, height), Image.LANCZOS)
+            else:
+                resized = source.copy()
+                resized.thumbnail((width, height), Image.LANCZOS)
+            # Concurrent uploads of the same photo may race here; the rename keeps each file whole
+            fd, temp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+            with os.fdopen(fd, "wb") as out:
+                resized.save(out, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+            os.replace(temp_path, _variant_path(stored.digest, variant))
+
+    urls = image_urls(stored)
+    with SessionLocal() as db:
+        items = db.query(models.MenuItem).filter(models.MenuItem.image_url == stored.url).all()
+        for item in items:
+            for column, url in urls.items():
+                setattr(item, column, url)
+        if items:
+            db.commit()
+            menu_snapshot.rebuild(db)
@@ -0,0 +1,169 @@
+"""
+Inverted ingredient index over the global dish catalog
+
+GlobalDish.ingredients is free text ("Basmati Rice, Chicken/Mutton, Green
+Chilies"). Each dish is parsed once into ingredient slots, one per
+comma-separated entry, where "/" separates alternatives. Every slot is
+indexed under its normalized name and, for multi-word names, its head word,
+so "green chilies" in a dish is satisfied by "Chili" in the pantry. Which
+dishes are cookable is then answered from the postings of the ingredients
+in stock, without re-reading any dish text.
+
+The index is built on first use. ORM writes to global_dishes mark it stale;
+bulk imports call ingredient_index.invalidate().
+"""
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from . import models
+
+_WORD = re.compile(r"[a-z]+")
+_PARENTHETICAL = re.compile(r"\([^)]*\)")
+
+# Preparation words that do not change which ingredient is meant
+STOP_WORDS = {
+    "a", "and", "as", "chopped", "cut", "diced", "finely", "for", "fresh", "few", "grated",
+    "little", "minced", "of", "optional", "or", "pinch", "required", "sliced", "some",
+    "taste", "to", "whole",
+}
+
+# Head words too generic to stand for the whole name ("tomato paste" is not "ginger paste")
+GENERIC_HEADS = {
+    "flour", "juice", "leaf", "leave", "masala", "oil", "paste", "pod", "powder", "sauce",
+    "seed", "stick", "water",
+}
+
+DishSlot = Tuple[int, int]
+
+def _stem(word: str) -> str:
+    # Crude plural folding; it only has to be consistent, not readable
+    # (chilies/chili -> chili, berries/berry -> berri, tomatoes -> tomato)
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-2]
+    if len(word) > 4 and word.endswith("oes"):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    if len(word) > 3 and word.endswith("y"):
+        return word[:-1] + "i"
+    return word
+
+def normalize_ingredient(text: str) -> str:
+    """'Fresh Green Chilies (chopped)' -> 'green chili'; both sides of a match go through this"""
+    words = _WORD.findall(_PARENTHETICAL.sub(" ", text.lower()))
+    return " ".join(_stem(word) for word in words if word not in STOP_WORDS)
+
+def ingredient_keys(text: str) -> Set[str]:
+    """Index keys for one ingredient name: the full name and, unless generic, its head (last) word"""
+    name = normalize_ingredient(text)
+    if not name:
+        return set()
+    head = name.rsplit(" ", 1)[-1]
+    return {name} if head in GENERIC_HEADS else {name, head}
+
+def parse_slots(ingredients: Optional[str]) -> List[List[str]]:
+    """Split catalog ingredient text into slots of alternative names"""
+    slots = []
+    for entry in (ingredients or "").split(","):
+        alternatives = [alt.strip() for alt in entry.split("/") if normalize_ingredient(alt)]
+        if alternatives:
+            slots.append(alternatives)
+    return slots
+
+class CookableDish(NamedTuple):
+    id: int
+    name: str
+    in_stock: int
+    total: int
+    missing: List[str]
+
+    @property
+    def coverage(self) -> float:
+        return self.in_stock / self.total if self.total else 0.0
+
+class IngredientIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = False
+        self._postings: Dict[str, Set[DishSlot]] = {}
+        self._dishes: Dict[int, Tuple[str, List[str]]] = {}
+
+    def invalidate(self):
+        with self._lock:
+            self._built = False
+
+    def rebuild(self, db: Session, batch_size: int = 5000):
+        postings = defaultdict(set)
+        dishes = {}
+        rows = db.query(models.GlobalDish.id, models.GlobalDish.name, models.GlobalDish.ingredients).yield_per(batch_size)
+        for dish_id, name, text in rows:
+            slots = parse_slots(text)
+            # Slot labels are kept for the "missing" list in responses
+            dishes[dish_id] = (name, [" / ".join(alternatives) for alternatives in slots])
+            for slot_index, alternatives in enumerate(slots):
+                for alternative in alternatives:
+                    for key in ingredient_keys(alternative):
+                        postings[key].add((dish_id, slot_index))
+        with self._lock:
+            self._postings = dict(postings)
+            self._dishes = dishes
+            self._built = True
+
+    def ensure_built(self, db: Session):
+        if not self._built:
+            self.rebuild(db)
+
+    def cookable(self, stock_names: Iterable[str], limit: int = 20, min_coverage: float = 0.0) -> List[CookableDish]:
+        """Dishes ranked by the share of their ingredient slots covered by `stock_names`"""
+        stock_keys = set()
+        for name in stock_names:
+            stock_keys |= ingredient_keys(name)
+
+        with self._lock:
+            covered: Set[DishSlot] = set()
+            for key in stock_keys:
+                covered |= self._postings.get(key, set())
+            dishes = self._dishes
+
+        slots_by_dish = defaultdict(set)
+        for dish_id, slot_index in covered:
+            slots_by_dish[dish_id].add(slot_index)
+
+        results = []
+        for dish_id, slot_indexes in slots_by_dish.items():
+            name, slot_labels = dishes[dish_id]
+            dish = CookableDish(
+                id=dish_id,
+                name=name,
+                in_stock=len(slot_indexes),
+                total=len(slot_labels),
+                missing=[label for i, label in enumerate(slot_labels) if i not in slot_indexes],
+            )
+            if dish.coverage >= min_coverage:
+                results.append(dish)
+
+        results.sort(key=lambda dish: (-dish.coverage, -dish.in_stock, dish.name))
+        return results[:limit]
+
+ingredient_index = IngredientIndex()
+
+_STALE = "ingredient_index_stale"
+
+@event.listens_for(Session, "after_flush")
+def _note_catalog_writes(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models.GlobalDish):
+            session.info[_STALE] = True
+            return
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop(_STALE, False):
+        ingredient_index.invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop(_STALE, None)
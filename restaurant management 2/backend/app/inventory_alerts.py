@@ -0,0 +1,93 @@
+"""
+Low-stock alerts detected at write time
+
+Every stock write (usage, batch usage, recipe deductions and their reversal,
+restocks and threshold edits through update_ingredient) passes the new
+levels of the ingredients it touched to sync(). Ingredients that crossed
+down to minimum_stock get a row in low_stock_alerts and an
+inventory.alert_raised event; ingredients back above it lose their row and
+send inventory.alert_cleared. Events go out after commit, so screens never
+see an alert for a rolled-back write.
+
+Reading alerts is then a join from the alert rows, O(active alerts) rather
+than a scan of every ingredient. rebuild() recomputes the table from
+scratch at startup, covering databases that predate it and any writes made
+outside the API.
+"""
+from datetime import datetime
+from typing import Mapping
+from sqlalchemy import DateTime, delete, insert, literal, select
+from sqlalchemy.orm import Session
+from . import models
+from .events import publish
+
+def is_low(level) -> bool:
+    """Same rule as the old read-time query: NULL stock or threshold never alerts"""
+    return level.current_stock is not None and level.minimum_stock is not None and level.current_stock <= level.minimum_stock
+
+def _event(ingredient_id: int, level) -> dict:
+    return {
+        "ingredient_id": ingredient_id,
+        "name": level.name,
+        "unit": level.unit,
+        "current_stock": level.current_stock,
+        "minimum_stock": level.minimum_stock,
+    }
+
+def sync(db: Session, levels: Mapping[int, object]):
+    """
+    Raise or clear alerts for ingredients whose stock or threshold just changed
+    `levels` maps ingredient id to anything with name, unit, current_stock and
+    minimum_stock: stock.StockLevel rows or Ingredient objects
+    """
+    if not levels:
+        return
+    active = set(db.scalars(
+        select(models.LowStockAlert.ingredient_id).where(models.LowStockAlert.ingredient_id.in_(levels))
+    ))
+    low = {ingredient_id for ingredient_id, level in levels.items() if is_low(level)}
+    raised = sorted(low - active)
+    cleared = sorted(active - low)
+
+    if raised:
+        now = datetime.utcnow()
+        db.execute(insert(models.LowStockAlert), [{"ingredient_id": ingredient_id, "raised_at": now} for ingredient_id in raised])
+    if cleared:
+        db.execute(
+            delete(models.LowStockAlert)
+            .where(models.LowStockAlert.ingredient_id.in_(cleared))
+            .execution_options(synchronize_session=False)
+        )
+    for ingredient_id in raised:
+        publish("inventory.alert_raised", _event(ingredient_id, levels[ingredient_id]), db)
+    for ingredient_id in cleared:
+        publish("inventory.alert_cleared", _event(ingredient_id, levels[ingredient_id]), db)
+
+def clear(db: Session, ingredient_id: int):
+    """Drop a deleted ingredient's alert (SQLite does not enforce the cascade by default)"""
+    removed = db.execute(
+        delete(models.LowStockAlert)
+        .where(models.LowStockAlert.ingredient_id == ingredient_id)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if removed:
+        publish("inventory.alert_cleared", {"ingredient_id": ingredient_id}, db)
+
+def rebuild(db: Session):
+    """Recompute the alert table from current stock, keeping raised_at for alerts still active"""
+    low = select(models.Ingredient.id).where(models.Ingredient.current_stock <= models.Ingredient.minimum_stock)
+    db.execute(
+        delete(models.LowStockAlert)
+        .where(models.LowStockAlert.ingredient_id.not_in(low))
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        insert(models.LowStockAlert).from_select(
+            ["ingredient_id", "raised_at"],
+            select(models.Ingredient.id, literal(datetime.utcnow(), DateTime)).where(
+                models.Ingredient.id.in_(low),
+                models.Ingredient.id.not_in(select(models.LowStockAlert.ingredient_id))
+            )
+        )
+    )
+    db.commit()
@@ -0,0 +1,26 @@
+"""
+Eager-loading plans keyed by response schema
+
+Every response model that nests relationships declares here, once, which
+relationships serializing it will touch. Routers and CRUD helpers apply the
+plan with eager() so a list response costs a fixed number of queries instead
+of one lazy load per row.
+"""
+from sqlalchemy.orm import selectinload
+from . import models, schemas
+
+LOAD_PLANS = {
+    schemas.MenuItem: (selectinload(models.MenuItem.ingredients),),
+    schemas.Order: (
+        selectinload(models.Order.lines)
+        .selectinload(models.OrderLine.menu_item)
+        .selectinload(models.MenuItem.ingredients),
+    ),
+}
+
+def eager(query, schema):
+    """Apply the load plan for `schema` to a Query or select()"""
+    options = LOAD_PLANS.get(schema)
+    if not options:
+        return query
+    return query.options(*options)
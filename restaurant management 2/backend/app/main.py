@@ -1,13 +1,52 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from app.database import engine, Base
-from app.routers import menu, tables, orders, billing, analytics, dishes, inventory, auth, chef
+from app.database import engine, async_engine, Base, SessionLocal, create_missing_indexes
+from app.pagination import NEXT_CURSOR_HEADER
+from app.versioning import ensure_resource_versions
+from app.rollups import backfill_if_empty
+from app import inventory_alerts
+from app.dish_search import ensure_dish_search_index
+from app.autocomplete import autocomplete
+from app.forecast import consumption_forecast
+from app.monitoring import loop_lag_monitor
+from app.compression import CompressionMiddleware
+from app.sqlite_profile import WriteAdmissionMiddleware
+from app.static_files import CachedStaticFiles, precompress
+from app.routers import menu, tables, orders, billing, analytics, dishes, inventory, auth, chef, events, monitoring, search
+import asyncio
 import os
 
 Base.metadata.create_all(bind=engine)
+create_missing_indexes()
+ensure_resource_versions()
+ensure_dish_search_index(engine)
 
-app = FastAPI(title="Restaurant Management API")
+with SessionLocal() as db:
+    backfill_if_empty(db)
+    inventory_alerts.rebuild(db)
+    autocomplete.rebuild(db)
+
+# orjson encodes large lists (orders, menu, dishes) several times faster than json
+app = FastAPI(title="Restaurant Management API", default_response_class=ORJSONResponse)
+
+@app.on_event("startup")
+async def start_monitoring():
+    loop_lag_monitor.start()
+
+@app.on_event("startup")
+async def warm_forecast():
+    # A year of usage history takes seconds to load; keep it off the first grocery-list request
+    asyncio.get_running_loop().run_in_executor(None, consumption_forecast.warm)
+
+@app.on_event("shutdown")
+async def shutdown():
+    await loop_lag_monitor.stop()
+    await async_engine.dispose()
+
+# Passes straight through unless SQLITE_PROFILE=production
+app.add_middleware(WriteAdmissionMiddleware)
+app.add_middleware(CompressionMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,12 +54,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Mount static files
 static_dir = "static"
 os.makedirs(static_dir, exist_ok=True)
-app.mount("/static", StaticFiles(directory=static_dir), name="static")
+precompress(static_dir)
+app.mount("/static", CachedStaticFiles(directory=static_dir), name="static")
 
 app.include_router(auth.router)
 app.include_router(menu.router)
@@ -31,6 +72,9 @@ app.include_router(analytics.router)
 app.include_router(dishes.router)
 app.include_router(inventory.router)
 app.include_router(chef.router)
+app.include_router(events.router)
+app.include_router(monitoring.router)
+app.include_router(search.router)
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,60 @@
+"""
+Precompiled public menu snapshot
+
+The customer menu (GET /api/menu/) is read by every QR-code scan but only
+changes when staff edit the menu or 86 a dish. It is serialized once into
+JSON bytes (plus a pre-gzipped copy) and rebuilt by the menu write paths,
+so a read is a memory copy instead of a query plus Pydantic serialization.
+Snapshots are tagged with the menu ETag from versioning.py, so a worker that
+did not see a write itself rebuilds on its next read.
+"""
+import gzip
+import threading
+from typing import List, NamedTuple, Optional
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+from . import crud, schemas, versioning
+from .database import SessionLocal, after_commit
+
+_menu_adapter = TypeAdapter(List[schemas.MenuItem])
+
+class Snapshot(NamedTuple):
+    version: int
+    etag: str
+    body: bytes
+    gzip_body: bytes
+
+class MenuSnapshot:
+    def __init__(self):
+        self._current: Optional[Snapshot] = None
+        self._lock = threading.Lock()
+
+    def rebuild(self, db: Session) -> Snapshot:
+        """Re-serialize the menu; call after a menu write has committed"""
+        with self._lock:
+            # Read the version before the items so a concurrent write can
+            # only make the snapshot newer than its tag, never older
+            versions = versioning.current_versions(db, "menu")
+            etag = versioning.make_etag(versions, "menu")
+            items = crud.get_menu_items(db)
+            body = _menu_adapter.dump_json(_menu_adapter.validate_python(items, from_attributes=True))
+            # Swap in one assignment so readers never mix versions
+            self._current = Snapshot(versions.get("menu", 0), etag, body, gzip.compress(body, compresslevel=6))
+            return self._current
+
+    def rebuild_after_commit(self, db: Session):
+        """Rebuild from a fresh session once the menu write in `db` commits"""
+        after_commit(db, self._rebuild_committed)
+
+    def _rebuild_committed(self):
+        with SessionLocal() as db:
+            self.rebuild(db)
+
+    def get(self, db: Session, etag: str) -> Snapshot:
+        """Return the snapshot for `etag`, rebuilding it if the menu has moved on"""
+        current = self._current
+        if current is None or current.etag != etag:
+            return self.rebuild(db)
+        return current
+
+menu_snapshot = MenuSnapshot()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime, Table, Text, Date, Enum
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime, Table, Text, Date, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, date
 from .database import Base
@@ -46,7 +46,8 @@ class GlobalDish(Base):
     __tablename__ = "global_dishes"
     
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False, index=True)
+    # Natural key for dish_import.py's upsert; existing databases get the unique index from update_schema.py
+    name = Column(String, nullable=False, unique=True, index=True)
     ingredients = Column(Text, nullable=True)  # Comma-separated or JSON
     diet = Column(String, nullable=True)  # Vegetarian, Non-Vegetarian
     prep_time = Column(Integer, nullable=True)  # minutes
@@ -66,7 +67,10 @@ class MenuItem(Base):
     price = Column(Float, nullable=False)
     description = Column(String, nullable=True)
     image_url = Column(String, nullable=True)
+    card_url = Column(String, nullable=True)  # resized variants of image_url
+    thumbnail_url = Column(String, nullable=True)
     is_available = Column(Boolean, default=True)
+    auto_unavailable = Column(Boolean, default=False)  # 86'd by recipe_matrix when out of stock
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # New fields for ingredients integration
@@ -89,7 +93,7 @@ class Ingredient(Base):
     unit = Column(String, default='kg')  # kg, liter, piece, etc.
     current_stock = Column(Float, default=0.0)
     minimum_stock = Column(Float, default=5.0)  # Low stock threshold
-    expiry_date = Column(Date, nullable=True)
+    expiry_date = Column(Date, nullable=True, index=True)  # Range-scanned by the expiring-soon alert
     cost_per_unit = Column(Float, nullable=True)
     supplier = Column(String, nullable=True)
     last_restocked = Column(DateTime, nullable=True)
@@ -100,6 +104,13 @@ class Ingredient(Base):
 
 class IngredientUsage(Base):
     __tablename__ = "ingredient_usage"
+    __table_args__ = (
+        # Keyset pagination indexes (see pagination.py)
+        Index("ix_ingredient_usage_used_at_id", "used_at", "id"),
+        Index("ix_ingredient_usage_ingredient_used_at", "ingredient_id", "used_at", "id"),
+        # Recipe deductions are looked up per order to reverse them
+        Index("ix_ingredient_usage_order_id", "order_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     ingredient_id = Column(Integer, ForeignKey('ingredients.id'), nullable=False)
@@ -109,6 +120,7 @@ class IngredientUsage(Base):
     used_by = Column(String, nullable=True)  # Staff/Chef name
     used_at = Column(DateTime, default=datetime.utcnow)
     notes = Column(String, nullable=True)
+    automatic = Column(Boolean, default=False)  # Deducted from the recipe when the order started
     
     # Relationships
     ingredient = relationship("Ingredient", back_populates="usage_logs")
@@ -126,6 +138,12 @@ class RestaurantTable(Base):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Keyset pagination indexes (see pagination.py)
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_status_created_at", "status", "created_at", "id"),
+        Index("ix_orders_table_created_at", "table_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     table_id = Column(Integer, ForeignKey("tables.id"), nullable=False)
@@ -142,9 +160,21 @@ class Order(Base):
     
     table = relationship("RestaurantTable", back_populates="orders")
     items = relationship("MenuItem", secondary=order_items, backref="orders")
+    lines = relationship("OrderLine", viewonly=True)
+
+class OrderLine(Base):
+    """One order_items row: a menu item on an order with its quantity"""
+    __table__ = order_items
+    
+    menu_item = relationship("MenuItem", viewonly=True)
 
 class Bill(Base):
     __tablename__ = "bills"
+    __table_args__ = (
+        # Keyset pagination indexes (see pagination.py)
+        Index("ix_bills_created_at_id", "created_at", "id"),
+        Index("ix_bills_paid_created_at", "paid", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
@@ -152,8 +182,47 @@ class Bill(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     paid = Column(Boolean, default=False)
 
+class DailySales(Base):
+    """Per-day order and revenue totals, maintained on write (see rollups.py)"""
+    __tablename__ = "daily_sales"
+    
+    day = Column(Date, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)  # Orders created that day
+    completed_count = Column(Integer, nullable=False, default=0)  # ...of which are Completed
+    revenue = Column(Float, nullable=False, default=0.0)  # Paid bills issued that day
+    paid_bill_count = Column(Integer, nullable=False, default=0)
+
+class DailyItemSales(Base):
+    """Per-day, per-menu-item sales, maintained on write (see rollups.py)"""
+    __tablename__ = "daily_item_sales"
+    
+    day = Column(Date, primary_key=True)
+    menu_item_id = Column(Integer, ForeignKey("menu_items.id", ondelete="CASCADE"), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)  # Orders containing the item
+    quantity = Column(Integer, nullable=False, default=0)
+
+class DailyIngredientUsage(Base):
+    """Per-day, per-ingredient usage totals, maintained on write (see rollups.py)"""
+    __tablename__ = "daily_ingredient_usage"
+    
+    day = Column(Date, primary_key=True)
+    ingredient_id = Column(Integer, ForeignKey("ingredients.id"), primary_key=True)
+    quantity = Column(Float, nullable=False, default=0.0)
+
+class LowStockAlert(Base):
+    """An ingredient currently at or below minimum stock, maintained on write (see inventory_alerts.py)"""
+    __tablename__ = "low_stock_alerts"
+    
+    ingredient_id = Column(Integer, ForeignKey("ingredients.id", ondelete="CASCADE"), primary_key=True)
+    raised_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
 class KitchenMessage(Base):
     __tablename__ = "kitchen_messages"
+    __table_args__ = (
+        # Keyset pagination indexes (see pagination.py)
+        Index("ix_kitchen_messages_created_at_id", "created_at", "id"),
+        Index("ix_kitchen_messages_recipient_created_at", "recipient", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=True)
@@ -179,3 +248,11 @@ class ShiftHandover(Base):
     notes = Column(Text, nullable=True)  # General notes
     created_at = Column(DateTime, default=datetime.utcnow)
 
+
+class ResourceVersion(Base):
+    """Write counter per resource collection, used for ETags (see versioning.py)"""
+    __tablename__ = "resource_versions"
+    
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
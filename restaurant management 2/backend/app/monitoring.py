@@ -0,0 +1,68 @@
+"""
+Event-loop lag monitor
+
+A background task sleeps for a fixed interval and records how late it wakes
+up. Anything that blocks the event loop (a synchronous query or bcrypt call
+inside an async handler) shows up directly as lag, because every other
+request on the worker is stalled for that long too.
+"""
+import asyncio
+from collections import deque
+from typing import Optional
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = 0.1, window: int = 600, stall_threshold: float = 0.1):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self._samples = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+        self.max_lag = 0.0
+        self.stalls = 0
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self._samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= self.stall_threshold:
+                self.stalls += 1
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        samples = sorted(self._samples)
+
+        def percentile(fraction):
+            if not samples:
+                return 0.0
+            return round(samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000, 2)
+
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_ms": self.interval * 1000,
+            "samples": len(samples),
+            "current_ms": round(self._samples[-1] * 1000, 2) if self._samples else 0.0,
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 2) if samples else 0.0,
+            "p50_ms": percentile(0.5),
+            "p99_ms": percentile(0.99),
+            "window_max_ms": round(samples[-1] * 1000, 2) if samples else 0.0,
+            "max_ms": round(self.max_lag * 1000, 2),
+            "stalls": self.stalls,
+            "stall_threshold_ms": self.stall_threshold * 1000,
+        }
+
+loop_lag_monitor = LoopLagMonitor()
@@ -0,0 +1,82 @@
+"""
+Keyset (cursor) pagination over (timestamp, id) for history list endpoints
+
+Pages are fetched with a WHERE clause on the last row seen instead of OFFSET,
+so every page costs the same index range scan no matter how deep it is.
+The cursor handed to clients is opaque; the next one is returned in the
+X-Next-Cursor response header so list bodies keep their existing shape.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    payload = json.dumps([timestamp.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    """Return (timestamp, id) from a cursor, or raise 400 if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset(query, timestamp_column, id_column, cursor: Optional[str] = None,
+           limit: int = DEFAULT_PAGE_SIZE, descending: bool = True):
+    """
+    Add keyset filtering, ordering and limit to a Query or select()
+    One extra row is fetched so page() can tell whether another page exists
+    """
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        if descending:
+            query = query.filter(or_(
+                timestamp_column < timestamp,
+                and_(timestamp_column == timestamp, id_column < row_id)
+            ))
+        else:
+            query = query.filter(or_(
+                timestamp_column > timestamp,
+                and_(timestamp_column == timestamp, id_column > row_id)
+            ))
+
+    if descending:
+        query = query.order_by(timestamp_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(timestamp_column.asc(), id_column.asc())
+
+    return query.limit(min(limit, MAX_PAGE_SIZE) + 1)
+
+def page(rows, timestamp_column, id_column, limit: int = DEFAULT_PAGE_SIZE):
+    """Trim the look-ahead row and return (rows, next_cursor)"""
+    limit = min(limit, MAX_PAGE_SIZE)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, timestamp_column.key), getattr(last, id_column.key))
+
+def paginate(query, timestamp_column, id_column, cursor: Optional[str] = None,
+             limit: int = DEFAULT_PAGE_SIZE, descending: bool = True):
+    """Run a keyset-paginated Query and return (rows, next_cursor)"""
+    rows = keyset(query, timestamp_column, id_column, cursor, limit, descending).all()
+    return page(rows, timestamp_column, id_column, limit)
+
+async def paginate_async(db, statement, timestamp_column, id_column, cursor: Optional[str] = None,
+                         limit: int = DEFAULT_PAGE_SIZE, descending: bool = True):
+    """paginate() for a select() run on an AsyncSession"""
+    result = await db.execute(keyset(statement, timestamp_column, id_column, cursor, limit, descending))
+    return page(result.scalars().all(), timestamp_column, id_column, limit)
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
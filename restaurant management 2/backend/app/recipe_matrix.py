@@ -0,0 +1,209 @@
+"""
+Menu-wide "can prepare" matrix
+
+Recipes (menu_item_ingredients) are loaded once into a dense menu item x
+ingredient matrix of required quantities. Servings possible for every menu
+item is then one vectorized pass against the stock vector: the minimum over
+each row of floor(stock / required), skipping ingredients the dish does not
+use. Items without a recipe have no limit (None).
+
+The matrix is rebuilt on first use after ORM writes to menu items,
+ingredients or recipes; bulk Core writes call recipe_matrix.invalidate().
+Stock is read fresh for each pass (one narrow query), so stock writes from
+any worker are always reflected.
+
+With AUTO_86=true, every stock write re-checks the dishes using the changed
+ingredients inside the same transaction: a dish that can no longer be made
+is marked unavailable, and a dish 86'd this way comes back once its stock
+does. Dishes a chef 86'd by hand are left alone.
+"""
+import os
+import threading
+from typing import Iterable, List, NamedTuple, Optional
+import numpy as np
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session
+from . import models
+from .menu_snapshot import menu_snapshot
+from .versioning import bump
+
+AUTO_86 = os.getenv("AUTO_86", "false").lower() == "true"
+# Absorbs float error, so 0.3 / 0.1 servings count as 3
+_EPSILON = 1e-9
+
+class Servings(NamedTuple):
+    menu_item_id: int
+    name: str
+    servings: Optional[int]
+    limiting_ingredient: Optional[str]
+    is_available: bool
+    # Ingredients in the recipe, and those short of one serving
+    ingredient_count: int
+    missing: List[str]
+
+class _Recipes(NamedTuple):
+    item_ids: np.ndarray
+    item_names: List[str]
+    ingredient_ids: np.ndarray
+    ingredient_names: List[str]
+    # required[i, j]: quantity of ingredient j per serving of item i, 0 if unused
+    required: np.ndarray
+
+class _Pass(NamedTuple):
+    recipes: _Recipes
+    # Servings per item; inf for items without a recipe
+    possible: np.ndarray
+    # Column of each item's limiting ingredient
+    limiting: np.ndarray
+    # short[i, j]: item i uses ingredient j and stock is below one serving's worth
+    short: np.ndarray
+
+def _positions(ids: np.ndarray, wanted) -> np.ndarray:
+    """Index of each wanted id in the sorted `ids`, -1 where absent"""
+    wanted = np.asarray(wanted, dtype=np.int64)
+    if not len(ids):
+        return np.full(len(wanted), -1)
+    positions = np.minimum(np.searchsorted(ids, wanted), len(ids) - 1)
+    return np.where(ids[positions] == wanted, positions, -1)
+
+class RecipeMatrix:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._recipes: Optional[_Recipes] = None
+
+    def invalidate(self):
+        with self._lock:
+            self._recipes = None
+
+    def rebuild(self, db: Session) -> _Recipes:
+        items = db.execute(select(models.MenuItem.id, models.MenuItem.name).order_by(models.MenuItem.id)).all()
+        ingredients = db.execute(select(models.Ingredient.id, models.Ingredient.name).order_by(models.Ingredient.id)).all()
+        links = db.execute(select(
+            models.menu_item_ingredients.c.menu_item_id,
+            models.menu_item_ingredients.c.ingredient_id,
+            models.menu_item_ingredients.c.quantity_required
+        )).all()
+
+        item_ids = np.array([item_id for item_id, _ in items], dtype=np.int64)
+        ingredient_ids = np.array([ingredient_id for ingredient_id, _ in ingredients], dtype=np.int64)
+        required = np.zeros((len(item_ids), len(ingredient_ids)))
+        if links:
+            rows = _positions(item_ids, [item_id for item_id, _, _ in links])
+            columns = _positions(ingredient_ids, [ingredient_id for _, ingredient_id, _ in links])
+            # NULL means the column default of one unit
+            quantities = np.array([1.0 if quantity is None else quantity for _, _, quantity in links])
+            keep = (rows >= 0) & (columns >= 0)
+            required[rows[keep], columns[keep]] = np.maximum(quantities[keep], 0.0)
+
+        recipes = _Recipes(item_ids, [name for _, name in items], ingredient_ids, [name for _, name in ingredients], required)
+        with self._lock:
+            self._recipes = recipes
+        return recipes
+
+    def ensure_built(self, db: Session) -> _Recipes:
+        recipes = self._recipes
+        return recipes if recipes is not None else self.rebuild(db)
+
+    def _compute(self, db: Session) -> _Pass:
+        recipes = self.ensure_built(db)
+        stock = np.zeros(len(recipes.ingredient_ids))
+        rows = db.execute(select(models.Ingredient.id, models.Ingredient.current_stock)).all()
+        if rows:
+            columns = _positions(recipes.ingredient_ids, [ingredient_id for ingredient_id, _ in rows])
+            levels = np.array([level or 0.0 for _, level in rows])
+            keep = columns >= 0
+            stock[columns[keep]] = levels[keep]
+
+        required = recipes.required
+        if required.shape[1] == 0:
+            count = len(recipes.item_ids)
+            return _Pass(recipes, np.full(count, np.inf), np.zeros(count, dtype=np.int64), np.zeros((count, 0), dtype=bool))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(required > 0, np.maximum(stock, 0.0) / required, np.inf)
+        limiting = ratio.argmin(axis=1)
+        possible = np.floor(ratio[np.arange(len(ratio)), limiting] + _EPSILON)
+        return _Pass(recipes, possible, limiting, ratio + _EPSILON < 1)
+
+    def servings(self, db: Session) -> List[Servings]:
+        """Servings possible for every menu item with current stock"""
+        result = self._compute(db)
+        recipes = result.recipes
+        available = dict(db.execute(select(models.MenuItem.id, models.MenuItem.is_available)).all())
+        ingredient_counts = (recipes.required > 0).sum(axis=1).tolist()
+        servings = []
+        for i, item_id in enumerate(recipes.item_ids.tolist()):
+            limited = bool(np.isfinite(result.possible[i]))
+            servings.append(Servings(
+                menu_item_id=item_id,
+                name=recipes.item_names[i],
+                servings=int(result.possible[i]) if limited else None,
+                limiting_ingredient=recipes.ingredient_names[result.limiting[i]] if limited else None,
+                is_available=bool(available.get(item_id, False)),
+                ingredient_count=ingredient_counts[i],
+                # Only dishes that cannot be made are short of anything
+                missing=[recipes.ingredient_names[j] for j in np.flatnonzero(result.short[i]).tolist()] if result.possible[i] == 0 else [],
+            ))
+        return servings
+
+    def refresh_availability(self, db: Session, ingredient_ids: Iterable[int]):
+        """With AUTO_86 on, 86 or restore the dishes using these ingredients, in the caller's transaction"""
+        if not AUTO_86:
+            return
+        result = self._compute(db)
+        recipes = result.recipes
+        columns = _positions(recipes.ingredient_ids, list(ingredient_ids))
+        columns = columns[columns >= 0]
+        if not len(columns):
+            return
+        affected = (recipes.required[:, columns] > 0).any(axis=1)
+        unmakeable = recipes.item_ids[affected & (result.possible == 0)].tolist()
+        makeable = recipes.item_ids[affected & (result.possible > 0)].tolist()
+
+        changed = 0
+        if unmakeable:
+            changed += db.execute(
+                update(models.MenuItem)
+                .where(models.MenuItem.id.in_(unmakeable), models.MenuItem.is_available.is_(True))
+                .values(is_available=False, auto_unavailable=True)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        if makeable:
+            changed += db.execute(
+                update(models.MenuItem)
+                .where(models.MenuItem.id.in_(makeable), models.MenuItem.auto_unavailable.is_(True))
+                .values(is_available=True, auto_unavailable=False)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        if changed:
+            bump(db, "menu")
+            menu_snapshot.rebuild_after_commit(db)
+
+recipe_matrix = RecipeMatrix()
+
+_STALE = "recipe_matrix_stale"
+
+@event.listens_for(Session, "after_flush")
+def _note_recipe_writes(session, flush_context):
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, (models.MenuItem, models.Ingredient)):
+            session.info[_STALE] = True
+            return
+    for obj in session.dirty:
+        # Stock and availability changes do not touch the matrix
+        if isinstance(obj, models.MenuItem):
+            state = inspect(obj)
+            if state.attrs.name.history.has_changes() or state.attrs.ingredients.history.has_changes():
+                session.info[_STALE] = True
+                return
+        elif isinstance(obj, models.Ingredient) and inspect(obj).attrs.name.history.has_changes():
+            session.info[_STALE] = True
+            return
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop(_STALE, False):
+        recipe_matrix.invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop(_STALE, None)
@@ -0,0 +1,190 @@
+"""
+Daily sales rollups maintained at write time
+
+daily_sales holds per-day order counts, completed counts and paid revenue;
+daily_item_sales holds per-day, per-menu-item quantities and order counts
+(no revenue: order lines do not record the price they were sold at);
+daily_ingredient_usage holds per-day, per-ingredient usage for the
+consumption forecast. The order, bill and stock write paths call the
+record_* helpers inside their own transaction, each applying an atomic
+INSERT ... ON CONFLICT DO UPDATE increment, so the dashboard reads O(days)
+rollup rows instead of aggregating every order ever placed.
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, Tuple
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+from . import models
+
+def _upsert_add(db: Session, model, rows: Iterable[dict], key_columns: Tuple[str, ...]):
+    """Add each row's non-key values to the existing rollup row, creating it if missing"""
+    rows = list(rows)
+    if not rows:
+        return
+    value_columns = [column for column in rows[0] if column not in key_columns]
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(model).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={column: getattr(model, column) + getattr(stmt.excluded, column) for column in value_columns}
+        )
+        db.execute(stmt)
+        return
+
+    for row in rows:
+        result = db.execute(
+            update(model)
+            .where(*(getattr(model, column) == row[column] for column in key_columns))
+            .values({column: getattr(model, column) + row[column] for column in value_columns})
+        )
+        if result.rowcount == 0:
+            db.execute(insert(model).values(row))
+
+def _add_day(db: Session, day: date, order_count=0, completed_count=0, revenue=0.0, paid_bill_count=0):
+    _upsert_add(db, models.DailySales, [{
+        "day": day,
+        "order_count": order_count,
+        "completed_count": completed_count,
+        "revenue": revenue,
+        "paid_bill_count": paid_bill_count,
+    }], ("day",))
+
+def _add_items(db: Session, day: date, lines, sign: int = 1):
+    """lines: iterable of (menu_item, quantity)"""
+    _upsert_add(db, models.DailyItemSales, [
+        {
+            "day": day,
+            "menu_item_id": menu_item.id,
+            "order_count": sign,
+            "quantity": sign * quantity,
+        }
+        for menu_item, quantity in lines
+    ], ("day", "menu_item_id"))
+
+def _add_ingredient_usage(db: Session, usage: Iterable[Tuple[date, int, float]], sign: int = 1):
+    """usage: iterable of (day, ingredient_id, quantity); repeated keys are summed first"""
+    totals = defaultdict(float)
+    for day, ingredient_id, quantity in usage:
+        totals[(day, ingredient_id)] += quantity
+    _upsert_add(db, models.DailyIngredientUsage, [
+        {"day": day, "ingredient_id": ingredient_id, "quantity": sign * quantity}
+        for (day, ingredient_id), quantity in totals.items()
+    ], ("day", "ingredient_id"))
+
+# ===== WRITE-PATH HOOKS =====
+
+def record_order_created(db: Session, order: models.Order, lines):
+    """Call after the order has been flushed; lines is [(menu_item, quantity)]"""
+    day = order.created_at.date()
+    _add_day(db, day, order_count=1, completed_count=1 if order.status == "Completed" else 0)
+    _add_items(db, day, lines)
+
+def record_order_status(db: Session, order: models.Order, old_status: str):
+    was_completed = old_status == "Completed"
+    is_completed = order.status == "Completed"
+    if was_completed != is_completed:
+        _add_day(db, order.created_at.date(), completed_count=1 if is_completed else -1)
+
+def record_order_deleted(db: Session, order: models.Order):
+    day = order.created_at.date()
+    _add_day(db, day, order_count=-1, completed_count=-1 if order.status == "Completed" else 0)
+    _add_items(db, day, [(line.menu_item, line.quantity) for line in order.lines if line.menu_item], sign=-1)
+
+def record_bill_payment(db: Session, bill: models.Bill, was_paid: bool):
+    if bool(was_paid) != bool(bill.paid):
+        sign = 1 if bill.paid else -1
+        _add_day(db, bill.created_at.date(), revenue=sign * bill.total_amount, paid_bill_count=sign)
+
+def record_bill_deleted(db: Session, bill: models.Bill):
+    if bill.paid:
+        _add_day(db, bill.created_at.date(), revenue=-bill.total_amount, paid_bill_count=-1)
+
+def record_ingredient_usage(db: Session, logs: Iterable[models.IngredientUsage]):
+    _add_ingredient_usage(db, ((log.used_at.date(), log.ingredient_id, log.quantity_used) for log in logs))
+
+def record_ingredient_usage_removed(db: Session, usage: Iterable[Tuple[datetime, int, float]]):
+    """usage: (used_at, ingredient_id, quantity) of usage rows being deleted"""
+    _add_ingredient_usage(db, ((used_at.date(), ingredient_id, quantity) for used_at, ingredient_id, quantity in usage), sign=-1)
+
+# ===== BACKFILL =====
+
+def rebuild_rollups(db: Session, batch_size: int = 1000) -> Dict[str, int]:
+    """Recompute the rollup tables from orders, bills and the usage log (one pass over each)"""
+    days = defaultdict(lambda: {"order_count": 0, "completed_count": 0, "revenue": 0.0, "paid_bill_count": 0})
+    items = defaultdict(lambda: {"order_count": 0, "quantity": 0})
+
+    orders = db.query(models.Order.created_at, models.Order.status).yield_per(batch_size)
+    order_total = 0
+    for created_at, status in orders:
+        order_total += 1
+        day = created_at.date()
+        days[day]["order_count"] += 1
+        if status == "Completed":
+            days[day]["completed_count"] += 1
+
+    lines = db.query(
+        models.Order.created_at,
+        models.order_items.c.menu_item_id,
+        models.order_items.c.quantity
+    ).join(
+        models.order_items, models.order_items.c.order_id == models.Order.id
+    ).join(
+        models.MenuItem, models.MenuItem.id == models.order_items.c.menu_item_id
+    ).yield_per(batch_size)
+    for created_at, menu_item_id, quantity in lines:
+        totals = items[(created_at.date(), menu_item_id)]
+        totals["order_count"] += 1
+        totals["quantity"] += quantity or 1
+
+    paid_bills = db.query(models.Bill.created_at, models.Bill.total_amount).filter(
+        models.Bill.paid == True
+    ).yield_per(batch_size)
+    for created_at, total_amount in paid_bills:
+        day = created_at.date()
+        days[day]["revenue"] += total_amount
+        days[day]["paid_bill_count"] += 1
+
+    db.execute(delete(models.DailyItemSales))
+    db.execute(delete(models.DailySales))
+    if days:
+        db.execute(insert(models.DailySales), [{"day": day, **totals} for day, totals in days.items()])
+    if items:
+        db.execute(insert(models.DailyItemSales), [
+            {"day": day, "menu_item_id": menu_item_id, **totals}
+            for (day, menu_item_id), totals in items.items()
+        ])
+    db.commit()
+    ingredient_days = rebuild_ingredient_usage(db, batch_size=batch_size)
+    return {"orders": order_total, "days": len(days), "item_days": len(items), "ingredient_days": ingredient_days}
+
+def rebuild_ingredient_usage(db: Session, batch_size: int = 5000) -> int:
+    """Recompute daily_ingredient_usage from the usage log"""
+    totals = defaultdict(float)
+    usage = db.query(
+        models.IngredientUsage.used_at, models.IngredientUsage.ingredient_id, models.IngredientUsage.quantity_used
+    ).yield_per(batch_size)
+    for used_at, ingredient_id, quantity in usage:
+        totals[(used_at.date(), ingredient_id)] += quantity or 0.0
+
+    db.execute(delete(models.DailyIngredientUsage))
+    if totals:
+        db.execute(insert(models.DailyIngredientUsage), [
+            {"day": day, "ingredient_id": ingredient_id, "quantity": quantity}
+            for (day, ingredient_id), quantity in totals.items()
+        ])
+    db.commit()
+    return len(totals)
+
+def backfill_if_empty(db: Session):
+    """Build the rollups once for databases that predate them"""
+    if db.query(models.DailySales.day).first() is None and db.query(models.Order.id).first() is not None:
+        rebuild_rollups(db)
+    if db.query(models.DailyIngredientUsage.day).first() is None and db.query(models.IngredientUsage.id).first() is not None:
+        rebuild_ingredient_usage(db)
@@ -1,60 +1,51 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from datetime import datetime, timedelta
+from sqlalchemy import func, and_, case
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 from .. import models
 from ..database import get_db
+from ..versioning import conditional
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
-@router.get("/dashboard")
+def _today() -> str:
+    # "Today" figures roll over at midnight even when nothing is written
+    return datetime.utcnow().date().isoformat()
+
+@router.get("/dashboard", dependencies=[Depends(conditional("orders", "bills", "tables", "menu", extra=_today))])
 def get_dashboard_stats(db: Session = Depends(get_db)):
     today = datetime.utcnow().date()
     week_ago = today - timedelta(days=7)
     
-    # Total revenue today
-    revenue_today = db.query(func.sum(models.Bill.total_amount))\
-        .filter(
-            func.date(models.Bill.created_at) == today,
-            models.Bill.paid == True
-        ).scalar() or 0
-    
-    # Total revenue this week
-    revenue_week = db.query(func.sum(models.Bill.total_amount))\
-        .filter(
-            func.date(models.Bill.created_at) >= week_ago,
-            models.Bill.paid == True
-        ).scalar() or 0
-    
-    # Total orders today
-    orders_today = db.query(func.count(models.Order.id))\
-        .filter(func.date(models.Order.created_at) == today).scalar() or 0
-    
-    # Completed orders today
-    completed_today = db.query(func.count(models.Order.id))\
-        .filter(
-            func.date(models.Order.created_at) == today,
-            models.Order.status == "Completed"
-        ).scalar() or 0
+    # Today's and this week's totals come from the daily rollup (see rollups.py)
+    today_sales = db.query(models.DailySales).filter(models.DailySales.day == today).first()
     
-    # Active tables
-    active_tables = db.query(func.count(models.RestaurantTable.id))\
-        .filter(models.RestaurantTable.status == "Occupied").scalar() or 0
+    revenue_week = db.query(func.sum(models.DailySales.revenue))\
+        .filter(models.DailySales.day >= week_ago).scalar() or 0
     
-    # Total tables
-    total_tables = db.query(func.count(models.RestaurantTable.id)).scalar() or 0
+    # Active and total tables
+    active_tables, total_tables = db.query(
+        func.sum(case((models.RestaurantTable.status == "Occupied", 1), else_=0)),
+        func.count(models.RestaurantTable.id)
+    ).one()
     
     # Most popular menu items (top 5)
+    order_count = func.sum(models.DailyItemSales.order_count)
     popular_items = db.query(
         models.MenuItem.name,
-        func.count(models.order_items.c.menu_item_id).label('order_count')
+        order_count.label('order_count')
     ).join(
-        models.order_items,
-        models.MenuItem.id == models.order_items.c.menu_item_id
+        models.DailyItemSales,
+        models.MenuItem.id == models.DailyItemSales.menu_item_id
     ).group_by(
+        models.MenuItem.id,
         models.MenuItem.name
+    ).having(
+        # Deleted and cancelled orders leave decremented rows behind
+        order_count > 0
     ).order_by(
-        func.count(models.order_items.c.menu_item_id).desc()
+        order_count.desc()
     ).limit(5).all()
     
     # Pending orders
@@ -67,17 +58,17 @@ def get_dashboard_stats(db: Session = Depends(get_db)):
     
     return {
         "revenue": {
-            "today": float(revenue_today),
+            "today": float(today_sales.revenue) if today_sales else 0.0,
             "week": float(revenue_week)
         },
         "orders": {
-            "today": orders_today,
-            "completed_today": completed_today,
+            "today": today_sales.order_count if today_sales else 0,
+            "completed_today": today_sales.completed_count if today_sales else 0,
             "pending": pending_orders
         },
         "tables": {
-            "active": active_tables,
-            "total": total_tables
+            "active": active_tables or 0,
+            "total": total_tables or 0
         },
         "popular_items": [
             {"name": item[0], "count": item[1]} 
@@ -87,3 +78,161 @@ def get_dashboard_stats(db: Session = Depends(get_db)):
             "unpaid": unpaid_bills
         }
     }
+
+# ===== SALES REPORT =====
+
+GRANULARITIES = ("hour", "day", "week", "month")
+MAX_BUCKETS = 1000
+
+# Bucket keys are formatted identically by SQL and by _bucket_starts so empty
+# buckets can be filled in without a second query. Buckets follow the
+# client's wall clock: timestamps are shifted by its UTC offset first.
+_SQLITE_BUCKETS = {
+    "hour": lambda col, shift: func.strftime("%Y-%m-%d %H:00", col, shift),
+    "day": lambda col, shift: func.strftime("%Y-%m-%d", col, shift),
+    # 'weekday 0' moves forward to Sunday, so -6 days is that week's Monday
+    "week": lambda col, shift: func.date(col, shift, "weekday 0", "-6 days"),
+    "month": lambda col, shift: func.strftime("%Y-%m", col, shift),
+}
+_POSTGRES_FORMATS = {"hour": "YYYY-MM-DD HH24:00", "day": "YYYY-MM-DD", "week": "YYYY-MM-DD", "month": "YYYY-MM"}
+_PYTHON_FORMATS = {"hour": "%Y-%m-%d %H:00", "day": "%Y-%m-%d", "week": "%Y-%m-%d", "month": "%Y-%m"}
+
+def _bucket_expression(db: Session, granularity: str, column, tz_offset: int):
+    """tz_offset: minutes east of UTC"""
+    if db.get_bind().dialect.name == "postgresql":
+        local = column + timedelta(minutes=tz_offset)
+        return func.to_char(func.date_trunc(granularity, local), _POSTGRES_FORMATS[granularity])
+    return _SQLITE_BUCKETS[granularity](column, f"{tz_offset:+d} minutes")
+
+def _truncate(moment: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+def _next_bucket(moment: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return moment + timedelta(hours=1)
+    if granularity == "day":
+        return moment + timedelta(days=1)
+    if granularity == "week":
+        return moment + timedelta(weeks=1)
+    return (moment.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def _bucket_starts(start: datetime, end: datetime, granularity: str):
+    """Every bucket start in [start, end), capped at MAX_BUCKETS; all in the same clock"""
+    buckets = []
+    moment = _truncate(start, granularity)
+    while moment < end:
+        buckets.append(moment)
+        if len(buckets) > MAX_BUCKETS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Range has more than {MAX_BUCKETS} {granularity} buckets; use a coarser granularity"
+            )
+        moment = _next_bucket(moment, granularity)
+    return buckets
+
+def _as_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    # Timestamps are stored as naive UTC (datetime.utcnow)
+    if moment is not None and moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+def _empty_totals():
+    return {"bill_count": 0, "revenue": 0.0, "paid_count": 0, "paid_revenue": 0.0, "unpaid_count": 0, "unpaid_revenue": 0.0}
+
+def _sales_columns():
+    paid = models.Bill.paid == True
+    return (
+        func.count(models.Bill.id),
+        func.coalesce(func.sum(models.Bill.total_amount), 0),
+        func.coalesce(func.sum(case((paid, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((paid, models.Bill.total_amount), else_=0)), 0),
+    )
+
+def _totals_from_row(bill_count, revenue, paid_count, paid_revenue):
+    return {
+        "bill_count": bill_count,
+        "revenue": round(float(revenue), 2),
+        "paid_count": paid_count,
+        "paid_revenue": round(float(paid_revenue), 2),
+        "unpaid_count": bill_count - paid_count,
+        "unpaid_revenue": round(float(revenue) - float(paid_revenue), 2),
+    }
+
+def _sales_query(db: Session, start: datetime, end: datetime, paid: Optional[bool], *columns):
+    query = db.query(*columns).filter(
+        models.Bill.created_at >= start,
+        models.Bill.created_at < end
+    )
+    if paid is not None:
+        query = query.filter(models.Bill.paid == paid)
+    return query
+
+def _percentage_change(current: float, previous: float) -> float:
+    if previous == 0:
+        return 100.0 if current > 0 else 0.0
+    return round((current - previous) / previous * 100, 1)
+
+@router.get("/sales", dependencies=[Depends(conditional("bills", extra=_today))])
+def get_sales_report(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    granularity: str = Query("day", pattern="^(hour|day|week|month)$"),
+    paid: Optional[bool] = None,
+    compare: bool = False,
+    tz_offset: int = Query(0, ge=-14 * 60, le=14 * 60),
+    db: Session = Depends(get_db)
+):
+    """
+    Bill revenue bucketed in SQL over [start, end)
+    `end` defaults to now and `start` to the first bill; `compare` adds totals
+    for the preceding period of the same length. The response size depends on
+    the number of buckets, not the number of bills.
+    Buckets are days/weeks/months of the client's clock, `tz_offset` minutes
+    east of UTC (UTC+5:30 is 330); each bucket's `start` is returned in UTC.
+    """
+    end = _as_utc(end) or datetime.utcnow()
+    start = _as_utc(start)
+    if start is None:
+        first_bill = _sales_query(db, datetime.min, end, paid, func.min(models.Bill.created_at)).scalar()
+        start = first_bill or end
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    bucket = _bucket_expression(db, granularity, models.Bill.created_at, tz_offset).label("bucket")
+    rows = _sales_query(db, start, end, paid, bucket, *_sales_columns()).group_by(bucket).all()
+    by_bucket = {key: _totals_from_row(*values) for key, *values in rows}
+
+    shift = timedelta(minutes=tz_offset)
+    series = []
+    for local_start in _bucket_starts(start + shift, end + shift, granularity):
+        key = local_start.strftime(_PYTHON_FORMATS[granularity])
+        series.append({"bucket": key, "start": local_start - shift, **by_bucket.get(key, _empty_totals())})
+
+    totals = _totals_from_row(*_sales_query(db, start, end, paid, *_sales_columns()).one())
+
+    comparison = None
+    if compare:
+        previous_start = start - (end - start)
+        previous = _totals_from_row(*_sales_query(db, previous_start, start, paid, *_sales_columns()).one())
+        comparison = {
+            "start": previous_start,
+            "end": start,
+            "totals": previous,
+            "change": {key: _percentage_change(totals[key], previous[key]) for key in totals}
+        }
+
+    return {
+        "start": start,
+        "end": end,
+        "granularity": granularity,
+        "series": series,
+        "totals": totals,
+        "comparison": comparison
+    }
@@ -3,17 +3,22 @@ Authentication routes - login, register, user management
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
+from functools import partial
 from typing import List
 import re
 
-from ..database import get_db
+from ..database import get_async_db, after_commit
 from ..models import User
 from ..schemas import UserCreate, UserLogin, User as UserSchema, Token
 from ..auth import (
-    get_password_hash, 
-    verify_password, 
+    get_password_hash_async,
+    verify_password_async,
+    get_user_by_username,
+    cache_user,
+    user_cache,
     create_access_token,
     get_current_active_user,
     require_role,
@@ -33,7 +38,7 @@ def validate_password_strength(password: str) -> tuple[bool, str]:
     return True, "Password is valid"
 
 @router.post("/register", response_model=UserSchema, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     # Validate password strength
     is_valid, message = validate_password_strength(user_data.password)
@@ -44,7 +49,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Check if username already exists
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
+    existing_user = await get_user_by_username(db, user_data.username)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -52,7 +57,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Check if email already exists
-    existing_email = db.query(User).filter(User.email == user_data.email).first()
+    existing_email = (await db.execute(select(User).where(User.email == user_data.email))).scalar_one_or_none()
     if existing_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -60,7 +65,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -71,18 +76,17 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.flush()
     
     return new_user
 
 @router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """Login user and return JWT token"""
     # Find user
-    user = db.query(User).filter(User.username == form_data.username).first()
+    user = await get_user_by_username(db, form_data.username)
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -97,7 +101,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
     
     # Update last login
     user.last_login = datetime.utcnow()
-    db.commit()
+    cache_user(user)
     
     # Create access token with expiry info
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -114,7 +118,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
     }
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_active_user)):
+async def logout(current_user: UserSchema = Depends(get_current_active_user)):
     """Logout user - client should clear token"""
     return {
         "message": f"User {current_user.username} logged out successfully",
@@ -122,7 +126,7 @@ async def logout(current_user: User = Depends(get_current_active_user)):
     }
 
 @router.post("/verify-token")
-async def verify_token(current_user: User = Depends(get_current_active_user)):
+async def verify_token(current_user: UserSchema = Depends(get_current_active_user)):
     """Verify if the current token is valid"""
     return {
         "valid": True,
@@ -130,51 +134,71 @@ async def verify_token(current_user: User = Depends(get_current_active_user)):
     }
 
 @router.get("/me", response_model=UserSchema)
-async def get_me(current_user: User = Depends(get_current_active_user)):
+async def get_me(current_user: UserSchema = Depends(get_current_active_user)):
     """Get current user information"""
     return current_user
 
 @router.get("/users", response_model=List[UserSchema])
 async def get_all_users(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role("admin", "manager"))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSchema = Depends(require_role("admin", "manager"))
 ):
     """Get all users (admin/manager only)"""
-    users = db.query(User).all()
-    return users
+    result = await db.execute(select(User))
+    return result.scalars().all()
 
 @router.put("/users/{user_id}/role")
 async def update_user_role(
     user_id: int,
     role: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role("admin"))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSchema = Depends(require_role("admin"))
 ):
     """Update user role (admin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     user.role = role
-    db.commit()
+    after_commit(db, partial(user_cache.invalidate, user.username))
     
     return {"message": f"User role updated to {role}"}
 
 @router.delete("/users/{user_id}")
 async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role("admin"))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSchema = Depends(require_role("admin"))
 ):
     """Delete user (admin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     if user.id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
     
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    after_commit(db, partial(user_cache.invalidate, user.username))
     
     return {"message": "User deleted successfully"}
+
+@router.put("/users/{user_id}/active")
+async def update_user_active(
+    user_id: int,
+    is_active: bool,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSchema = Depends(require_role("admin"))
+):
+    """Activate or deactivate a user (admin only)"""
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    if user.id == current_user.id and not is_active:
+        raise HTTPException(status_code=400, detail="Cannot deactivate yourself")
+    
+    user.is_active = is_active
+    after_commit(db, partial(user_cache.invalidate, user.username))
+    
+    return {"message": f"User {'activated' if is_active else 'deactivated'}"}
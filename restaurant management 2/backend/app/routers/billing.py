@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 from .. import crud, schemas, models
 from ..database import get_db
+from ..versioning import conditional
+from ..pagination import set_next_cursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/api/bills", tags=["billing"])
 
@@ -13,9 +16,32 @@ def create_bill(bill: schemas.BillCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Order not found")
     return db_bill
 
-@router.get("/", response_model=List[schemas.Bill])
-def read_bills(db: Session = Depends(get_db)):
-    return crud.get_bills(db)
+@router.get("/", response_model=List[schemas.Bill], dependencies=[Depends(conditional("bills"))])
+def read_bills(
+    response: Response,
+    paid: Optional[bool] = None,
+    order_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """
+    Newest-first bills, filtered in SQL
+    Pass the X-Next-Cursor response header back as `cursor` for the next page
+    """
+    bills, next_cursor = crud.get_bills(
+        db,
+        cursor=cursor,
+        limit=limit,
+        paid=paid,
+        order_id=order_id,
+        created_from=created_from,
+        created_to=created_to
+    )
+    set_next_cursor(response, next_cursor)
+    return bills
 
 @router.get("/{bill_id}", response_model=schemas.Bill)
 def read_bill(bill_id: int, db: Session = Depends(get_db)):
@@ -26,10 +52,7 @@ def read_bill(bill_id: int, db: Session = Depends(get_db)):
 
 @router.patch("/{bill_id}/payment", response_model=schemas.Bill)
 def update_payment_status(bill_id: int, paid: bool, db: Session = Depends(get_db)):
-    bill = db.query(models.Bill).filter(models.Bill.id == bill_id).first()
+    bill = crud.update_bill_payment(db, bill_id=bill_id, paid=paid)
     if not bill:
         raise HTTPException(status_code=404, detail="Bill not found")
-    bill.paid = paid
-    db.commit()
-    db.refresh(bill)
     return bill
@@ -1,20 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
-from .. import models, schemas
-from ..database import get_db
+from .. import crud, models, schemas, events, rollups, stock
+from ..database import get_db, get_async_db
+from ..menu_snapshot import menu_snapshot
+from ..versioning import conditional_async
+from ..pagination import paginate, set_next_cursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/api/chef", tags=["chef"])
 
 # Get active orders for chef dashboard
-@router.get("/orders/active", response_model=List[schemas.Order])
-def get_active_orders(db: Session = Depends(get_db)):
+@router.get("/orders/active", response_model=List[schemas.Order], dependencies=[Depends(conditional_async("orders", "menu"))])
+async def get_active_orders(db: AsyncSession = Depends(get_async_db)):
     """Get all active orders (Pending, In Progress)"""
-    orders = db.query(models.Order).filter(
-        models.Order.status.in_(["Pending", "In Progress"])
-    ).order_by(models.Order.created_at.asc()).all()
-    return orders
+    return await crud.get_active_orders(db)
 
 # Update order with chef-specific fields
 @router.put("/orders/{order_id}", response_model=schemas.Order)
@@ -37,11 +38,14 @@ def update_order_chef(
         order.completed_at = datetime.utcnow()
     
     # Update fields
+    old_status = order.status
     for key, value in order_update.dict(exclude_unset=True).items():
         setattr(order, key, value)
     
-    db.commit()
-    db.refresh(order)
+    rollups.record_order_status(db, order, old_status)
+    stock.record_order_status(db, order, old_status)
+    db.flush()
+    events.publish_model("order.updated", schemas.Order, order, db)
     return order
 
 # Quick toggle menu item availability (86 feature)
@@ -57,8 +61,10 @@ def toggle_menu_item_availability(
         raise HTTPException(status_code=404, detail="Menu item not found")
     
     menu_item.is_available = is_available
-    db.commit()
-    db.refresh(menu_item)
+    # A manual toggle takes the dish out of automatic 86-ing
+    menu_item.auto_unavailable = False
+    db.flush()
+    menu_snapshot.rebuild_after_commit(db)
     
     return {
         "success": True,
@@ -77,17 +83,23 @@ def create_kitchen_message(
     """Create a kitchen message"""
     db_message = models.KitchenMessage(**message.dict())
     db.add(db_message)
-    db.commit()
-    db.refresh(db_message)
+    db.flush()
+    events.publish_model("message.created", schemas.KitchenMessage, db_message, db)
     return db_message
 
 @router.get("/messages", response_model=List[schemas.KitchenMessage])
 def get_kitchen_messages(
+    response: Response,
     recipient: str = None,
     unread_only: bool = False,
+    order_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
-    """Get kitchen messages, optionally filtered"""
+    """Get kitchen messages newest first, optionally filtered (paginated via X-Next-Cursor)"""
     query = db.query(models.KitchenMessage)
     
     if recipient:
@@ -96,7 +108,19 @@ def get_kitchen_messages(
     if unread_only:
         query = query.filter(models.KitchenMessage.is_read == False)
     
-    messages = query.order_by(models.KitchenMessage.created_at.desc()).all()
+    if order_id is not None:
+        query = query.filter(models.KitchenMessage.order_id == order_id)
+    
+    if created_from:
+        query = query.filter(models.KitchenMessage.created_at >= created_from)
+    
+    if created_to:
+        query = query.filter(models.KitchenMessage.created_at < created_to)
+    
+    messages, next_cursor = paginate(
+        query, models.KitchenMessage.created_at, models.KitchenMessage.id, cursor, limit
+    )
+    set_next_cursor(response, next_cursor)
     return messages
 
 @router.patch("/messages/{message_id}/read")
@@ -107,7 +131,7 @@ def mark_message_read(message_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Message not found")
     
     message.is_read = True
-    db.commit()
+    events.publish("message.read", {"id": message_id}, db)
     return {"success": True, "message_id": message_id}
 
 # Shift Handover
@@ -119,8 +143,7 @@ def create_shift_handover(
     """Create a shift handover note"""
     db_handover = models.ShiftHandover(**handover.dict())
     db.add(db_handover)
-    db.commit()
-    db.refresh(db_handover)
+    db.flush()
     return db_handover
 
 @router.get("/shift-handover/latest", response_model=schemas.ShiftHandover)
@@ -150,37 +173,23 @@ def get_shift_handovers(
 @router.post("/inventory/batch-usage")
 def record_batch_usage(
     usages: List[schemas.IngredientUsageCreate],
+    allow_negative: bool = True,
     db: Session = Depends(get_db)
 ):
-    """Record multiple ingredient uses at once"""
-    recorded = []
-    
-    for usage_data in usages:
-        # Verify ingredient exists
-        ingredient = db.query(models.Ingredient).filter(
-            models.Ingredient.id == usage_data.ingredient_id
-        ).first()
-        
-        if not ingredient:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Ingredient with id {usage_data.ingredient_id} not found"
-            )
-        
-        # Deduct from stock
-        ingredient.current_stock -= usage_data.quantity_used
-        
-        # Create usage record
-        usage = models.IngredientUsage(**usage_data.dict())
-        db.add(usage)
-        recorded.append({
+    """
+    Record multiple ingredient uses at once, all or nothing
+    allow_negative=false rejects the batch if any ingredient would go below zero
+    """
+    result = stock.record_usage(db, usages, allow_negative=allow_negative)
+    recorded = [
+        {
             "ingredient_id": usage_data.ingredient_id,
-            "ingredient_name": ingredient.name,
+            "ingredient_name": result.stock[usage_data.ingredient_id].name,
             "quantity_used": usage_data.quantity_used,
-            "new_stock": ingredient.current_stock
-        })
-    
-    db.commit()
+            "new_stock": result.stock[usage_data.ingredient_id].current_stock
+        }
+        for usage_data in usages
+    ]
     
     return {
         "success": True,
@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from .. import models, schemas
-from ..database import get_db
+from ..auth import require_role
+from ..autocomplete import autocomplete
+from ..database import engine, get_db
+from ..dish_import import import_dishes, detect_format, open_text, DEFAULT_BATCH_SIZE
+from ..dish_search import search_dishes
+from ..ingredient_index import ingredient_index
 
 router = APIRouter(prefix="/api/dishes", tags=["dishes"])
 
@@ -13,14 +18,34 @@ def search_global_dishes(
     db: Session = Depends(get_db)
 ):
     """
-    Search global dishes database by name
-    Returns matching dishes for auto-fill
+    Search global dishes by name, ingredients, course, state and region
+    Every word is matched as a prefix; results are ranked by relevance for auto-fill
     """
-    dishes = db.query(models.GlobalDish).filter(
-        models.GlobalDish.name.ilike(f"%{query}%")
-    ).limit(limit).all()
-    
-    return dishes
+    return search_dishes(db, query, limit)
+
+@router.post("/import")
+def import_global_dishes(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|jsonl)$"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=100, le=50000),
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(require_role("admin"))
+):
+    """
+    Upsert dishes from an uploaded CSV or JSONL file, keyed on dish name (Admin only)
+    The upload is streamed in batches; re-importing the same file changes nothing
+    """
+    fmt = format or detect_format(file.filename or "")
+    try:
+        report = import_dishes(engine, open_text(file.file), fmt, batch_size=batch_size)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+
+    if report.inserted or report.updated:
+        # Core writes skip the session hooks that keep these in sync
+        autocomplete.rebuild(db)
+        ingredient_index.invalidate()
+    return report.as_dict()
 
 @router.get("/{dish_id}", response_model=schemas.GlobalDish)
 def get_global_dish(dish_id: int, db: Session = Depends(get_db)):
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import asyncio
+from ..events import broadcaster, format_sse
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+# Comment line sent when idle so proxies keep the connection open
+HEARTBEAT_SECONDS = 15
+
+@router.get("/stream")
+async def stream_events(request: Request, types: Optional[str] = None):
+    """
+    Server-Sent Events stream of order, message and table updates
+    Optionally filtered by a comma-separated list of event type prefixes (e.g. order,table)
+    """
+    prefixes = tuple(t.strip() for t in types.split(",") if t.strip()) if types else ()
+    queue = broadcaster.subscribe()
+
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if prefixes and event["type"] != "resync" and not event["type"].startswith(prefixes):
+                    continue
+                yield format_sse(event)
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime, timedelta
-from .. import models, schemas
+from .. import inventory_alerts, models, schemas, stock
 from ..database import get_db
+from ..pagination import paginate, set_next_cursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ..ingredient_index import ingredient_index
+from ..recipe_matrix import recipe_matrix
+from ..forecast import consumption_forecast, group_by_supplier, DEFAULT_LEAD_TIME_DAYS, DEFAULT_COVER_DAYS
+from ..versioning import conditional
 
 router = APIRouter(prefix="/api/inventory", tags=["inventory"])
 
@@ -22,7 +27,7 @@ def get_all_ingredients(
     query = db.query(models.Ingredient)
     
     if low_stock_only:
-        query = query.filter(models.Ingredient.current_stock <= models.Ingredient.minimum_stock)
+        query = query.join(models.LowStockAlert, models.LowStockAlert.ingredient_id == models.Ingredient.id)
     
     ingredients = query.offset(skip).limit(limit).all()
     return ingredients
@@ -49,8 +54,8 @@ def create_ingredient(ingredient: schemas.IngredientCreate, db: Session = Depend
     
     db_ingredient = models.Ingredient(**ingredient.dict())
     db.add(db_ingredient)
-    db.commit()
-    db.refresh(db_ingredient)
+    db.flush()
+    inventory_alerts.sync(db, {db_ingredient.id: db_ingredient})
     return db_ingredient
 
 @router.put("/ingredients/{ingredient_id}", response_model=schemas.Ingredient)
@@ -75,8 +80,11 @@ def update_ingredient(
     for key, value in update_data.items():
         setattr(db_ingredient, key, value)
     
-    db.commit()
-    db.refresh(db_ingredient)
+    db.flush()
+    if 'current_stock' in update_data:
+        recipe_matrix.refresh_availability(db, [ingredient_id])
+    if 'current_stock' in update_data or 'minimum_stock' in update_data:
+        inventory_alerts.sync(db, {ingredient_id: db_ingredient})
     return db_ingredient
 
 @router.delete("/ingredients/{ingredient_id}")
@@ -88,8 +96,8 @@ def delete_ingredient(ingredient_id: int, db: Session = Depends(get_db)):
     if not db_ingredient:
         raise HTTPException(status_code=404, detail="Ingredient not found")
     
+    inventory_alerts.clear(db, ingredient_id)
     db.delete(db_ingredient)
-    db.commit()
     return {"message": "Ingredient deleted successfully"}
 
 # ===== INGREDIENT USAGE TRACKING =====
@@ -98,40 +106,24 @@ def delete_ingredient(ingredient_id: int, db: Session = Depends(get_db)):
 def record_ingredient_usage(usage: schemas.IngredientUsageCreate, db: Session = Depends(get_db)):
     """
     Record ingredient usage (when dish is prepared)
-    Automatically deducts from stock
+    Atomically deducts from stock; 400 if it would go below zero
     """
-    ingredient = db.query(models.Ingredient).filter(models.Ingredient.id == usage.ingredient_id).first()
-    if not ingredient:
-        raise HTTPException(status_code=404, detail="Ingredient not found")
-    
-    # Check if enough stock
-    if ingredient.current_stock < usage.quantity_used:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Insufficient stock. Available: {ingredient.current_stock} {ingredient.unit}"
-        )
-    
-    # Deduct from stock
-    ingredient.current_stock -= usage.quantity_used
-    
-    # Record usage
-    db_usage = models.IngredientUsage(**usage.dict())
-    db.add(db_usage)
-    db.commit()
-    db.refresh(db_usage)
-    
-    return db_usage
+    return stock.record_usage(db, [usage]).logs[0]
 
 @router.get("/usage", response_model=List[schemas.IngredientUsage])
 def get_ingredient_usage_history(
+    response: Response,
     ingredient_id: int = None,
     order_id: int = None,
-    skip: int = 0,
-    limit: int = 100,
+    used_from: Optional[datetime] = None,
+    used_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
     """
-    Get ingredient usage history with filters
+    Get ingredient usage history with filters, newest first
+    Pass the X-Next-Cursor response header back as `cursor` for the next page
     """
     query = db.query(models.IngredientUsage)
     
@@ -139,8 +131,15 @@ def get_ingredient_usage_history(
         query = query.filter(models.IngredientUsage.ingredient_id == ingredient_id)
     if order_id:
         query = query.filter(models.IngredientUsage.order_id == order_id)
+    if used_from:
+        query = query.filter(models.IngredientUsage.used_at >= used_from)
+    if used_to:
+        query = query.filter(models.IngredientUsage.used_at < used_to)
     
-    usage_logs = query.order_by(models.IngredientUsage.used_at.desc()).offset(skip).limit(limit).all()
+    usage_logs, next_cursor = paginate(
+        query, models.IngredientUsage.used_at, models.IngredientUsage.id, cursor, limit
+    )
+    set_next_cursor(response, next_cursor)
     return usage_logs
 
 # ===== INVENTORY ALERTS & REPORTS =====
@@ -148,51 +147,47 @@ def get_ingredient_usage_history(
 @router.get("/alerts/low-stock", response_model=List[schemas.Ingredient])
 def get_low_stock_alerts(db: Session = Depends(get_db)):
     """
-    Get ingredients that are below minimum stock level
+    Get ingredients that are at or below minimum stock level, oldest alert first
+    Read from the alerts raised on write (see inventory_alerts.py); changes are
+    pushed as inventory.alert_raised / inventory.alert_cleared events
     """
-    low_stock = db.query(models.Ingredient).filter(
-        models.Ingredient.current_stock <= models.Ingredient.minimum_stock
-    ).all()
+    low_stock = db.query(models.Ingredient).join(
+        models.LowStockAlert, models.LowStockAlert.ingredient_id == models.Ingredient.id
+    ).order_by(models.LowStockAlert.raised_at, models.Ingredient.id).all()
     return low_stock
 
 @router.get("/alerts/expiring-soon", response_model=List[schemas.Ingredient])
 def get_expiring_ingredients(days: int = 7, db: Session = Depends(get_db)):
     """
-    Get ingredients expiring within specified days
+    Get ingredients expiring within specified days, soonest first
+    A range scan of the expiry_date index
     """
     cutoff_date = datetime.utcnow().date() + timedelta(days=days)
     
     expiring = db.query(models.Ingredient).filter(
         models.Ingredient.expiry_date != None,
         models.Ingredient.expiry_date <= cutoff_date
-    ).all()
+    ).order_by(models.Ingredient.expiry_date).all()
     return expiring
 
 @router.get("/grocery-list")
-def generate_grocery_list(db: Session = Depends(get_db)):
+def generate_grocery_list(
+    lead_time_days: int = Query(DEFAULT_LEAD_TIME_DAYS, ge=0, le=30),
+    cover_days: int = Query(DEFAULT_COVER_DAYS, ge=1, le=60),
+    db: Session = Depends(get_db)
+):
     """
-    Generate grocery shopping list for low stock items
+    Generate grocery shopping list from forecast consumption
+    Items whose stock will be at or below minimum once a delivery ordered now
+    arrives, with enough to last cover_days after it; grouped by supplier
     """
-    low_stock = db.query(models.Ingredient).filter(
-        models.Ingredient.current_stock <= models.Ingredient.minimum_stock
-    ).all()
-    
-    grocery_list = []
-    for ingredient in low_stock:
-        needed_quantity = ingredient.minimum_stock * 2 - ingredient.current_stock
-        grocery_list.append({
-            "name": ingredient.name,
-            "current_stock": ingredient.current_stock,
-            "needed_quantity": max(needed_quantity, 0),
-            "unit": ingredient.unit,
-            "estimated_cost": ingredient.cost_per_unit * needed_quantity if ingredient.cost_per_unit else None,
-            "supplier": ingredient.supplier
-        })
+    grocery_list = consumption_forecast.reorder(db, lead_time_days=lead_time_days, cover_days=cover_days)
     
     return {
-        "items": grocery_list,
+        "items": [item._asdict() for item in grocery_list],
+        "suppliers": group_by_supplier(grocery_list),
         "total_items": len(grocery_list),
-        "total_estimated_cost": sum(item['estimated_cost'] for item in grocery_list if item['estimated_cost'])
+        "total_estimated_cost": round(sum(item.estimated_cost for item in grocery_list if item.estimated_cost), 2)
     }
 
 # ===== DISH INGREDIENT REQUIREMENTS =====
@@ -232,3 +227,65 @@ def get_required_ingredients_for_dish(menu_item_id: int, db: Session = Depends(g
         "ingredients": result,
         "can_prepare": all(item['available'] for item in result)
     }
+
+@router.get("/servings", response_model=List[schemas.MenuItemServings], dependencies=[Depends(conditional("menu", "stock"))])
+def get_servings_possible(db: Session = Depends(get_db)):
+    """
+    Servings possible for every menu item with current stock, in one pass
+    Replaces calling /required-ingredients/{menu_item_id} per dish; servings is
+    null for items without a recipe
+    """
+    return [servings._asdict() for servings in recipe_matrix.servings(db)]
+
+@router.get("/cookable")
+def get_cookable_dishes(
+    source: str = Query("all", pattern="^(all|menu|dishes)$"),
+    min_coverage: float = Query(0.0, ge=0.0, le=1.0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    What can be cooked with current stock
+    Menu items come from the recipe matrix, as in /servings; catalog dishes are
+    ranked by the share of their ingredients in stock, via the inverted index
+    """
+    result = {}
+    
+    if source in ("all", "menu"):
+        # Same pass as /servings; items without a recipe are left out
+        ranked = []
+        for item in recipe_matrix.servings(db):
+            if item.servings is None:
+                continue
+            in_stock = item.ingredient_count - len(item.missing)
+            coverage = round(in_stock / item.ingredient_count, 3)
+            if coverage >= min_coverage:
+                ranked.append({
+                    "id": item.menu_item_id,
+                    "name": item.name,
+                    "in_stock": in_stock,
+                    "total": item.ingredient_count,
+                    "missing": item.missing,
+                    "coverage": coverage,
+                    "can_prepare": item.servings > 0,
+                    "servings": item.servings,
+                })
+        ranked.sort(key=lambda entry: (-entry["coverage"], -entry["in_stock"], entry["name"]))
+        result["menu_items"] = ranked[:limit]
+    
+    if source in ("all", "dishes"):
+        ingredient_index.ensure_built(db)
+        stock_names = [name for (name,) in db.query(models.Ingredient.name).filter(models.Ingredient.current_stock > 0)]
+        result["dishes"] = [
+            {
+                "id": dish.id,
+                "name": dish.name,
+                "in_stock": dish.in_stock,
+                "total": dish.total,
+                "coverage": round(dish.coverage, 3),
+                "missing": dish.missing
+            }
+            for dish in ingredient_index.cookable(stock_names, limit=limit, min_coverage=min_coverage)
+        ]
+    
+    return result
@@ -1,21 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
-import shutil
-import os
-from datetime import datetime
-from .. import crud, schemas, models
+from .. import crud, images, schemas, models
+from ..compression import acceptable
 from ..database import get_db
+from ..menu_snapshot import menu_snapshot
+from ..versioning import conditional
 
 router = APIRouter(prefix="/api/menu", tags=["menu"])
 
-UPLOAD_DIR = "static/uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 @router.get("/", response_model=List[schemas.MenuItem])
-def read_menu_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    items = crud.get_menu_items(db, skip=skip, limit=limit)
-    return items
+def read_menu_items(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    etag: str = Depends(conditional("menu")),
+    db: Session = Depends(get_db)
+):
+    if skip != 0 or limit != 100:
+        # Compressed on the way out by CompressionMiddleware
+        response.headers["Vary"] = "Accept-Encoding"
+        return crud.get_menu_items(db, skip=skip, limit=limit)
+    
+    # Default page is the public menu: serve the precompiled snapshot
+    snapshot = menu_snapshot.get(db, etag)
+    headers = {
+        "X-Menu-Version": str(snapshot.version),
+        "ETag": snapshot.etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding"
+    }
+    # The snapshot is kept gzipped; "gzip;q=0" gets the plain body
+    if "gzip" in acceptable(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=snapshot.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
 
 @router.get("/{item_id}", response_model=schemas.MenuItem)
 def read_menu_item(item_id: int, db: Session = Depends(get_db)):
@@ -25,7 +45,8 @@ def read_menu_item(item_id: int, db: Session = Depends(get_db)):
     return item
 
 @router.post("/", response_model=schemas.MenuItem)
-async def create_menu_item(
+def create_menu_item(
+    background_tasks: BackgroundTasks,
     name: str = Form(...),
     category: str = Form(...),
     price: float = Form(...),
@@ -41,22 +62,18 @@ async def create_menu_item(
 ):
     """
     Create menu item with optional auto-fill from global dish
+    A plain def so the upload and database work run in the threadpool, not on the event loop
+    Image variants are generated after the response; until then all sizes use the original
     """
-    image_url = None
-    if image:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{timestamp}_{image.filename}"
-        filepath = os.path.join(UPLOAD_DIR, filename)
-        with open(filepath, "wb") as buffer:
-            shutil.copyfileobj(image.file, buffer)
-        image_url = f"/static/uploads/{filename}"
+    stored = images.save_upload(image) if image else None
+    image_columns = images.image_urls(stored) if stored else {}
     
     item_data = schemas.MenuItemCreate(
         name=name,
         category=category,
         price=price,
         description=description,
-        image_url=image_url,
+        **image_columns,
         is_available=is_available,
         prep_time=prep_time,
         cook_time=cook_time,
@@ -65,7 +82,11 @@ async def create_menu_item(
         global_dish_id=global_dish_id,
         ingredients=[]
     )
-    return crud.create_menu_item(db=db, item=item_data)
+    db_item = crud.create_menu_item(db=db, item=item_data)
+    menu_snapshot.rebuild_after_commit(db)
+    if stored and not images.variants_ready(stored.digest):
+        background_tasks.add_task(images.generate_variants, stored)
+    return db_item
 
 @router.post("/from-global-dish/{dish_id}", response_model=schemas.MenuItem)
 def create_menu_item_from_global_dish(
@@ -98,8 +119,8 @@ def create_menu_item_from_global_dish(
     )
     
     db.add(menu_item)
-    db.commit()
-    db.refresh(menu_item)
+    db.flush()
+    menu_snapshot.rebuild_after_commit(db)
     
     return menu_item
 
@@ -108,6 +129,7 @@ def update_menu_item(item_id: int, item: schemas.MenuItemUpdate, db: Session = D
     db_item = crud.update_menu_item(db, item_id=item_id, item=item)
     if db_item is None:
         raise HTTPException(status_code=404, detail="Menu item not found")
+    menu_snapshot.rebuild_after_commit(db)
     return db_item
 
 @router.delete("/{item_id}")
@@ -115,4 +137,5 @@ def delete_menu_item(item_id: int, db: Session = Depends(get_db)):
     item = crud.delete_menu_item(db, item_id=item_id)
     if item is None:
         raise HTTPException(status_code=404, detail="Menu item not found")
+    menu_snapshot.rebuild_after_commit(db)
     return {"message": "Menu item deleted successfully"}
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from ..auth import password_hasher
+from ..monitoring import loop_lag_monitor
+from ..sqlite_profile import writer_lane
+
+router = APIRouter(prefix="/api/monitoring", tags=["monitoring"])
+
+@router.get("/")
+async def get_runtime_metrics():
+    """Worker health: event-loop lag over the last minute (100ms samples), the bcrypt pool and the SQLite writer lane"""
+    return {
+        "event_loop": loop_lag_monitor.stats(),
+        "password_hashing": password_hasher.stats(),
+        "sqlite_writer_lane": writer_lane.stats()
+    }
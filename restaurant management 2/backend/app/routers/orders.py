@@ -1,18 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
-from .. import crud, schemas
-from ..database import get_db
+from .. import crud, schemas, events
+from ..database import get_db, get_async_db
+from ..versioning import conditional_async
+from ..pagination import set_next_cursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/api/orders", tags=["orders"])
 
-@router.get("/", response_model=List[schemas.Order])
-def read_orders(active_only: bool = False, db: Session = Depends(get_db)):
-    if active_only:
-        orders = crud.get_orders(db)
-        return [order for order in orders if order.status == "Pending"]
-    return crud.get_orders(db)
+def publish_order_created(db, db_order):
+    events.publish_model("order.created", schemas.Order, db_order, db)
+    events.publish_model("table.updated", schemas.Table, db_order.table, db)
+
+@router.get("/", response_model=List[schemas.Order], dependencies=[Depends(conditional_async("orders", "menu"))])
+async def read_orders(
+    response: Response,
+    active_only: bool = False,
+    status: Optional[List[str]] = Query(None),
+    table_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Newest-first orders, filtered in SQL
+    Pass the X-Next-Cursor response header back as `cursor` for the next page
+    """
+    statuses = ["Pending"] if active_only else status
+    orders, next_cursor = await crud.get_orders(
+        db,
+        cursor=cursor,
+        limit=limit,
+        statuses=statuses,
+        table_id=table_id,
+        created_from=created_from,
+        created_to=created_to
+    )
+    set_next_cursor(response, next_cursor)
+    return orders
 
 @router.get("/{order_id}", response_model=schemas.Order)
 def read_order(order_id: int, db: Session = Depends(get_db)):
@@ -28,12 +57,9 @@ def create_order(order: schemas.OrderCreate, db: Session = Depends(get_db)):
     if table is None:
         raise HTTPException(status_code=404, detail="Table not found")
     
-    # Create order
+    # Create order and occupy the table
     db_order = crud.create_order(db=db, order=order)
-    
-    # Update table status
-    crud.update_table_status(db, table_id=order.table_id, status="Occupied")
-    
+    publish_order_created(db, db_order)
     return db_order
 
 @router.post("/customer", response_model=schemas.Order)
@@ -44,12 +70,9 @@ def create_customer_order(order: schemas.OrderCreate, db: Session = Depends(get_
     if table is None:
         raise HTTPException(status_code=404, detail="Table not found")
     
-    # Create order
+    # Create order and occupy the table
     db_order = crud.create_order(db=db, order=order)
-    
-    # Update table status
-    crud.update_table_status(db, table_id=order.table_id, status="Occupied")
-    
+    publish_order_created(db, db_order)
     return db_order
 
 @router.put("/{order_id}", response_model=schemas.Order)
@@ -58,9 +81,12 @@ def update_order(order_id: int, order: schemas.OrderUpdate, db: Session = Depend
     if db_order is None:
         raise HTTPException(status_code=404, detail="Order not found")
     
+    events.publish_model("order.updated", schemas.Order, db_order, db)
+    
     # If order is completed, free the table
     if order.status == "Completed":
-        crud.update_table_status(db, table_id=db_order.table_id, status="Available")
+        db_table = crud.update_table_status(db, table_id=db_order.table_id, status="Available")
+        events.publish_model("table.updated", schemas.Table, db_table, db)
     
     return db_order
 
@@ -69,4 +95,5 @@ def delete_order(order_id: int, db: Session = Depends(get_db)):
     order = crud.delete_order(db, order_id=order_id)
     if order is None:
         raise HTTPException(status_code=404, detail="Order not found")
+    events.publish("order.deleted", {"id": order_id}, db)
     return {"message": "Order deleted successfully"}
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Query
+from typing import Optional
+from ..autocomplete import autocomplete, KIND_ORDER
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+@router.get("/suggest")
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    kinds: Optional[str] = None
+):
+    """
+    Typeahead suggestions for dish, menu-item and ingredient names
+    Answered from memory without a database query; `kinds` is a comma-separated
+    subset of dish, menu_item, ingredient
+    """
+    wanted = {kind.strip() for kind in kinds.split(",") if kind.strip() in KIND_ORDER} if kinds else None
+    return autocomplete.suggest(q, limit=limit, kinds=wanted)
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
-from .. import crud, schemas
+from .. import crud, schemas, events
 from ..database import get_db
+from ..versioning import conditional
 
 router = APIRouter(prefix="/api/tables", tags=["tables"])
 
-@router.get("/", response_model=List[schemas.Table])
+@router.get("/", response_model=List[schemas.Table], dependencies=[Depends(conditional("tables"))])
 def read_tables(db: Session = Depends(get_db)):
     return crud.get_tables(db)
 
@@ -19,11 +20,14 @@ def read_table(table_id: int, db: Session = Depends(get_db)):
 
 @router.post("/", response_model=schemas.Table)
 def create_table(table: schemas.TableCreate, db: Session = Depends(get_db)):
-    return crud.create_table(db=db, table=table)
+    db_table = crud.create_table(db=db, table=table)
+    events.publish_model("table.updated", schemas.Table, db_table, db)
+    return db_table
 
 @router.put("/{table_id}", response_model=schemas.Table)
 def update_table(table_id: int, table: schemas.TableUpdate, db: Session = Depends(get_db)):
     db_table = crud.update_table(db, table_id=table_id, table=table)
     if db_table is None:
         raise HTTPException(status_code=404, detail="Table not found")
+    events.publish_model("table.updated", schemas.Table, db_table, db)
     return db_table
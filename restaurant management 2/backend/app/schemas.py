@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, model_validator
 from typing import List, Optional
 from datetime import datetime, date
 from enum import Enum
@@ -104,22 +104,42 @@ class IngredientUsageCreate(BaseModel):
 class IngredientUsage(IngredientUsageCreate):
     id: int
     used_at: datetime
+    automatic: bool = False
     
     class Config:
         from_attributes = True
 
+class MenuItemServings(BaseModel):
+    menu_item_id: int
+    name: str
+    servings: Optional[int] = None
+    limiting_ingredient: Optional[str] = None
+    is_available: bool
+
 # Menu Item with Ingredients
 class MenuItemIngredient(BaseModel):
     ingredient_id: int
     quantity_required: float = 1.0
     unit: str = 'unit'
 
+class RecipeIngredient(BaseModel):
+    """Ingredient as embedded in menu items; stock levels come from /api/inventory"""
+    id: int
+    name: str
+    category: Optional[str] = None
+    unit: str
+
+    class Config:
+        from_attributes = True
+
 class MenuItemBase(BaseModel):
     name: str
     category: str
     price: float
     description: Optional[str] = None
     image_url: Optional[str] = None
+    card_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
     is_available: bool = True
     prep_time: Optional[int] = None
     cook_time: Optional[int] = None
@@ -136,6 +156,8 @@ class MenuItemUpdate(BaseModel):
     price: Optional[float] = None
     description: Optional[str] = None
     image_url: Optional[str] = None
+    card_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
     is_available: Optional[bool] = None
     prep_time: Optional[int] = None
     cook_time: Optional[int] = None
@@ -146,7 +168,7 @@ class MenuItem(MenuItemBase):
     id: int
     created_at: datetime
     global_dish_id: Optional[int] = None
-    ingredients: List[Ingredient] = []
+    ingredients: List[RecipeIngredient] = []
     
     class Config:
         from_attributes = True
@@ -173,6 +195,21 @@ class OrderItemBase(BaseModel):
     menu_item_id: int
     quantity: int = 1
 
+class OrderItem(MenuItem):
+    """Menu item as it appears on an order, with the line quantity"""
+    quantity: int = 1
+    
+    @model_validator(mode="before")
+    @classmethod
+    def flatten_order_line(cls, data):
+        # order_items rows carry the quantity and point at the menu item
+        menu_item = getattr(data, "menu_item", None)
+        if menu_item is None:
+            return data
+        flattened = {field: getattr(menu_item, field) for field in MenuItem.model_fields}
+        flattened["quantity"] = data.quantity
+        return flattened
+
 class OrderCreate(BaseModel):
     table_id: int
     items: List[OrderItemBase]
@@ -196,7 +233,7 @@ class Order(BaseModel):
     estimated_completion_time: Optional[int] = None
     started_at: Optional[datetime] = None
     priority: Optional[str] = None
-    items: List[MenuItem] = []
+    items: List[OrderItem] = Field(default=[], validation_alias="lines")
     
     class Config:
         from_attributes = True
@@ -0,0 +1,219 @@
+"""
+Opt-in SQLite production profile (SQLITE_PROFILE=production)
+
+SQLite allows one writer at a time. With the defaults (rollback journal,
+full sync, 5s busy wait), concurrent order and kitchen writes queue inside
+SQLite's lock, and once the wait runs out they fail with
+"database is locked". This profile does two things:
+
+- Pragmas on every new connection:
+  - WAL, so readers never block the writer or each other
+  - synchronous=NORMAL, which is durable across crashes of the app in WAL
+    mode; a power loss can lose only the last commits
+  - a longer busy timeout, a memory map and a larger page cache
+- A writer lane: write transactions wait in a FIFO on the event loop and
+  run one at a time, in arrival order, instead of spinning on SQLite's
+  lock. A connection joins the lane at its first INSERT/UPDATE/DELETE
+  (where SQLite takes its write lock) and leaves when it goes back to the
+  pool after commit or rollback. Everything else in the request (reads,
+  password hashing, response building) runs outside it.
+
+Sync sessions wait for the lane from their worker thread, so a request
+holding the lane could still need a free threadpool slot to build its
+response while every slot is parked in the queue. WriteAdmissionMiddleware
+prevents that by letting at most (threadpool size - ADMISSION_RESERVE)
+write requests in at once; the rest wait on the event loop.
+Writes outside requests before the server starts (startup backfills, the
+import CLI) do not use the lane and rely on the busy timeout.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+import time
+import anyio
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.util import await_only
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "30000"))
+MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+# Negative cache_size is in KiB
+CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))
+# Threadpool slots kept free of write requests waiting for the lane
+ADMISSION_RESERVE = 4
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+    f"PRAGMA mmap_size={MMAP_SIZE}",
+    f"PRAGMA cache_size=-{CACHE_SIZE_KB}",
+    "PRAGMA temp_store=MEMORY",
+)
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+# connection.info key: the connection holds the lane
+_HOLDS_LANE = "holds_writer_lane"
+# The write request being served; copied into its worker threads by anyio
+_current_request = contextvars.ContextVar("writer_lane_request", default=None)
+
+def _apply_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+class WriterLane:
+    """
+    FIFO gate for write transactions; asyncio.Lock wakes its waiters in arrival order
+    Reentrant per write request (per thread outside requests), so a request
+    writing through a second connection does not queue behind itself
+    """
+
+    def __init__(self):
+        self._lock = None
+        self._loop = None
+        self._owner = None
+        self._depth = 0
+        self.enabled = False
+        self.transactions = 0
+        self.waited = 0
+        self.queued = 0
+        self.max_queue_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        # The lock is created lazily so it binds to the server's event loop
+        if self._loop is not loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+
+    async def acquire(self, owner):
+        if self._owner == owner:
+            self._depth += 1
+            return
+        self.transactions += 1
+        if self._lock.locked():
+            self.waited += 1
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+            started = time.perf_counter()
+            try:
+                await self._lock.acquire()
+            finally:
+                self.queued -= 1
+            waited = time.perf_counter() - started
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        else:
+            await self._lock.acquire()
+        self._owner = owner
+        self._depth = 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            self._owner = None
+            self._lock.release()
+
+    def _on_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def enter(self, from_loop: bool) -> bool:
+        """
+        Join the lane from a connection about to write; False if it cannot wait here
+        from_loop: called from the async engine, inside SQLAlchemy's greenlet on the loop
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return False
+        owner = _current_request.get() or threading.get_ident()
+        if from_loop:
+            await_only(self.acquire(owner))
+            return True
+        if self._on_loop():
+            # A sync session used directly on the loop would block it; let the busy timeout handle it
+            return False
+        asyncio.run_coroutine_threadsafe(self.acquire(owner), loop).result()
+        return True
+
+    def leave(self):
+        if self._on_loop():
+            self.release()
+        else:
+            self._loop.call_soon_threadsafe(self.release)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "transactions": self.transactions,
+            "waited": self.waited,
+            "queued": self.queued,
+            "max_queue_depth": self.max_queue_depth,
+            "avg_wait_ms": round(self.total_wait / self.waited * 1000, 2) if self.waited else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+        }
+
+writer_lane = WriterLane()
+
+def _is_write(statement: str, context) -> bool:
+    if context is not None and getattr(context, "compiled", None) is not None:
+        return context.isinsert or context.isupdate or context.isdelete
+    return statement.lstrip().upper().startswith(WRITE_STATEMENTS)
+
+def _lane_listener(from_loop: bool):
+    def join_lane(conn, cursor, statement, parameters, context, executemany):
+        if not conn.info.get(_HOLDS_LANE) and _is_write(statement, context) and writer_lane.enter(from_loop):
+            conn.info[_HOLDS_LANE] = True
+    return join_lane
+
+def _leave_lane(dbapi_connection, connection_record, *args):
+    # Check-in follows the commit or rollback, so the next writer never meets SQLite's lock
+    if connection_record.info.pop(_HOLDS_LANE, False):
+        writer_lane.leave()
+
+class WriteAdmissionMiddleware:
+    """Cap concurrent write requests below the threadpool size so a lane holder can always finish"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._slots = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if not writer_lane.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        writer_lane.bind(asyncio.get_running_loop())
+        if scope["method"] not in WRITE_METHODS or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+
+        if self._slots is None:
+            threads = anyio.to_thread.current_default_thread_limiter().total_tokens
+            self._slots = asyncio.Semaphore(max(1, int(threads) - ADMISSION_RESERVE))
+        async with self._slots:
+            request = _current_request.set(object())
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                _current_request.reset(request)
+
+def enable(engine: Engine, async_engine):
+    """Apply the pragmas to both engines' new connections and open the writer lane"""
+    event.listen(engine, "connect", _apply_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _apply_pragmas)
+    event.listen(engine, "before_cursor_execute", _lane_listener(from_loop=False))
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _lane_listener(from_loop=True))
+    for pool_events in (engine, async_engine.sync_engine):
+        event.listen(pool_events, "checkin", _leave_lane)
+        # A connection invalidated mid-transaction never checks in with its record info
+        event.listen(pool_events, "invalidate", _leave_lane)
+    writer_lane.enabled = True
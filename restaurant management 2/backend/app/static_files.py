@@ -0,0 +1,112 @@
+"""
+Static file serving tuned for repeat visits
+
+- Uploads named by their content hash (images.py: 32 hex digits, plus
+  _thumb/_card/_full for variants) never change under the same URL, so they are cached for a year as immutable
+  and repeat menu views skip the network entirely. Anything else must be
+  revalidated, which costs a 304 via ETag/Last-Modified.
+- Compressible assets are served from precompressed .br/.gz siblings when
+  the client accepts them (q > 0, see compression.acceptable); precompress()
+  writes those at startup.
+"""
+import gzip
+import mimetypes
+import os
+import re
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from .compression import acceptable
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without it only gzip variants are written
+    brotli = None
+
+# Only images.py's naming; older uploads like 20251016_141012_photo-<hex>.jpg are not content-addressed
+FINGERPRINT = re.compile(r"^[0-9a-f]{32}(_(thumb|card|full))?\.\w+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+COMPRESSIBLE = {".css", ".csv", ".html", ".js", ".json", ".map", ".svg", ".txt", ".xml"}
+MIN_COMPRESS_BYTES = 1024
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+def is_fingerprinted(filename: str) -> bool:
+    return FINGERPRINT.match(filename) is not None
+
+def _is_compressible(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in COMPRESSIBLE
+
+def _fresh_variant(path: str, source_stat: os.stat_result):
+    """stat of a precompressed variant, unless it is missing or older than its source"""
+    try:
+        variant_stat = os.stat(path)
+    except OSError:
+        return None
+    return variant_stat if variant_stat.st_mtime >= source_stat.st_mtime else None
+
+class CachedStaticFiles(StaticFiles):
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        path = os.fspath(full_path)
+        headers = {"Cache-Control": IMMUTABLE if is_fingerprinted(os.path.basename(path)) else REVALIDATE}
+        served_path, served_stat, encoding = path, stat_result, None
+
+        if _is_compressible(path):
+            headers["Vary"] = "Accept-Encoding"
+            for name in acceptable(request_headers.get("accept-encoding", "")):
+                suffix = SUFFIXES[name]
+                variant_stat = _fresh_variant(path + suffix, stat_result)
+                if variant_stat is not None:
+                    served_path, served_stat, encoding = path + suffix, variant_stat, name
+                    break
+
+        # Each encoding gets its own ETag from the file it is read from
+        response = FileResponse(
+            served_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=mimetypes.guess_type(path)[0] or "application/octet-stream",
+            stat_result=served_stat,
+        )
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+def _write_variant(path: str, data: bytes):
+    temp_path = f"{path}.part"
+    with open(temp_path, "wb") as out:
+        out.write(data)
+    os.replace(temp_path, path)
+
+_COMPRESSORS = {".gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+if brotli is not None:
+    _COMPRESSORS[".br"] = lambda data: brotli.compress(data, quality=11)
+
+def precompress(directory: str) -> int:
+    """Write .gz (and .br if available) next to compressible files that lack a fresh one"""
+    written = 0
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            if not _is_compressible(path):
+                continue
+            source_stat = os.stat(path)
+            if source_stat.st_size < MIN_COMPRESS_BYTES:
+                continue
+            data = None
+            for suffix, compress in _COMPRESSORS.items():
+                if _fresh_variant(path + suffix, source_stat) is not None:
+                    continue
+                if data is None:
+                    with open(path, "rb") as source:
+                        data = source.read()
+                compressed = compress(data)
+                # Not worth serving if it does not shrink
+                if len(compressed) < len(data):
+                    _write_variant(path + suffix, compressed)
+                    written += 1
+    return written
@@ -0,0 +1,176 @@
+"""
+Atomic stock movements
+
+Usage is subtracted inside the database with one set-based UPDATE
+(current_stock = current_stock - CASE id WHEN ... END), so two chefs
+logging the same ingredient at once both count; the old read, subtract in
+Python, write back lost one of the decrements. The optional non-negative
+guard is part of the same statement's WHERE clause: if any ingredient would
+go below zero the statement returns fewer rows than asked, an HTTPException
+is raised and get_db rolls the whole transaction back.
+The usage log is written with one bulk INSERT. The new levels feed the
+low-stock alerts (see inventory_alerts.py) in the same transaction.
+
+Orders consume their recipes automatically: when an order starts cooking,
+the bill of materials for all its lines (order quantity x
+menu_item_ingredients.quantity_required) is computed in one joined query
+and deducted, with usage rows marked automatic. Cancelling the order puts
+the stock back and deletes those rows, so a restarted order deducts again.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from fastapi import HTTPException
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+from . import inventory_alerts, models, rollups, schemas
+from .recipe_matrix import recipe_matrix
+from .versioning import bump
+
+class StockLevel(NamedTuple):
+    name: str
+    unit: str
+    current_stock: float
+    minimum_stock: Optional[float]
+
+class UsageResult(NamedTuple):
+    logs: List[models.IngredientUsage]
+    # ingredient id -> stock after this usage
+    stock: Dict[int, StockLevel]
+
+def _totals(usages: Sequence[schemas.IngredientUsageCreate]) -> Dict[int, float]:
+    """Quantity per ingredient; a batch may list the same ingredient more than once"""
+    totals = defaultdict(float)
+    for usage in usages:
+        totals[usage.ingredient_id] += usage.quantity_used
+    return dict(totals)
+
+_LEVEL_COLUMNS = (
+    models.Ingredient.id, models.Ingredient.name, models.Ingredient.unit,
+    models.Ingredient.current_stock, models.Ingredient.minimum_stock
+)
+
+def _levels(rows) -> Dict[int, StockLevel]:
+    return {row.id: StockLevel(row.name, row.unit, float(row.current_stock), row.minimum_stock) for row in rows}
+
+def deduct(db: Session, totals: Dict[int, float], allow_negative: bool = False) -> Dict[int, StockLevel]:
+    """Subtract quantities per ingredient id in one statement; 404/400 if any is missing or short"""
+    if not totals:
+        return {}
+    quantity = case(totals, value=models.Ingredient.id)
+    stmt = (
+        update(models.Ingredient)
+        .where(models.Ingredient.id.in_(totals))
+        .values(current_stock=models.Ingredient.current_stock - quantity)
+        .returning(*_LEVEL_COLUMNS)
+        # Objects already loaded in the session are not refreshed; use the returned levels
+        .execution_options(synchronize_session=False)
+    )
+    if not allow_negative:
+        stmt = stmt.where(models.Ingredient.current_stock >= quantity)
+    levels = _levels(db.execute(stmt))
+
+    if len(levels) != len(totals):
+        # The exception makes get_db roll back the rows that were updated
+        missed = [ingredient_id for ingredient_id in totals if ingredient_id not in levels]
+        current = _levels(db.execute(select(*_LEVEL_COLUMNS).where(models.Ingredient.id.in_(missed))))
+        for ingredient_id in missed:
+            if ingredient_id not in current:
+                raise HTTPException(status_code=404, detail=f"Ingredient with id {ingredient_id} not found")
+        level = current[missed[0]]
+        raise HTTPException(
+            status_code=400,
+            detail=f"Insufficient stock of {level.name}. Available: {level.current_stock} {level.unit}"
+        )
+
+    # "menu" only moves if a dish is 86'd or restored (refresh_availability)
+    bump(db, "stock")
+    recipe_matrix.refresh_availability(db, levels)
+    inventory_alerts.sync(db, levels)
+    return levels
+
+def record_usage(
+    db: Session,
+    usages: Sequence[schemas.IngredientUsageCreate],
+    allow_negative: bool = False
+) -> UsageResult:
+    """Deduct the usages from stock and write their log rows, inside the caller's transaction"""
+    if not usages:
+        return UsageResult([], {})
+    stock = deduct(db, _totals(usages), allow_negative=allow_negative)
+    logs = list(db.scalars(
+        insert(models.IngredientUsage).returning(models.IngredientUsage),
+        [usage.model_dump() for usage in usages]
+    ))
+    rollups.record_ingredient_usage(db, logs)
+    return UsageResult(logs, stock)
+
+# ===== RECIPE DEDUCTION =====
+
+# An order entering any of these has been (or is being) cooked
+COOKING_STATUSES = {"In Progress", "Ready", "Completed"}
+CANCELLED = "Cancelled"
+
+def _bill_of_materials(db: Session, order_id: int) -> Dict[int, float]:
+    """Ingredient id -> total quantity for every line of the order, in one query"""
+    quantity = func.sum(models.order_items.c.quantity * models.menu_item_ingredients.c.quantity_required)
+    rows = db.execute(
+        select(models.menu_item_ingredients.c.ingredient_id, quantity)
+        .join(models.order_items, models.order_items.c.menu_item_id == models.menu_item_ingredients.c.menu_item_id)
+        .where(models.order_items.c.order_id == order_id)
+        .group_by(models.menu_item_ingredients.c.ingredient_id)
+    )
+    return {ingredient_id: total for ingredient_id, total in rows if total}
+
+def _automatic_usage(db: Session, order_id: int) -> List[Tuple[datetime, int, float]]:
+    """(used_at, ingredient_id, quantity) of the order's recipe deductions"""
+    return db.execute(
+        select(models.IngredientUsage.used_at, models.IngredientUsage.ingredient_id, models.IngredientUsage.quantity_used)
+        .where(models.IngredientUsage.order_id == order_id, models.IngredientUsage.automatic.is_(True))
+    ).all()
+
+def consume_order(db: Session, order: models.Order):
+    """Deduct the order's recipes once; the kitchen is never blocked, so stock may go negative"""
+    if _automatic_usage(db, order.id):
+        return
+    totals = _bill_of_materials(db, order.id)
+    if not totals:
+        return
+    levels = deduct(db, totals, allow_negative=True)
+    logs = list(db.scalars(insert(models.IngredientUsage).returning(models.IngredientUsage), [
+        {
+            "ingredient_id": ingredient_id,
+            "order_id": order.id,
+            "quantity_used": quantity,
+            "unit": levels[ingredient_id].unit,
+            "notes": f"Recipe deduction for order #{order.id}",
+            "automatic": True,
+        }
+        for ingredient_id, quantity in totals.items()
+    ]))
+    rollups.record_ingredient_usage(db, logs)
+
+def restore_order(db: Session, order: models.Order):
+    """Put back what consume_order took and drop its usage rows"""
+    used = _automatic_usage(db, order.id)
+    if not used:
+        return
+    returned = defaultdict(float)
+    for _, ingredient_id, quantity in used:
+        returned[ingredient_id] -= quantity
+    deduct(db, dict(returned), allow_negative=True)
+    rollups.record_ingredient_usage_removed(db, used)
+    db.execute(
+        delete(models.IngredientUsage)
+        .where(models.IngredientUsage.order_id == order.id, models.IngredientUsage.automatic.is_(True))
+        .execution_options(synchronize_session=False)
+    )
+
+def record_order_status(db: Session, order: models.Order, old_status: str):
+    """Called by the order write paths after a status change, like rollups.record_order_status"""
+    if order.status == old_status:
+        return
+    if order.status in COOKING_STATUSES:
+        consume_order(db, order)
+    elif order.status == CANCELLED:
+        restore_order(db, order)
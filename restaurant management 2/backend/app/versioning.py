@@ -0,0 +1,113 @@
+"""
+Per-collection version counters and conditional GET (ETag / If-None-Match)
+
+Each resource collection (menu, tables, orders, bills) has a counter row in
+resource_versions that is bumped in the same transaction as any write to its
+tables. A read endpoint turns the counters it depends on into a weak ETag and
+answers 304 Not Modified before running its main query or serializing.
+Because the counters live in the database, every worker sees the same ETag.
+"""
+from datetime import datetime
+from typing import Callable, Dict, Optional
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from .database import engine, get_async_db, get_db
+from .models import ResourceVersion
+
+# Tables whose writes change each collection's responses. Ingredients are
+# part of the menu because menu items embed their ingredients.
+RESOURCE_TABLES = {
+    "menu_items": "menu",
+    "menu_item_ingredients": "menu",
+    "ingredients": "menu",
+    "tables": "tables",
+    "orders": "orders",
+    "order_items": "orders",
+    "bills": "bills",
+}
+# Set-based stock movements (stock.deduct) bump only "stock": cooking an
+# order should not invalidate the menu. Menu and order responses embed
+# ingredients without their stock for that reason; live levels come from
+# /api/inventory, tagged with "stock".
+RESOURCES = sorted(set(RESOURCE_TABLES.values()) | {"stock"})
+
+def ensure_resource_versions():
+    """Create the counter rows so bumps only ever need an UPDATE"""
+    with engine.begin() as conn:
+        existing = set(conn.execute(select(ResourceVersion.name)).scalars())
+        missing = [{"name": name, "version": 0} for name in RESOURCES if name not in existing]
+        if missing:
+            conn.execute(insert(ResourceVersion), missing)
+
+def bump(db: Session, *resources: str):
+    """Bump collection counters inside the caller's transaction"""
+    if not resources:
+        return
+    db.execute(
+        update(ResourceVersion)
+        .where(ResourceVersion.name.in_(resources))
+        .values(version=ResourceVersion.version + 1, updated_at=datetime.utcnow())
+    )
+
+@event.listens_for(Session, "before_flush")
+def _bump_flushed_resources(session, flush_context, instances):
+    # ORM writes bump automatically; bulk Core statements must call bump()
+    changed = set()
+    for obj in list(session.new) + list(session.deleted):
+        changed.add(obj.__table__.name)
+    for obj in session.dirty:
+        if session.is_modified(obj):
+            changed.add(obj.__table__.name)
+
+    resources = {RESOURCE_TABLES[table] for table in changed if table in RESOURCE_TABLES}
+    if resources:
+        bump(session, *sorted(resources))
+
+def _versions_query(resources):
+    return select(ResourceVersion.name, ResourceVersion.version).where(ResourceVersion.name.in_(resources))
+
+def current_versions(db: Session, *resources: str) -> Dict[str, int]:
+    rows = db.execute(_versions_query(resources)).all()
+    return {name: version for name, version in rows}
+
+async def current_versions_async(db: AsyncSession, *resources: str) -> Dict[str, int]:
+    rows = (await db.execute(_versions_query(resources))).all()
+    return {name: version for name, version in rows}
+
+def make_etag(versions: Dict[str, int], *resources: str, extra: str = "") -> str:
+    token = "-".join(f"{name}{versions.get(name, 0)}" for name in resources)
+    if extra:
+        token = f"{token}-{extra}"
+    return f'W/"{token}"'
+
+def etag_for(db: Session, *resources: str, extra: str = "") -> str:
+    return make_etag(current_versions(db, *resources), *resources, extra=extra)
+
+def _answer(request: Request, response: Response, etag: str) -> str:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return etag
+
+def conditional(*resources: str, extra: Optional[Callable[[], str]] = None):
+    """
+    Dependency that answers 304 when If-None-Match matches the collections' ETag
+    Otherwise sets the ETag header and returns it, for endpoints that build their own Response
+    """
+    def dependency(request: Request, response: Response, db: Session = Depends(get_db)) -> str:
+        return _answer(request, response, etag_for(db, *resources, extra=extra() if extra else ""))
+    return dependency
+
+def conditional_async(*resources: str, extra: Optional[Callable[[], str]] = None):
+    """
+    conditional() for async routes: reads the counters on the request's
+    AsyncSession, so the check shares the route's connection and stays off the threadpool
+    """
+    async def dependency(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)) -> str:
+        versions = await current_versions_async(db, *resources)
+        return _answer(request, response, make_etag(versions, *resources, extra=extra() if extra else ""))
+    return dependency
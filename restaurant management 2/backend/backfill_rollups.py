@@ -0,0 +1,29 @@
+"""
+Rebuild the daily rollup tables (daily_sales, daily_item_sales,
+daily_ingredient_usage) from existing orders, bills and ingredient usage.
+Safe to re-run at any time.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal, engine, Base
+from app.rollups import rebuild_rollups
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        print("🔄 Rebuilding daily sales rollups...")
+        stats = rebuild_rollups(db)
+        print(f"✅ Rolled up {stats['orders']} orders into {stats['days']} days "
+              f"({stats['item_days']} day/item rows, {stats['ingredient_days']} day/ingredient rows)")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Backfill failed: {e}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
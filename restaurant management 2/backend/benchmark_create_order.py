@@ -0,0 +1,65 @@
+"""
+Benchmark order placement latency as the number of order lines grows
+Runs against a throwaway SQLite database so restaurant.db is never touched
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+db_file = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{db_file}"
+
+from sqlalchemy import event
+from app.database import SessionLocal, engine, Base
+from app import crud, models, schemas
+
+LINE_COUNTS = [1, 4, 12, 24, 48]
+ORDERS_PER_SIZE = 50
+
+def seed(db):
+    for i in range(max(LINE_COUNTS)):
+        db.add(models.MenuItem(name=f"Dish {i}", category="Main Course", price=100 + i))
+    db.add(models.RestaurantTable(table_number=1, capacity=4))
+    db.commit()
+    return [item.id for item in db.query(models.MenuItem).all()], db.query(models.RestaurantTable).first().id
+
+def run_benchmark():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+
+    statements = {"count": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements["count"] += 1
+
+    try:
+        menu_item_ids, table_id = seed(db)
+
+        print(f"📊 {ORDERS_PER_SIZE} orders per size, database: {db_file}\n")
+        print(f"{'lines':>6} {'ms/order':>10} {'statements/order':>18}")
+
+        for line_count in LINE_COUNTS:
+            order = schemas.OrderCreate(
+                table_id=table_id,
+                items=[{"menu_item_id": item_id, "quantity": 2} for item_id in menu_item_ids[:line_count]]
+            )
+
+            statements["count"] = 0
+            start = time.perf_counter()
+            for _ in range(ORDERS_PER_SIZE):
+                crud.create_order(db, order)
+                db.commit()
+            elapsed = time.perf_counter() - start
+
+            print(f"{line_count:>6} {elapsed / ORDERS_PER_SIZE * 1000:>10.2f} {statements['count'] / ORDERS_PER_SIZE:>18.1f}")
+    finally:
+        db.close()
+        engine.dispose()
+        os.remove(db_file)
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,73 @@
+"""
+Benchmark the streaming dish import on a synthetic catalog
+Writes N rows (default 1,000,000) to a temp CSV, imports them into a
+throwaway SQLite database, then imports again to show a re-run is a no-op
+
+    python benchmark_dish_import.py [rows]
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+work_dir = tempfile.mkdtemp()
+db_file = os.path.join(work_dir, "benchmark.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{db_file}"
+
+from app.database import engine, Base
+from app.dish_import import import_dishes
+from app.dish_search import ensure_dish_search_index
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+INGREDIENTS = ["Rice", "Chicken", "Paneer", "Onion", "Tomato", "Ginger", "Garlic", "Green Chilies",
+               "Cumin Seeds", "Ghee", "Curd", "Potato", "Lentils", "Coconut", "Mustard Oil"]
+COURSES = ["main course", "dessert", "snack", "starter"]
+REGIONS = ["North", "South", "East", "West", "North East", "Central"]
+
+def write_catalog(path):
+    rng = random.Random(42)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "ingredients", "diet", "prep_time", "cook_time", "flavor_profile", "course", "state", "region"])
+        for i in range(ROWS):
+            writer.writerow([
+                f"Dish {i}",
+                ", ".join(rng.sample(INGREDIENTS, 4)),
+                rng.choice(["vegetarian", "non vegetarian"]),
+                rng.choice([5, 10, 15, 20, -1]),
+                rng.choice([10, 20, 30, 45]),
+                rng.choice(["spicy", "sweet", "bitter", "-1"]),
+                rng.choice(COURSES),
+                "-1",
+                rng.choice(REGIONS),
+            ])
+
+def run(path, label):
+    start = time.perf_counter()
+    with open(path, "r", encoding="utf-8-sig", newline="") as stream:
+        report = import_dishes(engine, stream, "csv")
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {elapsed:>8.1f}s {report.rows_per_second:>12,.0f} "
+          f"{report.inserted:>10,} {report.updated:>9,} {report.unchanged:>10,} {report.rejected:>9,}")
+
+def run_benchmark():
+    csv_path = os.path.join(work_dir, "dishes.csv")
+    start = time.perf_counter()
+    write_catalog(csv_path)
+    print(f"📄 {ROWS:,} rows, {os.path.getsize(csv_path) / 1e6:.0f} MB, generated in {time.perf_counter() - start:.1f}s")
+    print(f"📊 Database: {db_file}\n")
+
+    Base.metadata.create_all(bind=engine)
+    ensure_dish_search_index(engine)
+
+    print(f"{'run':<10} {'time':>9} {'rows/s':>12} {'inserted':>10} {'updated':>9} {'unchanged':>10} {'rejected':>9}")
+    run(csv_path, "initial")
+    run(csv_path, "re-run")
+    engine.dispose()
+
+if __name__ == "__main__":
+    run_benchmark()
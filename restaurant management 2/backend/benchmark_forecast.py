@@ -0,0 +1,93 @@
+"""
+Benchmark the grocery-list forecast on a year of usage history
+Seeds a throwaway SQLite database with INGREDIENTS ingredients used every
+day for a year (weekends at twice the weekday rate), then times the first
+load (a year of daily_ingredient_usage + rates), the next day's rollover
+(one new day + rates) and the cached path (stock read + reorder)
+
+    python benchmark_forecast.py [ingredients]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, time as day_time, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+db_file = os.path.join(tempfile.mkdtemp(), "forecast.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{db_file}"
+
+from sqlalchemy import insert
+from app.database import SessionLocal, engine, Base, create_missing_indexes
+from app.forecast import ConsumptionForecast, advance, compute_rates, group_by_supplier
+from app.rollups import rebuild_ingredient_usage
+from app import models
+
+INGREDIENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+DAYS = 365
+SUPPLIERS = 12
+ROUNDS = 20
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    create_missing_indexes()
+    today = datetime.utcnow().date()
+    with engine.begin() as conn:
+        conn.execute(insert(models.Ingredient), [
+            {"name": f"Ingredient {i}", "current_stock": 5 + i % 40, "minimum_stock": 5,
+             "supplier": f"Supplier {i % SUPPLIERS}", "cost_per_unit": 10 + i % 7}
+            for i in range(INGREDIENTS)
+        ])
+        for day in range(1, DAYS + 1):
+            used_at = datetime.combine(today - timedelta(days=day), day_time(14))
+            weekend = used_at.weekday() >= 5
+            conn.execute(insert(models.IngredientUsage), [
+                {"ingredient_id": i + 1, "quantity_used": (1 + i % 5) * (2 if weekend else 1), "used_at": used_at}
+                for i in range(INGREDIENTS)
+            ])
+    with SessionLocal() as db:
+        rebuild_ingredient_usage(db)
+
+def run_benchmark():
+    start = time.perf_counter()
+    seed()
+    print(f"📊 {INGREDIENTS} ingredients x {DAYS} days = {INGREDIENTS * DAYS:,} usage rows "
+          f"(seeded in {time.perf_counter() - start:.1f}s)\n")
+
+    forecast = ConsumptionForecast()
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        rates = forecast.rates(db)
+        first_load = time.perf_counter() - start
+
+        # What the next day costs: shift the cached history and read one day
+        today = datetime.utcnow().date()
+        yesterday = advance(db, None, today - timedelta(days=1))
+        start = time.perf_counter()
+        compute_rates(advance(db, yesterday, today))
+        rollover = time.perf_counter() - start
+
+        history = advance(db, None, today)
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            compute_rates(history)
+        rates_pass = (time.perf_counter() - start) / ROUNDS
+
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            lines = forecast.reorder(db)
+            group_by_supplier(lines)
+        cached = (time.perf_counter() - start) / ROUNDS
+
+    # Ingredient 1 uses 1/day on weekdays and 2/day at weekends
+    print(f"rates for ingredient 1 (Mon..Sun): {[round(rate, 2) for rate in rates.rates[0]]}")
+    print(f"first load (a year + rates)  {first_load * 1000:8.1f} ms")
+    print(f"next day (one day + rates)   {rollover * 1000:8.1f} ms")
+    print(f"rates pass alone             {rates_pass * 1000:8.1f} ms")
+    print(f"cached (per request)         {cached * 1000:8.1f} ms")
+    print(f"\n{len(lines)} ingredients to reorder across {len(group_by_supplier(lines))} suppliers")
+    engine.dispose()
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,110 @@
+"""
+Benchmark API latency during a login storm (shift change)
+Starts the API on a throwaway SQLite database, measures GET /api/orders/
+latency alone and then while STAFF users log in at once, and prints the
+event-loop lag and password-hash pool metrics from /api/monitoring/
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+work_dir = tempfile.mkdtemp()
+db_file = os.path.join(work_dir, "login_storm.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{db_file}"
+os.chdir(work_dir)
+
+import httpx
+import uvicorn
+from app.main import app
+from app.database import SessionLocal
+from app.auth import get_password_hash
+from app import models
+
+PORT = 8799
+BASE_URL = f"http://127.0.0.1:{PORT}"
+STAFF = 30
+PROBES = 4
+PHASE_SECONDS = 3
+PASSWORD = "shift-change-1"
+
+def seed():
+    db = SessionLocal()
+    hashed = get_password_hash(PASSWORD)
+    for i in range(STAFF):
+        db.add(models.User(username=f"staff{i}", email=f"staff{i}@example.com",
+                           hashed_password=hashed, role=models.UserRole.STAFF))
+    db.commit()
+    db.close()
+
+def start_server():
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=PORT, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+async def probe(client, latencies, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/api/orders/", params={"limit": 20})
+        latencies.append(time.perf_counter() - start)
+
+async def login(client, i):
+    response = await client.post("/api/auth/login", data={"username": f"staff{i}", "password": PASSWORD})
+    return response.status_code
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000 if samples else 0.0
+
+async def measure(client, storm: bool):
+    latencies = []
+    stop = asyncio.Event()
+    probes = [asyncio.create_task(probe(client, latencies, stop)) for _ in range(PROBES)]
+    statuses = []
+    if storm:
+        await asyncio.sleep(0.2)
+        statuses = await asyncio.gather(*(login(client, i) for i in range(STAFF)))
+    await asyncio.sleep(PHASE_SECONDS)
+    stop.set()
+    await asyncio.gather(*probes)
+    return latencies, statuses
+
+async def run_phases():
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=30) as client:
+        baseline, _ = await measure(client, storm=False)
+        during, statuses = await measure(client, storm=True)
+        metrics = (await client.get("/api/monitoring/")).json()
+    return baseline, during, statuses, metrics
+
+def run_benchmark():
+    seed()
+    server, thread = start_server()
+    try:
+        baseline, during, statuses, metrics = asyncio.run(run_phases())
+    finally:
+        server.should_exit = True
+        thread.join()
+
+    print(f"📊 {STAFF} simultaneous logins, {PROBES} concurrent GET /api/orders/ probes\n")
+    print(f"{'phase':>10} {'requests':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, latencies in (("baseline", baseline), ("storm", during)):
+        print(f"{name:>10} {len(latencies):>9} {percentile(latencies, 0.5):>8.2f} {percentile(latencies, 0.99):>8.2f}")
+
+    ok = sum(1 for code in statuses if code == 200)
+    rejected = sum(1 for code in statuses if code == 503)
+    loop = metrics["event_loop"]
+    hashing = metrics["password_hashing"]
+    print(f"\n🔐 logins: {ok} ok, {rejected} rejected (503)")
+    print(f"🔐 hash p50/p99: {hashing['hash_p50_ms']}/{hashing['hash_p99_ms']} ms, "
+          f"queue wait p99: {hashing['wait_p99_ms']} ms, max queue depth: {hashing['max_queue_depth']}")
+    print(f"⏱️  event-loop lag max: {loop['max_ms']} ms, stalls over {loop['stall_threshold_ms']:.0f} ms: {loop['stalls']}")
+
+if __name__ == "__main__":
+    run_benchmark()
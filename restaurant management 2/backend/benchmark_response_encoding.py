@@ -0,0 +1,95 @@
+"""
+Benchmark JSON encoding and bytes on the wire for the large list endpoints
+Compares the stdlib json encoder (FastAPI's old default) with orjson, and
+identity vs gzip vs brotli transfer, against a throwaway SQLite database
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+work_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(work_dir, 'benchmark.db')}"
+# main.py creates static/ relative to the working directory
+os.chdir(work_dir)
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.testclient import TestClient
+from app.database import SessionLocal, engine
+from app.dish_import import import_dishes
+from app import crud, models, schemas
+from app.main import app
+
+MENU_ITEMS = 80
+INGREDIENTS_PER_ITEM = 6
+ORDERS = 500
+LINES_PER_ORDER = 4
+ENCODE_ROUNDS = 50
+REQUEST_ROUNDS = 20
+ENDPOINTS = ["/api/orders/?limit=500", "/api/menu/", "/api/dishes/?limit=500"]
+DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Ifood_new.csv")
+
+def seed():
+    with SessionLocal() as db:
+        ingredients = [models.Ingredient(name=f"Ingredient {i}", category="Spices", current_stock=10) for i in range(40)]
+        db.add_all(ingredients)
+        for i in range(MENU_ITEMS):
+            item = models.MenuItem(name=f"Dish {i}", category="Main Course", price=120 + i,
+                                   description="House special with a long enough description to look real")
+            item.ingredients = ingredients[i % 30:i % 30 + INGREDIENTS_PER_ITEM]
+            db.add(item)
+        db.add(models.RestaurantTable(table_number=1, capacity=4))
+        db.commit()
+        menu_item_ids = [item_id for (item_id,) in db.query(models.MenuItem.id)]
+        table_id = db.query(models.RestaurantTable.id).scalar()
+        for i in range(ORDERS):
+            start = (i * LINES_PER_ORDER) % (len(menu_item_ids) - LINES_PER_ORDER)
+            crud.create_order(db, schemas.OrderCreate(
+                table_id=table_id,
+                items=[{"menu_item_id": item_id, "quantity": 2} for item_id in menu_item_ids[start:start + LINES_PER_ORDER]]
+            ))
+        db.commit()
+    with open(DATASET, "r", encoding="utf-8-sig", newline="") as stream:
+        import_dishes(engine, stream, "csv")
+
+def wire_bytes(client, path, encoding):
+    with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+        size = sum(len(chunk) for chunk in response.iter_raw())
+        return size, response.headers.get("content-encoding", "identity")
+
+def timed_requests(client, path, encoding):
+    start = time.perf_counter()
+    for _ in range(REQUEST_ROUNDS):
+        client.get(path, headers={"Accept-Encoding": encoding})
+    return (time.perf_counter() - start) / REQUEST_ROUNDS * 1000
+
+def timed_encode(response_class, content):
+    start = time.perf_counter()
+    for _ in range(ENCODE_ROUNDS):
+        response_class(content)
+    return (time.perf_counter() - start) / ENCODE_ROUNDS * 1000
+
+def run_benchmark():
+    with TestClient(app) as client:
+        seed()
+        print(f"📊 {ORDERS} orders x {LINES_PER_ORDER} lines, {MENU_ITEMS} menu items x {INGREDIENTS_PER_ITEM} ingredients\n")
+        print(f"{'endpoint':<24} {'json ms':>8} {'orjson ms':>10} {'identity':>10} {'gzip':>9} {'br':>9} "
+              f"{'req ms id':>10} {'req ms br':>10}")
+        for path in ENDPOINTS:
+            content = client.get(path, headers={"Accept-Encoding": "identity"}).json()
+            json_ms = timed_encode(JSONResponse, content)
+            orjson_ms = timed_encode(ORJSONResponse, content)
+            sizes = {}
+            for encoding in ("identity", "gzip", "br"):
+                size, served = wire_bytes(client, path, encoding)
+                # The menu snapshot is pre-gzipped and answers br clients with gzip
+                sizes[encoding] = f"{size:,}" + ("" if served == encoding else "*")
+            print(f"{path:<24} {json_ms:>8.2f} {orjson_ms:>10.2f} {sizes['identity']:>10} {sizes['gzip']:>9} {sizes['br']:>9} "
+                  f"{timed_requests(client, path, 'identity'):>10.1f} {timed_requests(client, path, 'br'):>10.1f}")
+        print("\n* served with a different encoding than requested")
+    engine.dispose()
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,106 @@
+"""
+Benchmark 200 concurrent order placements against SQLite
+Runs the API once per SQLite profile (default, production) on a throwaway
+database, fires every POST /api/orders/ at once and counts failures such as
+"database is locked". Each profile runs in its own process because the
+profile is read when app.database is imported.
+
+    python benchmark_sqlite_writes.py [orders]
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ORDERS = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 200
+PROFILES = ["default", "production"]
+PORT = 8798
+TABLES = 20
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000 if samples else 0.0
+
+def run_profile():
+    """Child process: the profile comes from SQLITE_PROFILE"""
+    work_dir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(work_dir, 'writes.db')}"
+    os.chdir(work_dir)
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+    import httpx
+    import uvicorn
+    from app.main import app
+    from app.database import SessionLocal
+    from app import models
+
+    with SessionLocal() as db:
+        db.add_all(models.RestaurantTable(table_number=i + 1, capacity=4) for i in range(TABLES))
+        db.add_all(models.MenuItem(name=f"Dish {i}", category="Main Course", price=100 + i) for i in range(10))
+        db.commit()
+        table_ids = [table_id for (table_id,) in db.query(models.RestaurantTable.id)]
+        menu_item_ids = [item_id for (item_id,) in db.query(models.MenuItem.id)]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=PORT, log_level=os.environ.get("BENCH_LOG", "critical")))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    async def place(client, i):
+        order = {
+            "table_id": table_ids[i % len(table_ids)],
+            "items": [{"menu_item_id": menu_item_ids[(i + k) % len(menu_item_ids)], "quantity": 1} for k in range(3)]
+        }
+        start = time.perf_counter()
+        try:
+            response = await client.post("/api/orders/", json=order)
+            return response.status_code, time.perf_counter() - start
+        except httpx.HTTPError as e:
+            return type(e).__name__, time.perf_counter() - start
+
+    async def storm():
+        limits = httpx.Limits(max_connections=ORDERS)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=120, limits=limits) as client:
+            start = time.perf_counter()
+            results = await asyncio.gather(*(place(client, i) for i in range(ORDERS)))
+            elapsed = time.perf_counter() - start
+        # Fresh connection: the storm's keep-alive connections may have been closed by the server
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}") as client:
+            metrics = (await client.get("/api/monitoring/")).json()
+        return results, elapsed, metrics
+
+    try:
+        results, elapsed, metrics = asyncio.run(storm())
+    finally:
+        server.should_exit = True
+        thread.join()
+
+    with SessionLocal() as db:
+        stored = db.query(models.Order).count()
+    ok = [latency for status, latency in results if status == 200]
+    failures = {}
+    for status, _ in results:
+        if status != 200:
+            failures[status] = failures.get(status, 0) + 1
+    lane = metrics["sqlite_writer_lane"]
+    print(f"{os.environ.get('SQLITE_PROFILE', 'default'):<11} {len(ok):>4} {sum(failures.values()):>7} {stored:>7} "
+          f"{elapsed:>7.2f} {percentile(ok, 0.5):>8.1f} {percentile(ok, 0.99):>8.1f} "
+          f"{lane['max_queue_depth']:>10}  {failures or ''}")
+
+def run_benchmark():
+    print(f"📊 {ORDERS} concurrent POST /api/orders/, 3 lines each\n")
+    print(f"{'profile':<11} {'ok':>4} {'failed':>7} {'stored':>7} {'wall s':>7} {'p50 ms':>8} {'p99 ms':>8} {'lane depth':>10}")
+    for profile in PROFILES:
+        env = dict(os.environ, SQLITE_PROFILE=profile)
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--child", str(ORDERS)], env=env, check=True)
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        ORDERS = int(sys.argv[-1])
+        run_profile()
+    else:
+        run_benchmark()
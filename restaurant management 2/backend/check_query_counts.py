@@ -0,0 +1,134 @@
+"""
+Guard against N+1 lazy loads in list endpoints
+Seeds a throwaway SQLite database at two sizes and asserts every list endpoint
+issues the same number of queries (including response serialization) at both
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+db_file = os.path.join(tempfile.mkdtemp(), "query_counts.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{db_file}"
+
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from fastapi import Response
+from app.database import SessionLocal, AsyncSessionLocal, engine, async_engine, Base
+from app import crud, models, schemas
+from app.routers import orders, chef, menu
+
+SIZES = [5, 50]
+
+def seed(db, size):
+    """Add `size` menu items (two ingredients each) and `size` orders"""
+    table = db.query(models.RestaurantTable).first()
+    if table is None:
+        table = models.RestaurantTable(table_number=1)
+        db.add(table)
+        db.flush()
+
+    start = db.query(models.MenuItem).count()
+    for i in range(start, size):
+        item = models.MenuItem(name=f"Dish {i}", category="Main Course", price=100)
+        item.ingredients = [
+            models.Ingredient(name=f"Ingredient {i}a"),
+            models.Ingredient(name=f"Ingredient {i}b"),
+        ]
+        db.add(item)
+    db.commit()
+
+    menu_item_ids = [item_id for (item_id,) in db.query(models.MenuItem.id).all()]
+    for i in range(db.query(models.Order).count(), size):
+        crud.create_order(db, schemas.OrderCreate(
+            table_id=table.id,
+            items=[{"menu_item_id": menu_item_ids[i % len(menu_item_ids)], "quantity": 2},
+                   {"menu_item_id": menu_item_ids[(i + 1) % len(menu_item_ids)]}]
+        ))
+    db.commit()
+
+async def read_orders(db):
+    return await orders.read_orders(Response(), active_only=False, status=None, table_id=None,
+                                    created_from=None, created_to=None, cursor=None, limit=100, db=db)
+
+async def read_active_orders(db):
+    return await chef.get_active_orders(db=db)
+
+# Async endpoints get an AsyncSession, where a missed load plan raises instead of lazy loading
+ENDPOINTS = {
+    "GET /api/orders/": (read_orders, List[schemas.Order]),
+    "GET /api/chef/orders/active": (read_active_orders, List[schemas.Order]),
+    "GET /api/menu/?limit=500": (
+        lambda db: menu.read_menu_items(request=None, response=Response(), skip=0, limit=500, db=db),
+        List[schemas.MenuItem],
+    ),
+}
+
+async def call_async(call, response_type):
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await call(db)
+            TypeAdapter(response_type).validate_python(result, from_attributes=True)
+    finally:
+        await async_engine.dispose()
+
+def call_sync(call, response_type):
+    db = SessionLocal()
+    try:
+        result = call(db)
+        TypeAdapter(response_type).validate_python(result, from_attributes=True)
+    finally:
+        db.close()
+
+def count_queries(call, response_type):
+    """Run an endpoint and serialize its result the way FastAPI does, counting statements"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = (engine, async_engine.sync_engine)
+    for bind in engines:
+        event.listen(bind, "before_cursor_execute", record)
+    try:
+        if asyncio.iscoroutinefunction(call):
+            asyncio.run(call_async(call, response_type))
+        else:
+            call_sync(call, response_type)
+    finally:
+        for bind in engines:
+            event.remove(bind, "before_cursor_execute", record)
+    return len(statements)
+
+def run_checks():
+    Base.metadata.create_all(bind=engine)
+    counts = {name: [] for name in ENDPOINTS}
+
+    try:
+        for size in SIZES:
+            db = SessionLocal()
+            seed(db, size)
+            db.close()
+            for name, (call, response_type) in ENDPOINTS.items():
+                counts[name].append(count_queries(call, response_type))
+    finally:
+        engine.dispose()
+        os.remove(db_file)
+
+    failed = False
+    for name, per_size in counts.items():
+        ok = len(set(per_size)) == 1
+        failed = failed or not ok
+        detail = ", ".join(f"{size} rows: {count}" for size, count in zip(SIZES, per_size))
+        print(f"{'✅' if ok else '❌'} {name} ({detail})")
+
+    if failed:
+        print("\n❌ Query count grows with row count - check app/loaders.py load plans")
+        sys.exit(1)
+    print("\n✅ All list endpoints use a fixed number of queries")
+
+if __name__ == "__main__":
+    run_checks()
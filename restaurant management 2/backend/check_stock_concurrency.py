@@ -0,0 +1,116 @@
+"""
+Hammer one ingredient's stock from 50 threads against a throwaway SQLite database
+- unguarded: every decrement must land (stock = start - total used)
+- guarded: stock never goes below zero and exactly the available units succeed
+The old read-modify-write in Python is run first for comparison; it loses updates
+"""
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+db_file = os.path.join(tempfile.mkdtemp(), "stock_concurrency.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{db_file}"
+
+from fastapi import HTTPException
+from sqlalchemy.exc import OperationalError
+from app.database import SessionLocal, engine, Base
+from app import models, schemas, stock
+
+THREADS = 50
+USES_PER_THREAD = 20
+START_STOCK = 10_000.0
+GUARDED_STOCK = 500.0
+
+def legacy_usage(db, usage):
+    """The pre-stock.py endpoint body: read, subtract in Python, write back"""
+    ingredient = db.query(models.Ingredient).filter(models.Ingredient.id == usage.ingredient_id).first()
+    ingredient.current_stock -= usage.quantity_used
+    db.add(models.IngredientUsage(**usage.model_dump()))
+
+def atomic_usage(db, usage):
+    stock.record_usage(db, [usage])
+
+def hammer(apply, ingredient_id):
+    """Run THREADS x USES_PER_THREAD one-unit usages, each in its own transaction like a request"""
+    barrier = threading.Barrier(THREADS)
+    counts = {"ok": 0, "rejected": 0, "retried": 0}
+    lock = threading.Lock()
+
+    def worker():
+        barrier.wait()
+        for _ in range(USES_PER_THREAD):
+            usage = schemas.IngredientUsageCreate(ingredient_id=ingredient_id, quantity_used=1)
+            while True:
+                db = SessionLocal()
+                try:
+                    apply(db, usage)
+                    db.commit()
+                    outcome = "ok"
+                except HTTPException:
+                    db.rollback()
+                    outcome = "rejected"
+                except OperationalError:
+                    # SQLite's busy timeout ran out; a client would retry
+                    db.rollback()
+                    with lock:
+                        counts["retried"] += 1
+                    continue
+                finally:
+                    db.close()
+                break
+            with lock:
+                counts[outcome] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+def check(name, start, apply):
+    with SessionLocal() as db:
+        ingredient = models.Ingredient(name=name, current_stock=start)
+        db.add(ingredient)
+        db.commit()
+        ingredient_id = ingredient.id
+
+    counts = hammer(apply, ingredient_id)
+    with SessionLocal() as db:
+        final = db.query(models.Ingredient.current_stock).filter(models.Ingredient.id == ingredient_id).scalar()
+        logged = db.query(models.IngredientUsage).filter(models.IngredientUsage.ingredient_id == ingredient_id).count()
+    print(f"{name:<10} ok={counts['ok']:<5} rejected={counts['rejected']:<5} retried={counts['retried']:<4} "
+          f"usage rows={logged:<5} stock {start:g} -> {final:g} (expected {start - counts['ok']:g})")
+    return counts, final, logged
+
+def run_checks():
+    Base.metadata.create_all(bind=engine)
+    attempts = THREADS * USES_PER_THREAD
+    print(f"📊 {THREADS} threads x {USES_PER_THREAD} usages of 1 unit on one ingredient\n")
+
+    counts, final, _ = check("legacy", START_STOCK, legacy_usage)
+    lost = final - (START_STOCK - counts["ok"])
+    print(f"   legacy read-modify-write lost {lost:g} decrements\n")
+
+    failures = []
+    counts, final, logged = check("atomic", START_STOCK, atomic_usage)
+    if counts["ok"] != attempts or final != START_STOCK - attempts or logged != attempts:
+        failures.append("atomic: decrements or usage rows went missing")
+
+    counts, final, logged = check("guarded", GUARDED_STOCK, atomic_usage)
+    if final < 0:
+        failures.append(f"guarded: stock went negative ({final:g})")
+    if counts["ok"] != GUARDED_STOCK or final != 0 or logged != GUARDED_STOCK:
+        failures.append("guarded: expected exactly the available units to be used")
+    engine.dispose()
+
+    if failures:
+        print("\n❌ " + "\n❌ ".join(failures))
+        sys.exit(1)
+    print("\n✅ No lost updates and the non-negative guard held under contention")
+
+if __name__ == "__main__":
+    run_checks()
@@ -1,133 +1,69 @@
 """
-Import Indian food dataset from CSV to global_dishes table
+Import the Indian food dataset (or any CSV/JSONL dish file) into global_dishes
+
+Non-interactive and safe to re-run: dishes are upserted on name, so a repeat
+import of the same file changes nothing. Targets whatever DATABASE_URL points
+at (SQLite or PostgreSQL) unless --database-url is given.
+
+    python import_dataset.py                      # Ifood_new.csv
+    python import_dataset.py dishes.jsonl --batch-size 5000
+
+A running API server picks up the new dishes in its typeahead and cookable
+indexes on restart; POST /api/dishes/import refreshes them in place.
 """
-import csv
-import sqlite3
+import argparse
+import os
+import sys
 from pathlib import Path
 
-# Paths
-csv_path = Path(__file__).parent / "Ifood_new.csv"
-db_path = Path(__file__).parent / "restaurant.db"
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_CSV = Path(__file__).parent / "Ifood_new.csv"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Upsert dishes from a CSV or JSONL file into global_dishes")
+    parser.add_argument("path", nargs="?", default=str(DEFAULT_CSV), help="CSV or JSONL file (default: Ifood_new.csv)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="File format (default: from the file extension)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Rows per transaction")
+    parser.add_argument("--database-url", help="Database to import into (default: DATABASE_URL)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    # Imported after DATABASE_URL is settled
+    from app.database import engine, Base
+    from app.dish_import import import_dishes, detect_format, DEFAULT_BATCH_SIZE
+    from app.dish_search import ensure_dish_search_index
+
+    path = Path(args.path)
+    if not path.exists():
+        print(f"❌ File not found: {path}")
+        sys.exit(1)
+
+    Base.metadata.create_all(bind=engine)
+    # Create the search index first so its triggers index rows as they land
+    ensure_dish_search_index(engine)
+
+    fmt = args.format or detect_format(path.name)
+    print(f"📂 Importing {path} ({fmt}) into {engine.url.render_as_string(hide_password=True)}")
 
-def clean_text(text):
-    """Clean and normalize text fields"""
-    if not text or text.strip() == '':
-        return None
-    return text.strip()
+    def progress(report):
+        print(f"  ✓ {report.processed:,} rows, {report.rows_per_second:,.0f} rows/s")
 
-def parse_time(time_str):
-    """Parse time string to integer minutes"""
-    if not time_str or time_str.strip() == '':
-        return None
-    try:
-        # Remove any non-digit characters except numbers
-        time_str = time_str.strip().lower()
-        if 'min' in time_str:
-            return int(time_str.replace('min', '').strip())
-        return int(time_str)
-    except (ValueError, AttributeError):
-        return None
+    with open(path, "r", encoding="utf-8-sig", newline="") as stream:
+        report = import_dishes(engine, stream, fmt, batch_size=args.batch_size or DEFAULT_BATCH_SIZE, on_batch=progress)
 
-def import_dishes():
-    if not csv_path.exists():
-        print(f"❌ CSV file not found at: {csv_path}")
-        print(f"Please ensure Ifood_new.csv is in: {csv_path.parent}")
-        return
-    
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    print(f"📂 Reading CSV from: {csv_path}")
-    
-    # Check if table already has data
-    cursor.execute("SELECT COUNT(*) FROM global_dishes")
-    existing_count = cursor.fetchone()[0]
-    
-    if existing_count > 0:
-        response = input(f"⚠️  Table already has {existing_count} dishes. Clear and re-import? (y/n): ")
-        if response.lower() == 'y':
-            cursor.execute("DELETE FROM global_dishes")
-            print("🗑️  Cleared existing data")
-        else:
-            print("❌ Import cancelled")
-            conn.close()
-            return
-    
-    try:
-        imported = 0
-        skipped = 0
-        
-        with open(csv_path, 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            
-            print(f"📊 CSV Columns: {reader.fieldnames}")
-            print("\n🔄 Importing dishes...")
-            
-            for row in reader:
-                # Extract and clean data
-                # Handle both 'name' and '\ufeffname' (BOM issue)
-                name = clean_text(row.get('name') or row.get('\ufeffname'))
-                if not name:
-                    skipped += 1
-                    continue
-                
-                ingredients = clean_text(row.get('ingredients'))
-                diet = clean_text(row.get('diet'))
-                prep_time = parse_time(row.get('prep_time', ''))
-                cook_time = parse_time(row.get('cook_time', ''))
-                flavor_profile = clean_text(row.get('flavor_profile'))
-                course = clean_text(row.get('course'))
-                state = clean_text(row.get('state'))
-                region = clean_text(row.get('region'))
-                
-                # Create description from available data
-                desc_parts = []
-                if flavor_profile:
-                    desc_parts.append(f"Flavor: {flavor_profile}")
-                if region:
-                    desc_parts.append(f"Region: {region}")
-                description = '. '.join(desc_parts) if desc_parts else None
-                
-                # Insert into database
-                cursor.execute("""
-                    INSERT INTO global_dishes 
-                    (name, ingredients, diet, prep_time, cook_time, flavor_profile, course, state, region, description)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (name, ingredients, diet, prep_time, cook_time, flavor_profile, course, state, region, description))
-                
-                imported += 1
-                
-                # Progress indicator
-                if imported % 10 == 0:
-                    print(f"  ✓ Imported {imported} dishes...")
-        
-        conn.commit()
-        print(f"\n✅ Successfully imported {imported} dishes!")
-        if skipped > 0:
-            print(f"⚠️  Skipped {skipped} rows (missing name)")
-        
-        # Show sample
-        cursor.execute("SELECT id, name, diet, course, state FROM global_dishes LIMIT 5")
-        samples = cursor.fetchall()
-        print("\n📋 Sample dishes:")
-        for dish in samples:
-            print(f"  {dish[0]}. {dish[1]} - {dish[2]} - {dish[3]} ({dish[4]})")
-        
-        # Show stats
-        cursor.execute("SELECT COUNT(*), COUNT(DISTINCT state), COUNT(DISTINCT course) FROM global_dishes")
-        total, states, courses = cursor.fetchone()
-        print(f"\n📊 Database Stats:")
-        print(f"  Total Dishes: {total}")
-        print(f"  Unique States: {states}")
-        print(f"  Unique Courses: {courses}")
-        
-    except Exception as e:
-        conn.rollback()
-        print(f"\n❌ Import failed: {e}")
-        import traceback
-        traceback.print_exc()
-    finally:
-        conn.close()
+    print(f"\n✅ Processed {report.processed:,} rows in {report.elapsed:.1f}s ({report.rows_per_second:,.0f} rows/s)")
+    print(f"  Inserted: {report.inserted:,}  Updated: {report.updated:,}  Unchanged: {report.unchanged:,}  "
+          f"Duplicates in file: {report.duplicates:,}")
+    if report.rejected:
+        print(f"⚠️  Rejected {report.rejected:,} rows:")
+        for error in report.errors:
+            print(f"  line {error['line']}: {error['error']}")
+    engine.dispose()
 
 if __name__ == "__main__":
-    import_dishes()
+    main()
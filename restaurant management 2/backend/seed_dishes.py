@@ -9,6 +9,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import SessionLocal, engine, Base
 from app.models import GlobalDish
+from app.dish_search import ensure_dish_search_index
 
 # Create tables
 Base.metadata.create_all(bind=engine)
@@ -212,6 +213,8 @@ def seed_dishes():
             db.add(dish)
         
         db.commit()
+        # Inserts are indexed by triggers once the index exists; this creates it if not
+        ensure_dish_search_index(engine)
         print(f"Successfully seeded {len(SAMPLE_DISHES)} dishes!")
         
     except Exception as e:
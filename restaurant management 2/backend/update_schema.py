@@ -20,7 +20,10 @@ def migrate_database():
             ("prep_time", "INTEGER"),
             ("cook_time", "INTEGER"),
             ("diet", "VARCHAR"),
-            ("course", "VARCHAR")
+            ("course", "VARCHAR"),
+            ("card_url", "VARCHAR"),
+            ("thumbnail_url", "VARCHAR"),
+            ("auto_unavailable", "BOOLEAN DEFAULT 0")
         ]
         
         for column_name, column_type in new_columns:
@@ -33,6 +36,27 @@ def migrate_database():
                 else:
                     raise e
         
+        # Recipe deductions are marked so cancelling an order can reverse them
+        try:
+            cursor.execute("ALTER TABLE ingredient_usage ADD COLUMN automatic BOOLEAN DEFAULT 0")
+            print("✅ Added column: ingredient_usage.automatic")
+        except sqlite3.OperationalError as e:
+            if "duplicate column name" in str(e):
+                print("⚠️  Column ingredient_usage.automatic already exists, skipping...")
+            elif "no such table" not in str(e):
+                raise e
+        
+        # daily_item_sales.revenue was priced at the current menu price, not the
+        # order's, so it drifted after price changes; nothing read it
+        try:
+            cursor.execute("ALTER TABLE daily_item_sales DROP COLUMN revenue")
+            print("✅ Dropped column: daily_item_sales.revenue")
+        except sqlite3.OperationalError as e:
+            if "no such column" in str(e) or "no such table" in str(e):
+                print("⚠️  Column daily_item_sales.revenue already gone, skipping...")
+            else:
+                raise e
+        
         # Create global_dishes table if it doesn't exist
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS global_dishes (
@@ -51,6 +75,31 @@ def migrate_database():
         """)
         print("✅ Created/verified global_dishes table")
         
+        # Dish names are the import's natural key (see app/dish_import.py).
+        # Merge duplicates into the oldest row, repointing menu items first,
+        # then make the name index unique.
+        cursor.execute("""
+            UPDATE menu_items SET global_dish_id = (
+                SELECT MIN(keep.id) FROM global_dishes dup
+                JOIN global_dishes keep ON keep.name = dup.name
+                WHERE dup.id = menu_items.global_dish_id
+            )
+            WHERE global_dish_id IN (SELECT id FROM global_dishes)
+        """)
+        cursor.execute("""
+            DELETE FROM global_dishes
+            WHERE id NOT IN (SELECT MIN(id) FROM global_dishes GROUP BY name)
+        """)
+        if cursor.rowcount:
+            print(f"✅ Removed {cursor.rowcount} duplicate global dishes")
+        unique_name = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ix_global_dishes_name' AND sql LIKE 'CREATE UNIQUE%'"
+        ).fetchone()
+        if not unique_name:
+            cursor.execute("DROP INDEX IF EXISTS ix_global_dishes_name")
+            cursor.execute("CREATE UNIQUE INDEX ix_global_dishes_name ON global_dishes (name)")
+            print("✅ Added unique index: global_dishes.name")
+        
         # Create ingredients table if it doesn't exist
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS ingredients (
@@ -79,6 +128,7 @@ def migrate_database():
                 used_by VARCHAR,
                 used_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                 notes TEXT,
+                automatic BOOLEAN DEFAULT 0,
                 FOREIGN KEY (ingredient_id) REFERENCES ingredients(id) ON DELETE CASCADE,
                 FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE SET NULL
             )
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { inventoryAPI, authAPI } from '../../services/api';
+import { inventoryAPI, authAPI, subscribeToEvents } from '../../services/api';
 import { GlassCard } from '../shared/PremiumUI';
 import ChefSidebar from '../shared/ChefSidebar';
 import toast from 'react-hot-toast';
@@ -26,18 +26,25 @@ const ChefDashboard = () => {
     fetchIngredients();
     fetchAlerts();
     
-    // Poll for updates every 30 seconds
-    const interval = setInterval(() => {
-      fetchActiveOrders();
-      fetchAlerts();
-    }, 30000);
-    
-    return () => clearInterval(interval);
+    // Orders and stock alerts are pushed by the server
+    const unsubscribe = subscribeToEvents(['order', 'inventory'], {
+      'order.created': fetchActiveOrders,
+      'order.updated': fetchActiveOrders,
+      'order.deleted': fetchActiveOrders,
+      'inventory.alert_raised': fetchAlerts,
+      'inventory.alert_cleared': fetchAlerts,
+      resync: () => {
+        fetchActiveOrders();
+        fetchAlerts();
+      },
+    });
+
+    return unsubscribe;
   }, []);
 
   const fetchActiveOrders = async () => {
     try {
-      const response = await fetch('http://localhost:8000/api/orders/');
+      const response = await fetch('http://localhost:8000/api/orders/?status=Pending&status=In%20Progress');
       const data = await response.json();
       // Filter for orders that are pending or in progress
       const active = data.filter(order => 
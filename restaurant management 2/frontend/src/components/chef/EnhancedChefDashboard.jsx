@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { inventoryAPI, chefAPI, menuAPI } from '../../services/api';
+import { inventoryAPI, chefAPI, menuAPI, subscribeToEvents } from '../../services/api';
 import { GlassCard } from '../shared/PremiumUI';
 import ChefSidebar from '../shared/ChefSidebar';
 import toast from 'react-hot-toast';
@@ -68,14 +68,23 @@ const EnhancedChefDashboard = () => {
     fetchMenuItems();
     fetchMessages();
     
-    // Poll for updates every 30 seconds
-    const interval = setInterval(() => {
-      fetchActiveOrders();
-      fetchAlerts();
-      fetchMessages();
-    }, 30000);
-    
-    return () => clearInterval(interval);
+    // Orders, messages and stock alerts are pushed by the server
+    const unsubscribe = subscribeToEvents(['order', 'message', 'inventory'], {
+      'order.created': fetchActiveOrders,
+      'order.updated': fetchActiveOrders,
+      'order.deleted': fetchActiveOrders,
+      'message.created': fetchMessages,
+      'message.read': fetchMessages,
+      'inventory.alert_raised': fetchAlerts,
+      'inventory.alert_cleared': fetchAlerts,
+      resync: () => {
+        fetchActiveOrders();
+        fetchMessages();
+        fetchAlerts();
+      },
+    });
+
+    return unsubscribe;
   }, []);
 
   const fetchActiveOrders = async () => {
@@ -299,6 +308,8 @@ const EnhancedChefDashboard = () => {
   const openRecipeModal = (item) => {
     setSelectedRecipe(item);
     setShowRecipeModal(true);
+    // Menu items carry the recipe only; stock comes from inventory
+    fetchIngredients();
   };
   
   const openMessageModal = (order = null) => {
@@ -1078,7 +1089,7 @@ const EnhancedChefDashboard = () => {
                       <div key={idx} className='flex justify-between items-center'>
                         <span className='text-slate-300'>{ing.name}</span>
                         <span className='text-slate-400 text-sm'>
-                          Stock: {ing.current_stock} {ing.unit}
+                          Stock: {ingredients.find(i => i.id === ing.id)?.current_stock ?? '-'} {ing.unit}
                         </span>
                       </div>
                     ))}
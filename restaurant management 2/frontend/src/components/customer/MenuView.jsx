@@ -400,8 +400,9 @@ const MenuView = () => {
             <Card key={item.id} className='hover:shadow-xl transition-shadow'>
               {item.image_url && (
                 <img
-                  src={`http://localhost:8000${item.image_url}`}
+                  src={`http://localhost:8000${item.card_url || item.image_url}`}
                   alt={item.name}
+                  loading='lazy'
                   className='w-full h-48 object-cover rounded-lg mb-4'
                 />
               )}
@@ -480,7 +481,7 @@ const MenuView = () => {
                           <div className='flex gap-4 mb-3'>
                             {item.image_url && (
                               <img
-                                src={`http://localhost:8000${item.image_url}`}
+                                src={`http://localhost:8000${item.thumbnail_url || item.image_url}`}
                                 alt={item.name}
                                 className='w-20 h-20 object-cover rounded'
                               />
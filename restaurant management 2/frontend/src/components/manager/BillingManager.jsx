@@ -7,6 +7,7 @@ import toast from 'react-hot-toast';
 const BillingManager = () => {
   const [bills, setBills] = useState([]);
   const [orders, setOrders] = useState([]);
+  const [billedOrderIds, setBilledOrderIds] = useState(new Set());
   const [tables, setTables] = useState([]);
   const [selectedBill, setSelectedBill] = useState(null);
   const [filterStatus, setFilterStatus] = useState('Unpaid');
@@ -41,8 +42,12 @@ const BillingManager = () => {
 
   const fetchBills = async () => {
     try {
-      const response = await billsAPI.getAll();
-      setBills(response.data);
+      // Every unpaid bill, plus the latest page of paid ones
+      const [unpaid, paid] = await Promise.all([
+        billsAPI.getAllPages({ paid: false }),
+        billsAPI.getAll({ paid: true }),
+      ]);
+      setBills([...unpaid.data, ...paid.data]);
     } catch (error) {
       console.error('Error fetching bills:', error);
       toast.error('Failed to load bills');
@@ -55,6 +60,17 @@ const BillingManager = () => {
       const readyOrCompleted = response.data.filter((order) => 
         order.status === 'Ready' || order.status === 'Completed'
       );
+      // A bill is created after its order, so bills since the oldest of these
+      // orders cover every one of them, however many bills that is
+      let billed = [];
+      if (readyOrCompleted.length > 0) {
+        const oldest = readyOrCompleted.reduce(
+          (min, order) => (order.created_at < min ? order.created_at : min),
+          readyOrCompleted[0].created_at
+        );
+        billed = (await billsAPI.getAllPages({ created_from: oldest })).data;
+      }
+      setBilledOrderIds(new Set(billed.map((bill) => bill.order_id)));
       setOrders(readyOrCompleted);
     } catch (error) {
       console.error('Error fetching orders:', error);
@@ -78,11 +94,7 @@ const BillingManager = () => {
       fetchBills();
       fetchCompletedOrders();
       // Select the newly created bill
-      const newBills = await billsAPI.getAll();
-      const newBill = newBills.data.find(b => b.order_id === parseInt(orderId));
-      if (newBill) {
-        selectBill(newBill);
-      }
+      selectBill(response.data);
     } catch (error) {
       console.error('Error generating bill:', error);
       toast.error(error.response?.data?.detail || 'Failed to generate bill');
@@ -239,9 +251,8 @@ const BillingManager = () => {
   
   // Get orders without bills
   const ordersWithoutBills = useMemo(() => {
-    const billOrderIds = new Set(bills.map(b => b.order_id));
-    return orders.filter(order => !billOrderIds.has(order.id));
-  }, [orders, bills]);
+    return orders.filter(order => !billedOrderIds.has(order.id));
+  }, [orders, billedOrderIds]);
 
   return (
     <div className="flex h-screen bg-slate-950">
@@ -425,9 +436,9 @@ const BillingManager = () => {
                       const grouped = {};
                       items.forEach(item => {
                         if (grouped[item.name]) {
-                          grouped[item.name].quantity += 1;
+                          grouped[item.name].quantity += item.quantity || 1;
                         } else {
-                          grouped[item.name] = { ...item, quantity: 1 };
+                          grouped[item.name] = { ...item, quantity: item.quantity || 1 };
                         }
                       });
                       
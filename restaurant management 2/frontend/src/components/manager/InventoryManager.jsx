@@ -121,6 +121,9 @@ const InventoryManager = () => {
         content += `${item.name}\n`;
         content += `  Current Stock: ${item.current_stock} ${item.unit}\n`;
         content += `  Needed: ${item.needed_quantity.toFixed(2)} ${item.unit}\n`;
+        if (item.days_of_cover !== null && item.days_of_cover !== undefined) {
+          content += `  Runs out in: ${item.days_of_cover} day(s) at ${item.daily_usage} ${item.unit}/day\n`;
+        }
         if (item.estimated_cost) {
           content += `  Cost: ₹${item.estimated_cost.toFixed(2)}\n`;
         }
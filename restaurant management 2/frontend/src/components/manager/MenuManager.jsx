@@ -754,8 +754,9 @@ const MenuManager = () => {
                 <div className="relative h-56 bg-gradient-to-br from-slate-800 to-slate-900 overflow-hidden">
                   {item.image_url ? (
                     <img
-                      src={`http://localhost:8000${item.image_url}`}
+                      src={`http://localhost:8000${item.card_url || item.image_url}`}
                       alt={item.name}
+                      loading="lazy"
                       className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-700"
                       style={{ objectPosition: 'center' }}
                     />
@@ -96,8 +96,9 @@ const MenuView = () => {
             <Card key={item.id} className='hover:shadow-xl transition-shadow'>
               {item.image_url && (
                 <img
-                  src={`http://localhost:8000${item.image_url}`}
+                  src={`http://localhost:8000${item.card_url || item.image_url}`}
                   alt={item.name}
+                  loading='lazy'
                   className='w-full h-48 object-cover rounded-lg mb-4'
                 />
               )}
@@ -164,7 +165,7 @@ const MenuView = () => {
                       <div key={item.id} className='flex gap-4 p-4 bg-gray-50 rounded-lg'>
                         {item.image_url && (
                           <img
-                            src={`http://localhost:8000${item.image_url}`}
+                            src={`http://localhost:8000${item.thumbnail_url || item.image_url}`}
                             alt={item.name}
                             className='w-20 h-20 object-cover rounded'
                           />
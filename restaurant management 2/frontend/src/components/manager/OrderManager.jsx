@@ -1,5 +1,5 @@
 import React, { useState, useEffect, useRef, useMemo } from 'react';
-import { ordersAPI, tablesAPI, menuAPI } from '../../services/api';
+import { ordersAPI, tablesAPI, menuAPI, subscribeToEvents } from '../../services/api';
 import Card from '../shared/Card';
 
 const OrderManager = () => {
@@ -29,12 +29,17 @@ const OrderManager = () => {
     fetchTables();
     fetchMenuItems();
     
-    // Poll for new orders every 10 seconds
-    const interval = setInterval(() => {
-      fetchOrders();
-    }, 10000);
-    
-    return () => clearInterval(interval);
+    // Refresh only when the server pushes an order or table change
+    return subscribeToEvents(['order', 'table'], {
+      'order.created': fetchOrders,
+      'order.updated': fetchOrders,
+      'order.deleted': fetchOrders,
+      'table.updated': fetchTables,
+      resync: () => {
+        fetchOrders();
+        fetchTables();
+      },
+    });
   }, []);
 
   const fetchOrders = async () => {
@@ -193,12 +198,12 @@ const OrderManager = () => {
     const grouped = {};
     items.forEach(item => {
       if (grouped[item.name]) {
-        grouped[item.name].quantity += 1;
+        grouped[item.name].quantity += item.quantity || 1;
       } else {
         grouped[item.name] = {
           name: item.name,
           price: item.price,
-          quantity: 1,
+          quantity: item.quantity || 1,
           notes: item.notes
         };
       }
@@ -40,12 +40,12 @@ const PrintBill = ({ bill, order, table }) => {
     const grouped = {};
     items.forEach(item => {
       if (grouped[item.name]) {
-        grouped[item.name].quantity += 1;
+        grouped[item.name].quantity += item.quantity || 1;
       } else {
         grouped[item.name] = {
           name: item.name,
           price: item.price,
-          quantity: 1
+          quantity: item.quantity || 1
         };
       }
     });
@@ -153,11 +153,34 @@ const BillDetailModal = ({ bill, onClose }) => {
   );
 };
 
+// Bills table shows at most one page; totals and the chart come from the server
+const BILL_TABLE_LIMIT = 500;
+
+const DEFAULT_GRANULARITY = {
+  today: 'hour',
+  week: 'day',
+  month: 'day',
+  custom: 'day',
+  all: 'month',
+};
+
+const formatBucketLabel = (bucket, granularity) => {
+  const start = new Date(bucket.start + 'Z');
+  if (granularity === 'hour') {
+    return start.toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
+  }
+  if (granularity === 'month') {
+    return start.toLocaleDateString([], { month: 'short', year: 'numeric' });
+  }
+  return start.toLocaleDateString();
+};
+
 const Reports = () => {
   const [dateRange, setDateRange] = useState('today');
   const [customStartDate, setCustomStartDate] = useState('');
   const [customEndDate, setCustomEndDate] = useState('');
-  const [stats, setStats] = useState(null);
+  const [granularity, setGranularity] = useState('auto');
+  const [report, setReport] = useState(null);
   const [bills, setBills] = useState([]);
   const [loading, setLoading] = useState(true);
   const [compareMode, setCompareMode] = useState(false);
@@ -166,18 +189,60 @@ const Reports = () => {
   const [statusFilter, setStatusFilter] = useState('all');
   const [selectedBill, setSelectedBill] = useState(null);
 
+  const effectiveGranularity = granularity === 'auto' ? DEFAULT_GRANULARITY[dateRange] : granularity;
+
   useEffect(() => {
+    if (dateRange === 'custom' && !(customStartDate && customEndDate)) return;
     fetchReportData();
-  }, [dateRange]);
+  }, [dateRange, customStartDate, customEndDate, statusFilter, effectiveGranularity, compareMode]);
+
+  // Date range as ISO timestamps; the server buckets and filters on [start, end)
+  const getDateBounds = () => {
+    const now = new Date();
+    const today = new Date(now.getFullYear(), now.getMonth(), now.getDate());
+
+    switch(dateRange) {
+      case 'today':
+        return { start: today.toISOString() };
+      case 'week': {
+        const weekAgo = new Date(today);
+        weekAgo.setDate(weekAgo.getDate() - 7);
+        return { start: weekAgo.toISOString() };
+      }
+      case 'month': {
+        const monthAgo = new Date(today);
+        monthAgo.setMonth(monthAgo.getMonth() - 1);
+        return { start: monthAgo.toISOString() };
+      }
+      case 'custom': {
+        const start = new Date(customStartDate + 'T00:00:00');
+        const end = new Date(customEndDate + 'T00:00:00');
+        end.setDate(end.getDate() + 1);
+        return { start: start.toISOString(), end: end.toISOString() };
+      }
+      default:
+        return {};
+    }
+  };
 
   const fetchReportData = async () => {
     setLoading(true);
     try {
-      const [analyticsRes, billsRes] = await Promise.all([
-        analyticsAPI.getDashboard(),
-        billsAPI.getAll()
+      const { start, end } = getDateBounds();
+      const paid = statusFilter === 'all' ? undefined : statusFilter === 'paid';
+      const [salesRes, billsRes] = await Promise.all([
+        analyticsAPI.getSales({
+          start,
+          end,
+          granularity: effectiveGranularity,
+          paid,
+          compare: compareMode && dateRange !== 'all',
+          // Bucket by the restaurant's local days, not UTC ones
+          tz_offset: -new Date().getTimezoneOffset(),
+        }),
+        billsAPI.getAll({ created_from: start, created_to: end, paid, limit: BILL_TABLE_LIMIT })
       ]);
-      setStats(analyticsRes.data);
+      setReport(salesRes.data);
       setBills(billsRes.data);
       setLoading(false);
     } catch (error) {
@@ -187,89 +252,11 @@ const Reports = () => {
     }
   };
 
-  const filterBillsByDateRange = () => {
-    const now = new Date();
-    const today = new Date(now.getFullYear(), now.getMonth(), now.getDate());
-    
-    return bills.filter(bill => {
-      const billDate = new Date(bill.created_at);
-      
-      if (dateRange === 'custom' && customStartDate && customEndDate) {
-        const start = new Date(customStartDate);
-        const end = new Date(customEndDate);
-        return billDate >= start && billDate <= end;
-      }
-      
-      switch(dateRange) {
-        case 'today':
-          return billDate >= today;
-        case 'week':
-          const weekAgo = new Date(today);
-          weekAgo.setDate(weekAgo.getDate() - 7);
-          return billDate >= weekAgo;
-        case 'month':
-          const monthAgo = new Date(today);
-          monthAgo.setMonth(monthAgo.getMonth() - 1);
-          return billDate >= monthAgo;
-        default:
-          return true;
-      }
-    });
-  };
-
-  const getComparisonData = () => {
-    const now = new Date();
-    let comparisonStart, comparisonEnd;
-    
-    switch(dateRange) {
-      case 'today':
-        comparisonStart = new Date(now);
-        comparisonStart.setDate(comparisonStart.getDate() - 1);
-        comparisonEnd = new Date(now);
-        comparisonEnd.setDate(comparisonEnd.getDate() - 1);
-        break;
-      case 'week':
-        comparisonStart = new Date(now);
-        comparisonStart.setDate(comparisonStart.getDate() - 14);
-        comparisonEnd = new Date(now);
-        comparisonEnd.setDate(comparisonEnd.getDate() - 7);
-        break;
-      case 'month':
-        comparisonStart = new Date(now);
-        comparisonStart.setMonth(comparisonStart.getMonth() - 2);
-        comparisonEnd = new Date(now);
-        comparisonEnd.setMonth(comparisonEnd.getMonth() - 1);
-        break;
-      default:
-        return { bills: [], revenue: 0, paidCount: 0, unpaidCount: 0 };
-    }
-    
-    const comparisonBills = bills.filter(bill => {
-      const billDate = new Date(bill.created_at);
-      return billDate >= comparisonStart && billDate <= comparisonEnd;
-    });
-    
-    return {
-      bills: comparisonBills,
-      revenue: comparisonBills.reduce((sum, bill) => sum + bill.total_amount, 0),
-      paidCount: comparisonBills.filter(b => b.paid).length,
-      unpaidCount: comparisonBills.filter(b => !b.paid).length,
-      totalCount: comparisonBills.length
-    };
-  };
-
   const filteredBills = useMemo(() => {
-    let filtered = filterBillsByDateRange();
-    
-    // Status filter
-    if (statusFilter === 'paid') {
-      filtered = filtered.filter(b => b.paid);
-    } else if (statusFilter === 'unpaid') {
-      filtered = filtered.filter(b => !b.paid);
-    }
+    const sorted = [...bills];
     
     // Sorting
-    filtered.sort((a, b) => {
+    sorted.sort((a, b) => {
       let aVal, bVal;
       
       if (sortColumn === 'created_at') {
@@ -290,31 +277,28 @@ const Reports = () => {
       }
     });
     
-    return filtered;
-  }, [bills, dateRange, customStartDate, customEndDate, statusFilter, sortColumn, sortDirection]);
+    return sorted;
+  }, [bills, sortColumn, sortDirection]);
 
-  const totalRevenue = filteredBills.reduce((sum, bill) => sum + bill.total_amount, 0);
-  const paidBills = filteredBills.filter(b => b.paid);
-  const unpaidBills = filteredBills.filter(b => !b.paid);
-  const paidRevenue = paidBills.reduce((sum, bill) => sum + bill.total_amount, 0);
-  const comparisonData = compareMode ? getComparisonData() : null;
+  const totals = report?.totals || { bill_count: 0, revenue: 0, paid_count: 0, paid_revenue: 0, unpaid_count: 0 };
+  const totalRevenue = totals.revenue;
+  const paidRevenue = totals.paid_revenue;
+  const comparisonTotals = report?.comparison?.totals;
+  const comparisonData = compareMode && comparisonTotals ? {
+    revenue: comparisonTotals.revenue,
+    paidCount: comparisonTotals.paid_count,
+    unpaidCount: comparisonTotals.unpaid_count,
+    totalCount: comparisonTotals.bill_count
+  } : null;
 
-  // Generate chart data
+  // Chart data is pre-bucketed by the server
   const chartData = useMemo(() => {
-    const dataByDate = {};
-    
-    filteredBills.forEach(bill => {
-      const date = new Date(bill.created_at).toLocaleDateString();
-      if (!dataByDate[date]) {
-        dataByDate[date] = 0;
-      }
-      dataByDate[date] += bill.total_amount;
-    });
-    
-    return Object.entries(dataByDate)
-      .sort((a, b) => new Date(a[0]) - new Date(b[0]))
-      .map(([date, value]) => ({ label: date, value }));
-  }, [filteredBills]);
+    if (!report) return [];
+    return report.series.map(bucket => ({
+      label: formatBucketLabel(bucket, report.granularity),
+      value: bucket.revenue
+    }));
+  }, [report]);
 
   const handleSort = (column) => {
     if (sortColumn === column) {
@@ -377,9 +361,9 @@ const Reports = () => {
     printWindow.document.write('<p style="text-align: center; color: #666;">Generated on: ' + new Date().toLocaleString() + '</p>');
     
     printWindow.document.write('<div class="summary">');
-    printWindow.document.write('<div class="summary-card"><h3>Total Bills</h3><p>' + filteredBills.length + '</p></div>');
+    printWindow.document.write('<div class="summary-card"><h3>Total Bills</h3><p>' + totals.bill_count + '</p></div>');
     printWindow.document.write('<div class="summary-card"><h3>Total Revenue</h3><p>₹' + totalRevenue.toFixed(2) + '</p></div>');
-    printWindow.document.write('<div class="summary-card"><h3>Paid Bills</h3><p>' + paidBills.length + '</p></div>');
+    printWindow.document.write('<div class="summary-card"><h3>Paid Bills</h3><p>' + totals.paid_count + '</p></div>');
     printWindow.document.write('<div class="summary-card"><h3>Paid Revenue</h3><p>₹' + paidRevenue.toFixed(2) + '</p></div>');
     printWindow.document.write('</div>');
     
@@ -472,6 +456,19 @@ const Reports = () => {
                 <option value="custom">Custom Range</option>
                 <option value="all">All Time</option>
               </select>
+
+              {/* Chart Granularity */}
+              <select
+                value={granularity}
+                onChange={(e) => setGranularity(e.target.value)}
+                className="px-4 py-2 bg-slate-800 border border-slate-700 rounded-xl font-semibold text-slate-200 focus:outline-none focus:border-primary-500 transition-all"
+              >
+                <option value="auto">Auto</option>
+                <option value="hour">Hourly</option>
+                <option value="day">Daily</option>
+                <option value="week">Weekly</option>
+                <option value="month">Monthly</option>
+              </select>
               
               {/* Custom Date Inputs */}
               {dateRange === 'custom' && (
@@ -540,14 +537,14 @@ const Reports = () => {
             </div>
             <div className="flex items-end justify-between">
               <div>
-                <p className="text-4xl font-bold text-blue-600">{filteredBills.length}</p>
+                <p className="text-4xl font-bold text-blue-600">{totals.bill_count}</p>
                 {compareMode && comparisonData && (
                   <div className="flex items-center gap-2 mt-2">
                     <span className={`text-sm font-semibold ${
-                      filteredBills.length >= comparisonData.totalCount ? 'text-green-600' : 'text-red-600'
+                      totals.bill_count >= comparisonData.totalCount ? 'text-green-600' : 'text-red-600'
                     }`}>
-                      {filteredBills.length >= comparisonData.totalCount ? '↑' : '↓'} 
-                      {calculatePercentageChange(filteredBills.length, comparisonData.totalCount)}%
+                      {totals.bill_count >= comparisonData.totalCount ? '↑' : '↓'} 
+                      {calculatePercentageChange(totals.bill_count, comparisonData.totalCount)}%
                     </span>
                     <span className="text-xs text-gray-500">vs previous period</span>
                   </div>
@@ -596,15 +593,15 @@ const Reports = () => {
             </div>
             <div className="flex items-end justify-between">
               <div>
-                <p className="text-4xl font-bold text-purple-600">{paidBills.length}</p>
+                <p className="text-4xl font-bold text-purple-600">{totals.paid_count}</p>
                 <p className="text-sm text-gray-600 mt-1">₹{paidRevenue.toFixed(2)}</p>
                 {compareMode && comparisonData && (
                   <div className="flex items-center gap-2 mt-2">
                     <span className={`text-sm font-semibold ${
-                      paidBills.length >= comparisonData.paidCount ? 'text-green-600' : 'text-red-600'
+                      totals.paid_count >= comparisonData.paidCount ? 'text-green-600' : 'text-red-600'
                     }`}>
-                      {paidBills.length >= comparisonData.paidCount ? '↑' : '↓'} 
-                      {calculatePercentageChange(paidBills.length, comparisonData.paidCount)}%
+                      {totals.paid_count >= comparisonData.paidCount ? '↑' : '↓'} 
+                      {calculatePercentageChange(totals.paid_count, comparisonData.paidCount)}%
                     </span>
                     <span className="text-xs text-gray-500">vs previous period</span>
                   </div>
@@ -625,15 +622,15 @@ const Reports = () => {
             </div>
             <div className="flex items-end justify-between">
               <div>
-                <p className="text-4xl font-bold text-orange-600">{unpaidBills.length}</p>
+                <p className="text-4xl font-bold text-orange-600">{totals.unpaid_count}</p>
                 <p className="text-sm text-gray-600 mt-1">₹{(totalRevenue - paidRevenue).toFixed(2)}</p>
                 {compareMode && comparisonData && (
                   <div className="flex items-center gap-2 mt-2">
                     <span className={`text-sm font-semibold ${
-                      unpaidBills.length <= comparisonData.unpaidCount ? 'text-green-600' : 'text-red-600'
+                      totals.unpaid_count <= comparisonData.unpaidCount ? 'text-green-600' : 'text-red-600'
                     }`}>
-                      {unpaidBills.length <= comparisonData.unpaidCount ? '↓' : '↑'} 
-                      {Math.abs(calculatePercentageChange(unpaidBills.length, comparisonData.unpaidCount))}%
+                      {totals.unpaid_count <= comparisonData.unpaidCount ? '↓' : '↑'} 
+                      {Math.abs(calculatePercentageChange(totals.unpaid_count, comparisonData.unpaidCount))}%
                     </span>
                     <span className="text-xs text-gray-500">vs previous period</span>
                   </div>
@@ -766,7 +763,10 @@ const Reports = () => {
                 <div className="flex items-center gap-8">
                   <div>
                     <span className="text-teal-100 text-sm">Total Bills:</span>
-                    <span className="ml-2 text-xl">{filteredBills.length}</span>
+                    <span className="ml-2 text-xl">{totals.bill_count}</span>
+                    {totals.bill_count > filteredBills.length && (
+                      <span className="ml-2 text-teal-100 text-sm">(latest {filteredBills.length} shown)</span>
+                    )}
                   </div>
                   <div>
                     <span className="text-teal-100 text-sm">Grand Total:</span>
@@ -774,7 +774,7 @@ const Reports = () => {
                   </div>
                 </div>
                 <div className="text-sm text-teal-100">
-                  {paidBills.length} Paid • {unpaidBills.length} Unpaid
+                  {totals.paid_count} Paid • {totals.unpaid_count} Unpaid
                 </div>
               </div>
             </>
@@ -82,9 +82,22 @@ export const ordersAPI = {
   update: (id, data) => api.put(`/orders/${id}/`, data),
 };
 
+// List endpoints return one page at a time; follow X-Next-Cursor to the end
+const getAllPages = async (url, params = {}) => {
+  const data = [];
+  let cursor;
+  do {
+    const response = await api.get(url, { params: { ...params, cursor } });
+    data.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return { data };
+};
+
 // Bills API
 export const billsAPI = {
-  getAll: () => api.get('/bills/'),
+  getAll: (params = {}) => api.get('/bills/', { params }),
+  getAllPages: (params = {}) => getAllPages('/bills/', params),
   create: (data) => api.post('/bills/', data),
   updatePayment: (id, paid) => api.patch(`/bills/${id}/payment`, null, { params: { paid } }),
 };
@@ -92,6 +105,7 @@ export const billsAPI = {
 // Analytics API
 export const analyticsAPI = {
   getDashboard: () => api.get('/analytics/dashboard'),
+  getSales: (params = {}) => api.get('/analytics/sales', { params }),
 };
 
 // Dishes API (Global Dishes Search)
@@ -101,6 +115,11 @@ export const dishesAPI = {
   getAll: (params = {}) => api.get('/dishes/', { params }),
 };
 
+// Search API (in-memory typeahead)
+export const searchAPI = {
+  suggest: (q, params = {}) => api.get('/search/suggest', { params: { q, ...params } }),
+};
+
 // Inventory API
 export const inventoryAPI = {
   // Ingredients
@@ -121,6 +140,7 @@ export const inventoryAPI = {
   
   // Dish Requirements
   getRequiredIngredients: (menuItemId) => api.get(`/inventory/required-ingredients/${menuItemId}`),
+  getCookable: (params = {}) => api.get('/inventory/cookable', { params }),
 };
 
 // Chef API
@@ -149,4 +169,28 @@ export const chefAPI = {
   recordBatchUsage: (usages) => api.post('/chef/inventory/batch-usage', usages),
 };
 
+// Live updates (Server-Sent Events)
+// handlers maps event types (e.g. 'order.created') to callbacks; 'resync' fires
+// after a reconnect or when the server dropped events for this client
+export const subscribeToEvents = (types, handlers) => {
+  const params = types && types.length ? `?types=${types.join(',')}` : '';
+  const source = new EventSource(`${API_BASE_URL}/events/stream${params}`);
+  let connectedOnce = false;
+
+  source.onopen = () => {
+    if (connectedOnce) {
+      handlers.resync?.();
+    }
+    connectedOnce = true;
+  };
+
+  Object.entries(handlers).forEach(([type, handler]) => {
+    source.addEventListener(type, (event) => {
+      handler(event.data ? JSON.parse(event.data) : null);
+    });
+  });
+
+  return () => source.close();
+};
+
 export default api;